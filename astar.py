@@ -1,121 +1,116 @@
+import heapq
 import helpers
 import organisms
-import sys
 import math
+import numpy as np
 
 
-directions = list(helpers.Direction)
+directions = [direction.value for direction in helpers.Direction]
 
 
-class Node():
-    """A node class for A* Pathfinding"""
+def maze_layers(water_map, plant_map, animal_map):
+    """Returns the terrain blocked and occupancy layers of the given maps, as
+    kept by the ecosystem in its terrain_blocked_map and occupancy_map."""
+    from ecosystem import TREE_OCCUPIED_SPACE
 
-    def __init__(self, parent=None, x=None, y=None):
-        self.parent = parent
-        self.x = x
-        self.y = y
-
-        self.g = 0
-        self.h = 0
-        self.f = 0
-
-    def __eq__(self, other):
-        return ((self.x == other.x) and (self.y == other.y))
+    width = len(water_map)
+    height = len(water_map[0])
+    terrain_blocked_map = np.zeros((width, height), dtype=bool)
+    occupancy_map = np.zeros((width, height))
+    for x in range(width):
+        for y in range(height):
+            if water_map[x][y]:
+                terrain_blocked_map[x, y] = True
+                continue
+            occupied_space = 0
+            if plant_map[x][y] and plant_map[x][y].type == organisms.Type.TREE:
+                occupied_space = TREE_OCCUPIED_SPACE
+            for animal in animal_map[x][y]:
+                occupied_space += animal.size
+            occupancy_map[x, y] = occupied_space
+    return terrain_blocked_map, occupancy_map
 
 
 def astar(traverser, water_map, plant_map, animal_map, start_x, start_y, end_x, end_y, max_path_length=math.inf):
-    """Returns a list of tuples as a path from the given start to the given end in the given maze"""
-    # Create start and end node
-    start_node = Node(None, start_x, start_y)
-    start_node.g = start_node.h = start_node.f = 0
-    end_node = Node(None, end_x, end_y)
-    end_node.g = end_node.h = end_node.f = 0
-
-
-    # Initialize both open and closed list
-    open_list = []
-    closed_list = []
-
-    # Add the start node
-    open_list.append(start_node)
+    """Returns a list of tuples as a path from the given start to the given end in the given maze.
+    The layers of the maze are built from the maps first, searches run every
+    step should use astar_on_layers with the layers kept by the ecosystem."""
+    terrain_blocked_map, occupancy_map = maze_layers(water_map, plant_map, animal_map)
+    return astar_on_layers(traverser.size, terrain_blocked_map, occupancy_map, start_x, start_y, end_x, end_y,
+                           max_path_length=max_path_length)
+
+
+def astar_on_layers(size, terrain_blocked_map, occupancy_map, start_x, start_y, end_x, end_y,
+                    max_path_length=math.inf, closed=None):
+    """Returns a list of tuples as a path from the given start to the given end
+    for a traverser of the given size. The maze is described by the ecosystem's
+    terrain blocked and occupancy layers. If an empty set is given as closed,
+    the cells the search expanded are added to it. The search only looks at
+    the layers in these cells and their neighbours."""
+    from ecosystem import ANIMAL_CELL_CAPACITY
+
+    width, height = terrain_blocked_map.shape
+    free_space = ANIMAL_CELL_CAPACITY - size
+    start = (start_x, start_y)
+    end = (end_x, end_y)
+
+    # The open set is a binary heap ordered on f. Ties are broken on the order
+    # in which a cell was first discovered, which is the order the nodes had in
+    # the old linear open list.
+    open_heap = [(0, 0, start)]
+    discovered = {start: 0}
+    best_g = {start: 0}
+    parents = {start: None}
+    if closed is None:
+        closed = set()
 
     # Loop until you find the end
+    while open_heap:
 
-    while len(open_list) > 0:
-
-        # Get the current node
-        current_node = open_list[0]
-        current_index = 0
-        for index, item in enumerate(open_list):
-            if item.f < current_node.f:
-                current_node = item
-                current_index = index
-
-        # Pop current off open list, add to closed list
-        open_list.pop(current_index)
-        closed_list.append(current_node)
+        # Get the current node, skipping entries that have been superseded
+        _, _, current = heapq.heappop(open_heap)
+        if current in closed:
+            continue
+        closed.add(current)
+        current_g = best_g[current]
 
         # Found the goal
-        if current_node == end_node or current_node.g > max_path_length :
+        if current == end or current_g > max_path_length:
             path = []
-            current = current_node
             while current is not None:
-                path.append((current.x, current.y))
-                current = current.parent
+                path.append(current)
+                current = parents[current]
             return path[::-1] # Return reversed path
 
         # Generate children
-        from ecosystem import ANIMAL_CELL_CAPACITY
-        for dir in directions: # Adjacent squares
+        current_x, current_y = current
+        for dx, dy in directions: # Adjacent squares
 
             # Get node position
-            node_position_x = current_node.x + dir.value[0]
-            node_position_y = current_node.y + dir.value[1]
+            node_position_x = current_x + dx
+            node_position_y = current_y + dy
 
             # Make sure within range
-            width = len(water_map)
-            height = len(water_map[0])
             if node_position_x >= width or node_position_x < 0 or node_position_y >= height or node_position_y < 0:
                 continue
 
-            # Make sure walkable terrain
-            if water_map[node_position_x][node_position_y]:
-                continue
-            elif plant_map[node_position_x][node_position_y] and plant_map[node_position_x][node_position_y].type == organisms.Type.TREE:
-                occupied_space = 50
-                if animal_map[node_position_x][node_position_y]:
-                    for animal in animal_map[node_position_x][node_position_y]:
-                        occupied_space += animal.size
-                if occupied_space + traverser.size > ANIMAL_CELL_CAPACITY:
-                    continue
-            elif animal_map[node_position_x][node_position_y]:
-                occupied_space = 0
-                for animal in animal_map[node_position_x][node_position_y]:
-                    occupied_space += animal.size
-                if occupied_space + traverser.size > ANIMAL_CELL_CAPACITY:
-                    continue
-
-
-
-            # Create new node
-            new_node = Node(current_node, node_position_x, node_position_y)
-
-            if new_node in closed_list:
+            node = (node_position_x, node_position_y)
+            if node in closed:
                 continue
 
-            new_node.g = current_node.g + 1
-            new_node.h = ((new_node.x - end_node.x) ** 2) + ((new_node.y - end_node.y) ** 2)
-            new_node.f = new_node.g + new_node.h
+            # Make sure walkable terrain with room for the traverser
+            if terrain_blocked_map[node] or occupancy_map[node] > free_space:
+                continue
 
-            found_node = False
-            for (index, node) in enumerate(open_list):
-                if node == new_node:
-                    found_node = True
-                    if new_node.g < node.g:
-                        open_list[index] = new_node
-                    break
+            g = current_g + 1
+            if node in best_g and best_g[node] <= g:
+                continue
 
-            if not found_node:
-                open_list.append(new_node)
+            h = ((node_position_x - end_x) ** 2) + ((node_position_y - end_y) ** 2)
+            best_g[node] = g
+            parents[node] = current
+            if node not in discovered:
+                discovered[node] = len(discovered)
+            heapq.heappush(open_heap, (g + h, discovered[node], node))
 
     return []
@@ -9,23 +9,26 @@ class Status(Enum):
 
 
 class Node(ABC):
-    """An abstract class defining a node in the behaviour tree.
-    Subclasses must implement the run function.
+    """An abstract class defining a node in the behaviour tree. Trees are
+    shared by all organisms of a species, so the organism the tree is run for
+    is passed as the agent. Subclasses must implement the run function.
     """
     @abstractmethod
-    def run(self):
+    def run(self, agent):
         pass
 
 
 class BehaviourTree(Node):
-    """An abstract class defining non-leaf nodes in the behaviour tree.
-    Subclasses must implement the run function.
+    """An abstract class defining non-leaf nodes in the behaviour tree. The
+    name is only used to tell the nodes apart when profiling. Subclasses must
+    implement the run function.
     """
-    def __init__(self):
+    def __init__(self, name=None):
+        self.name = name
         self._children = []
 
     @abstractmethod
-    def run(self):
+    def run(self, agent):
         pass
 
     def add_child(self, child):
@@ -45,12 +48,12 @@ class BehaviourTree(Node):
 
 class FallBack(BehaviourTree):
     """The fallback node in a behaviour tree."""
-    def run(self):
+    def run(self, agent):
         """Returns upon finding a success or running. Otherwise runs all
         children and returns fail.
         """
         for child in self._children:
-            status = child.run()
+            status = child.run(agent)
             if status == Status.SUCCESS:
                 return Status.SUCCESS
             elif status == Status.RUNNING:
@@ -60,12 +63,12 @@ class FallBack(BehaviourTree):
 
 class Sequence(BehaviourTree):
     """The sequence node in a behaviour tree."""
-    def run(self):
+    def run(self, agent):
         """Returns upon finding a fail or running. Otherwise runs all children
         and returns success.
         """
         for child in self._children:
-            status = child.run()
+            status = child.run(agent)
             if status == Status.FAIL:
                 return Status.FAIL
             elif status == Status.RUNNING:
@@ -78,12 +81,12 @@ class Condition(Node):
     holds, and performs no state changes.
     """
     @abstractmethod
-    def condition():
+    def condition(self, agent):
         pass
 
-    def run(self):
+    def run(self, agent):
         """Returns success if condition holds, and failure otherwise."""
-        if self.condition():
+        if self.condition(agent):
             return Status.SUCCESS
         else:
             return Status.FAIL
@@ -91,16 +94,142 @@ class Condition(Node):
 
 class Action(Node):
     """Defines an action in the behaviour tree. Performs the action and returns
-    the status.
+    the status. Actions are shared by all organisms of a species, so the
+    status is returned by the action instead of being kept on the node.
     """
-    def __init__(self):
-        self._status = Status.RUNNING
-
     @abstractmethod
-    def action():
+    def action(self, agent):
         pass
 
-    def run(self):
+    def run(self, agent):
         """Depending on how the action changes the state, returns the status."""
-        self.action()
-        return self._status
+        return self.action(agent)
+
+
+def node_name(node):
+    """Returns the name of a composite node, or the class name of other
+    nodes and of composite nodes without a name."""
+    if isinstance(node, BehaviourTree) and node.name:
+        return node.name
+    return type(node).__name__
+
+
+# Instruction opcodes of a compiled tree
+CONDITION = 0
+ACTION = 1
+NODE = 2
+
+# Jump targets ending the run of a compiled tree
+DONE_SUCCESS = -1
+DONE_FAIL = -2
+
+
+class CompiledTree():
+    """A behaviour tree flattened into a list of leaf instructions. Each
+    instruction holds the index of the instruction to jump to when the leaf
+    succeeds and when it fails, so running the tree is a single loop instead
+    of a chain of run calls through the composite nodes. The nodes from
+    below the root down to the leaf of every instruction are kept for timing.
+
+    While a timer is set on the class, the tree runs through run_timed, which
+    tells the timer when the tree and every instruction start and end.
+    """
+    timer = None
+
+    def __init__(self, entry, instructions, paths):
+        self._entry = entry
+        self._instructions = instructions
+        self._paths = paths
+
+    def run(self, agent):
+        """Runs the leaves for the agent from the entry until the tree
+        succeeds, fails or a leaf is running, and returns the status of the
+        tree."""
+        if self.timer is not None:
+            return self.run_timed(agent, self.timer)
+        instructions = self._instructions
+        index = self._entry
+        while index >= 0:
+            opcode, node, on_success, on_fail = instructions[index]
+            if opcode is CONDITION:
+                index = on_success if node.condition(agent) else on_fail
+                continue
+            if opcode is ACTION:
+                status = node.action(agent)
+            else:
+                status = node.run(agent)
+            if status is Status.SUCCESS:
+                index = on_success
+            elif status is Status.FAIL:
+                index = on_fail
+            else:
+                return Status.RUNNING
+        return Status.SUCCESS if index == DONE_SUCCESS else Status.FAIL
+
+    def run_timed(self, agent, timer):
+        """Runs the tree like run, calling start_tree and end_tree on the
+        timer around the run, and start_instruction with the path of nodes
+        and end_instruction with the status around every instruction."""
+        instructions = self._instructions
+        paths = self._paths
+        index = self._entry
+        status = Status.RUNNING
+        timer.start_tree(agent)
+        try:
+            while index >= 0:
+                opcode, node, on_success, on_fail = instructions[index]
+                timer.start_instruction(paths[index])
+                if opcode is CONDITION:
+                    leaf_status = Status.SUCCESS if node.condition(agent) else Status.FAIL
+                elif opcode is ACTION:
+                    leaf_status = node.action(agent)
+                else:
+                    leaf_status = node.run(agent)
+                timer.end_instruction(leaf_status)
+                if leaf_status is Status.SUCCESS:
+                    index = on_success
+                elif leaf_status is Status.FAIL:
+                    index = on_fail
+                else:
+                    return status
+            status = Status.SUCCESS if index == DONE_SUCCESS else Status.FAIL
+            return status
+        finally:
+            timer.end_tree(status)
+
+
+def compile_tree(tree):
+    """Flattens the given behaviour tree into a compiled tree that returns the
+    same statuses and runs the same leaves in the same order."""
+    instructions = []
+    paths = []
+
+    def compile_node(node, on_success, on_fail, path):
+        """Adds the instructions of the node, below the composite nodes of the
+        given path, and returns its entry index."""
+        inside = path + (node,) if node is not tree else path
+        if type(node) is Sequence:
+            # A child continues with the next child on success
+            entry = on_success
+            for child in reversed(node._children):
+                entry = compile_node(child, entry, on_fail, inside)
+            return entry
+        if type(node) is FallBack:
+            # A child continues with the next child on failure
+            entry = on_fail
+            for child in reversed(node._children):
+                entry = compile_node(child, on_success, entry, inside)
+            return entry
+
+        if isinstance(node, Condition):
+            opcode = CONDITION
+        elif isinstance(node, Action):
+            opcode = ACTION
+        else:
+            opcode = NODE
+        instructions.append((opcode, node, on_success, on_fail))
+        paths.append(path + (node,))
+        return len(instructions) - 1
+
+    entry = compile_node(tree, DONE_SUCCESS, DONE_FAIL, ())
+    return CompiledTree(entry, instructions, paths)
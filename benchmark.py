@@ -0,0 +1,361 @@
+import argparse
+import copy
+import itertools
+import json
+import platform
+import random
+import resource
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from ecosystem import Ecosystem, EcosystemConfig, HIVES_PER_TREE
+from metrics import METRICS, measure
+from astar import astar_on_layers
+from weather import RainType
+from tree import Tree
+from grass import Grass
+from earth import Earth
+from flower import Flower
+from rabbit import Rabbit
+from burrow import Burrow
+from bee import Bee
+from hive import Hive
+from fox import Fox
+from den import Den
+from water import Water
+
+
+# Functions creating an organism of each type, given the ecosystem and a position
+ORGANISM_FACTORIES = {
+    'water': lambda ecosystem, x, y: Water(ecosystem, x, y),
+    'earth': lambda ecosystem, x, y: Earth(ecosystem, x, y, water_amount=500),
+    'grass': lambda ecosystem, x, y: Grass(ecosystem, x, y, 50, None, 500),
+    'tree': lambda ecosystem, x, y: Tree(ecosystem, x, y),
+    'flower': lambda ecosystem, x, y: Flower(ecosystem, x, y, 50, nectar=10),
+    'hive': lambda ecosystem, x, y: Hive(ecosystem, x, y),
+    'bee': lambda ecosystem, x, y: Bee(ecosystem, x, y),
+    'burrow': lambda ecosystem, x, y: Burrow(ecosystem, x, y),
+    'rabbit': lambda ecosystem, x, y: Rabbit(ecosystem, x, y, True),
+    'fox': lambda ecosystem, x, y: Fox(ecosystem, x, y, True),
+    'den': lambda ecosystem, x, y: Den(ecosystem, x, y)
+}
+
+
+# Map sizes of the throughput suite
+SUITE_SIZES = [(60, 40), (150, 100), (300, 300), (500, 500)]
+SUITE_STEPS = 20
+
+# Initial densities of the throughput suite. The burrow and fox amounts are
+# for a map of SUITE_AREA cells and are scaled with the area of the map.
+SUITE_AREA = 60 * 40
+SUITE_DENSITIES = {
+    'sparse': {'burrow_amount': 20, 'fox_amount': 3, 'hives_per_tree': HIVES_PER_TREE / 2},
+    'default': {'burrow_amount': 35, 'fox_amount': 7, 'hives_per_tree': HIVES_PER_TREE},
+    'dense': {'burrow_amount': 60, 'fox_amount': 15, 'hives_per_tree': HIVES_PER_TREE * 2}
+}
+
+# Map and amount of calls of the micro benchmarks
+MICRO_WIDTH = 150
+MICRO_HEIGHT = 100
+MICRO_WARMUP_STEPS = 20 # Steps run before measuring, so the animals have spread out
+MICRO_REPEATS = 5
+
+
+def measure_memory(ecosystem, factory, amount):
+    """Returns the average amount of bytes allocated when creating an organism
+    with the given factory, as traced by tracemalloc. This is the organism
+    object with everything it allocates for itself, such as paths and lists,
+    but not the behaviour tree shared by its species. Run it on two commits to
+    compare the memory used by a change."""
+    # The list is allocated before tracing starts, so only the organisms are
+    # counted
+    organisms = [None] * amount
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(amount):
+        organisms[i] = factory(ecosystem, i % ecosystem.width, i % ecosystem.height)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / amount
+
+
+def memory_benchmark(amount, seed):
+    """Prints the bytes per organism for every organism type."""
+    ecosystem = Ecosystem(20, 20, seed=seed)
+    print('Memory per organism (average over ' + str(amount) + ' organisms):')
+    for name, factory in ORGANISM_FACTORIES.items():
+        # Create the species' behaviour tree before measuring
+        factory(ecosystem, 0, 0).get_tree()
+        print('  {:<8}{:>8.0f} bytes'.format(name, measure_memory(ecosystem, factory, amount)))
+
+
+def reproducibility_check(seed, steps):
+    """Runs two ecosystems with the same seed, and prints whether their
+    population series are identical. Benchmark runs are only comparable if
+    they are."""
+    series = []
+    for _ in range(2):
+        ecosystem = Ecosystem(30, 20, seed=seed)
+        series.append([measure(step, ecosystem.run()) for step in range(steps)])
+    if series[0] == series[1]:
+        print('Runs with seed ' + str(seed) + ' are identical over ' + str(steps) + ' steps')
+        return True
+    step = next(step for step in range(steps) if series[0][step] != series[1][step])
+    print('Runs with seed ' + str(seed) + ' differ from step ' + str(step))
+    return False
+
+
+def density_config(width, height, density):
+    """Returns the ecosystem config with the initial densities of the suite
+    density of the given name, scaled to the map size."""
+    settings = SUITE_DENSITIES[density]
+    scale = width * height / SUITE_AREA
+    return EcosystemConfig(burrow_amount=max(1, round(settings['burrow_amount'] * scale)),
+                           fox_amount=max(1, round(settings['fox_amount'] * scale)),
+                           hives_per_tree=settings['hives_per_tree'])
+
+
+def run_throughput_case(width, height, density, steps, seed):
+    """Creates and runs one seeded ecosystem of the suite, and returns a dict
+    with the time taken to create it, the steps per second, the peak resident
+    memory of the process and the populations at the end."""
+    config = density_config(width, height, density)
+    start = time.perf_counter()
+    ecosystem = Ecosystem(width, height, config, seed)
+    build_seconds = time.perf_counter() - start
+    organisms = len(ecosystem.registry)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        ecosystem.run()
+    run_seconds = time.perf_counter() - start
+
+    metrics = measure(ecosystem.steps, ecosystem.registry)
+    return {
+        'width': width,
+        'height': height,
+        'density': density,
+        'burrow_amount': config.burrow_amount,
+        'fox_amount': config.fox_amount,
+        'hives_per_tree': config.hives_per_tree,
+        'initial_organisms': organisms,
+        'build_seconds': build_seconds,
+        'steps_per_second': steps / run_seconds if run_seconds > 0 else None,
+        # Kilobytes on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'final_populations': {name: metrics[name] for name in METRICS[1:6]}
+    }
+
+
+def throughput_suite(sizes, densities, steps, seed):
+    """Runs every map size and density of the suite, each in a new process so
+    the peak memory of one case does not carry over to the next, and returns
+    a list with the result of each case."""
+    results = []
+    for width, height in sizes:
+        for density in densities:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_throughput_case, width, height, density, steps, seed).result()
+            print('  {:>4}x{:<4}{:<9}{:>10.2f} steps/s{:>10.1f} MB'.format(
+                width, height, density, result['steps_per_second'], result['peak_rss_mb']))
+            results.append(result)
+    return results
+
+
+def time_calls(template, make_function, calls, repeats):
+    """Returns a dict with the shortest and the median time per call of a
+    function, over the given amount of repeats of the given amount of calls.
+    Every repeat times the function made by make_function for a new copy of
+    the template ecosystem, so no repeat or other benchmark sees the changes
+    made by an earlier one. The copying is not timed."""
+    times = []
+    for _ in range(repeats):
+        function = make_function(copy.deepcopy(template))
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        times.append((time.perf_counter() - start) / calls)
+    return {'calls': calls * repeats, 'min_seconds': min(times), 'median_seconds': statistics.median(times)}
+
+
+def micro_benchmarks(seed, repeats=MICRO_REPEATS):
+    """Times astar, get_organisms_from_maps, update_rabbit_smell_map,
+    simulate_rain and Ecosystem.run on copies of a seeded ecosystem, and
+    returns a dict with the timing of each."""
+    template = Ecosystem(MICRO_WIDTH, MICRO_HEIGHT, seed=seed)
+    for _ in range(MICRO_WARMUP_STEPS):
+        template.run()
+
+    # The same searches between open cells every time
+    random_generator = random.Random(seed)
+    open_cells = [(x, y) for x in range(template.width) for y in range(template.height)
+                  if not template.terrain_blocked_map[x, y]]
+    searches = [random_generator.sample(open_cells, 2) for _ in range(50)]
+
+    def make_search(ecosystem):
+        pairs = itertools.cycle(searches)
+
+        def search():
+            start, end = next(pairs)
+            astar_on_layers(1, ecosystem.terrain_blocked_map, ecosystem.occupancy_map, start[0], start[1], end[0], end[1])
+        return search
+
+    # Functions making the function to time for an ecosystem, and the amount
+    # of calls to time it over
+    benchmarks = {
+        'astar': (make_search, 50),
+        'get_organisms_from_maps': (lambda ecosystem: ecosystem.get_organisms_from_maps, 20),
+        'update_rabbit_smell_map': (lambda ecosystem: ecosystem.update_rabbit_smell_map, 200),
+        'simulate_rain': (lambda ecosystem: lambda: ecosystem.weather.simulate_rain(RainType.MEDIUM), 200),
+        'Ecosystem.run': (lambda ecosystem: ecosystem.run, 10)
+    }
+    results = {}
+    for name, (make_function, calls) in benchmarks.items():
+        results[name] = time_calls(template, make_function, calls, repeats)
+        print('  {:<24}{:>12.6f} s per call (median {:.6f})'.format(
+            name, results[name]['min_seconds'], results[name]['median_seconds']))
+    return results
+
+
+def compare(results, baseline):
+    """Prints the speed of each benchmark relative to a baseline written by
+    an earlier run, and whether the runs simulated the same populations."""
+    print('Compared to the baseline:')
+    cases = {(case['width'], case['height'], case['density']): case for case in baseline.get('throughput', [])}
+    for case in results.get('throughput', []):
+        old = cases.get((case['width'], case['height'], case['density']))
+        if old is None or not old['steps_per_second'] or not case['steps_per_second']:
+            continue
+        same = 'same populations' if old['final_populations'] == case['final_populations'] \
+            else 'DIFFERENT POPULATIONS'
+        print('  {:>4}x{:<4}{:<9}{:>7.2f}x steps/s{:>7.2f}x memory  {}'.format(
+            case['width'], case['height'], case['density'], case['steps_per_second'] / old['steps_per_second'],
+            case['peak_rss_mb'] / old['peak_rss_mb'], same))
+    for name, timing in results.get('micro', {}).items():
+        old = baseline.get('micro', {}).get(name)
+        if old is not None and timing['min_seconds'] > 0:
+            print('  {:<24}{:>7.2f}x faster'.format(name, old['min_seconds'] / timing['min_seconds']))
+
+
+def parse_sizes(sizes):
+    """Returns the map sizes of a comma separated list like 60x40,150x100."""
+    return [tuple(int(length) for length in size.split('x')) for size in sizes.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the ecosystem simulation.')
+    parser.add_argument(
+        '--memory',
+        dest='memory',
+        help='Report the memory used per organism type.',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--amount',
+        dest='amount',
+        help='The number of organisms to create per type (if --memory is set). Default 10000.',
+        type=int,
+        default=10000
+    )
+    parser.add_argument(
+        '--reproducibility',
+        dest='reproducibility',
+        help='Check that two runs with the same seed are identical.',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--steps',
+        dest='steps',
+        help='The number of steps to run (if --reproducibility is set). Default 200.',
+        type=int,
+        default=200
+    )
+    parser.add_argument(
+        '--suite',
+        dest='suite',
+        help='Measure the steps per second and peak memory over map sizes and initial densities.',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--sizes',
+        dest='sizes',
+        help='The map sizes of the suite (if --suite is set). Default ' +
+        ','.join(str(width) + 'x' + str(height) for width, height in SUITE_SIZES) + '.',
+        default=','.join(str(width) + 'x' + str(height) for width, height in SUITE_SIZES)
+    )
+    parser.add_argument(
+        '--densities',
+        dest='densities',
+        help='The initial densities of the suite (if --suite is set). Default ' + ','.join(SUITE_DENSITIES) + '.',
+        default=','.join(SUITE_DENSITIES)
+    )
+    parser.add_argument(
+        '--suite-steps',
+        dest='suite_steps',
+        help='The number of steps to run per case (if --suite is set). Default ' + str(SUITE_STEPS) + '.',
+        type=int,
+        default=SUITE_STEPS
+    )
+    parser.add_argument(
+        '--micro',
+        dest='micro',
+        help='Time astar, get_organisms_from_maps, update_rabbit_smell_map, simulate_rain and Ecosystem.run.',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--output',
+        dest='output',
+        help='JSON file to write the results of --suite and --micro to, to compare later runs against. ' +
+        'Not written by default.',
+        default=None
+    )
+    parser.add_argument(
+        '--compare',
+        dest='compare',
+        help='JSON file written by an earlier run to compare the results of --suite and --micro with.',
+        default=None
+    )
+    parser.add_argument(
+        '--seed',
+        dest='seed',
+        help='Seed of the ecosystems. Default 0.',
+        type=int,
+        default=0
+    )
+
+    args = parser.parse_args()
+
+    if args.memory:
+        memory_benchmark(args.amount, args.seed)
+    if args.reproducibility:
+        reproducibility_check(args.seed, args.steps)
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed
+    }
+    if args.suite:
+        print('Throughput over ' + str(args.suite_steps) + ' steps:')
+        results['suite_steps'] = args.suite_steps
+        results['throughput'] = throughput_suite(parse_sizes(args.sizes), args.densities.split(','),
+                                                 args.suite_steps, args.seed)
+    if args.micro:
+        print('Micro benchmarks:')
+        results['micro'] = micro_benchmarks(args.seed)
+    if args.suite or args.micro:
+        if args.output is not None:
+            with open(args.output, 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            print('Results written to ' + args.output)
+        if args.compare is not None:
+            with open(args.compare) as baseline:
+                compare(results, json.load(baseline))
+
+    if not args.memory and not args.reproducibility and not args.suite and not args.micro:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,10 @@ LIFE_LENGTH = 24 * 7
 
 class Burrow(organisms.Organism):
     """Defines the burrow, which is just an immovable object."""
+    __slots__ = (
+        'size', '_time_since_used'
+    )
+
     def __init__(self, ecosystem, x, y, size=-100):
         super().__init__(ecosystem, organisms.Type.BURROW, x, y)
         self.size = size
@@ -14,43 +18,40 @@ class Burrow(organisms.Organism):
     def get_image(self):
         return 'images/rabbitBurrow.png'
 
-    def generate_tree(self):
+    @classmethod
+    def generate_tree(cls):
         """Generates the tree for the burrow."""
         tree = bt.Sequence()
 
-        tree.add_child(self.IncreaseTimeSinceUsed(self))
+        tree.add_child(cls.IncreaseTimeSinceUsed())
 
 
         return tree
 
     class IncreaseTimeSinceUsed(bt.Action):
         """Keeps track of the time since last used."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            ecosystem = self.__outer._ecosystem
-            x = self.__outer.x
-            y = self.__outer.y
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            ecosystem = agent._ecosystem
+            x = agent.x
+            y = agent.y
 
             if len(ecosystem.animal_map[x][y]) > 1:
                 for animal in ecosystem.animal_map[x][y]:
                     if animal.type == organisms.Type.RABBIT:
-                        self.__outer._time_since_used = 0
-                        self._status = bt.Status.SUCCESS
-                        return
+                        agent._time_since_used = 0
+                        return bt.Status.SUCCESS
                         
-            self.__outer._time_since_used += 1
+            agent._time_since_used += 1
 
-            if self.__outer._time_since_used >= LIFE_LENGTH:
+            if agent._time_since_used >= parameters.burrow.LIFE_LENGTH:
                 for i in range(ecosystem.width):
                     for j in range(ecosystem.height):
                         for animal in ecosystem.animal_map[i][j]:
                             if animal.type == organisms.Type.RABBIT:
-                                if animal.burrow == self.__outer:
+                                if animal.burrow == agent:
                                     animal.burrow = None
-                ecosystem.animal_map[x][y].remove(self.__outer)
-                self._status = bt.Status.FAIL
+                ecosystem.remove_animal(agent)
+                return bt.Status.FAIL
             else:
-                self._status = bt.Status.SUCCESS
+                return bt.Status.SUCCESS
@@ -1,4 +1,9 @@
-import random
+import importlib
+import math
+import pickle
+import re
+import types
+import numpy as np
 from tree import Tree
 from grass import Grass
 from earth import Earth
@@ -11,8 +16,15 @@ from fox import Fox
 from den import Den
 from water import Water
 from weather import Weather
+from spatial_index import SpatialIndex
+from registry import OrganismRegistry
+from rng import EcosystemRandom
+from event_log import Event, type_value
+from water_field import WaterField, WaterCell
+from path_cache import PathCache
+from flow_field import FlowFields
+from hierarchical_paths import HierarchicalPathfinder, CLUSTER_SIZE
 from helpers import Direction, EuclidianDistance, InverseLerp
-import constants
 import organisms
 
 
@@ -21,23 +33,102 @@ GRASS_INIT_PERCENTAGE = 0.8
 FLOWER_PERCENTAGE = 0.1
 INITAL_WATER_MAX_AMOUNT = 500
 WATER_POOLS = [20, 10, 5, 5, 3, 3, 3, 3, 2, 2, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1]
-WATER_POOLS_POSITIONS = []
 ANIMAL_CELL_CAPACITY = 100
-BURROW_AMOUNT = random.randint(30, 40)
+TREE_OCCUPIED_SPACE = 50
+BURROW_AMOUNT_RANGE = (30, 40)
 BURROW_RABBIT_MIN_AMOUNT = 3
 BURROW_RABBIT_MAX_AMOUNT = 5
 HIVES_PER_TREE = 0.07
 HIVE_BEE_MIN_AMOUNT = 5
 HIVE_BEE_MAX_AMOUNT = 9
-FOX_AMOUNT = random.randint(5, 10)
+FOX_AMOUNT_RANGE = (5, 10)
+SNAPSHOT_VERSION = 5 # Increased when the saved state of an ecosystem changes
+# Modules with the tuning constants of the organisms, the water and the weather
+PARAMETER_MODULES = ['bee', 'burrow', 'constants', 'den', 'earth', 'flower', 'fox', 'grass', 'hive', 'rabbit',
+                     'water', 'weather']
+CONSTANT_NAME = re.compile(r'[A-Z][A-Z0-9_]*$')
+
+
+class SnapshotVersionError(ValueError):
+    """Raised when loading a snapshot saved with another snapshot version."""
+
+
+class Parameters():
+    """The tuning constants of the organisms, the water and the weather for one
+    run. The constants of every module are kept in a namespace named after the
+    module, for example parameters.rabbit.HUNGER_SEEK_THRESHOLD, and take the
+    value of the module constant unless a value is given for them, keyed on
+    'module.CONSTANT'. The simulation only reads the constants from the
+    parameters of its ecosystem, so runs with different values can share a
+    process."""
+    def __init__(self, values=None):
+        for module_name in PARAMETER_MODULES:
+            module = importlib.import_module(module_name)
+            setattr(self, module_name, types.SimpleNamespace(**{
+                name: value for name, value in vars(module).items() if CONSTANT_NAME.match(name)}))
+        for name, value in (values or {}).items():
+            module_name, _, constant = name.rpartition('.')
+            if module_name not in PARAMETER_MODULES or not hasattr(getattr(self, module_name), constant):
+                raise ValueError('Unknown constant ' + name)
+            setattr(getattr(self, module_name), constant, value)
+
+
+class EcosystemConfig():
+    """Settings for creating an ecosystem. Settings left as None take the
+    value of the module constant when the config is created, except for the
+    burrow and fox amounts which are drawn from their ranges for every
+    ecosystem created with the config.
+
+    If storms is set, rain falls from storm cells drifting with the wind
+    instead of evenly over the map. If flow_fields is set, paths to goals
+    shared by many animals follow a distance field per goal instead of being
+    searched for with astar. If hierarchical_paths is set, paths to goals
+    further away than a cluster are found on a graph of the clusters the map
+    is split into, which keeps them cheap on large maps.
+
+    Parameters holds values for the tuning constants of the run, keyed on
+    'module.CONSTANT', see Parameters."""
+    def __init__(self, storms=False, flow_fields=False, hierarchical_paths=False,
+                 tree_percentage=None, grass_init_percentage=None, flower_percentage=None,
+                 hives_per_tree=None, water_pools=None, burrow_amount=None, fox_amount=None, parameters=None):
+        self.storms = storms
+        self.flow_fields = flow_fields
+        self.hierarchical_paths = hierarchical_paths
+        self.tree_percentage = TREE_PERCENTAGE if tree_percentage is None else tree_percentage
+        self.grass_init_percentage = GRASS_INIT_PERCENTAGE if grass_init_percentage is None else grass_init_percentage
+        self.flower_percentage = FLOWER_PERCENTAGE if flower_percentage is None else flower_percentage
+        self.hives_per_tree = HIVES_PER_TREE if hives_per_tree is None else hives_per_tree
+        self.water_pools = list(WATER_POOLS if water_pools is None else water_pools)
+        self.burrow_amount = burrow_amount
+        self.fox_amount = fox_amount
+        self.parameters = Parameters(parameters)
 
 
 class Ecosystem():
     """Defines an ecosystem, which starts out as a map of a forest/field with
-    initial populations."""
-    def __init__(self, width, height):
+    initial populations. The map is generated from the given config, or from
+    the default settings if no config is given. All state of the world is kept
+    on the ecosystem, so any number of ecosystems can be created in the same
+    process. All random numbers are drawn from the streams of the ecosystem's
+    rng, so ecosystems created with the same seed run the same way. If an
+    event log is given, all changes to the maps are recorded in it, starting
+    with the creation of the map."""
+    def __init__(self, width, height, config=None, seed=None, event_log=None):
         self.width = width
         self.height = height
+        self.rng = EcosystemRandom(seed)
+        self.steps = 0 # Time steps run so far
+        self.event_log = event_log
+        self.config = config if config is not None else EcosystemConfig()
+        self.parameters = self.config.parameters
+        self.burrow_amount = self.config.burrow_amount
+        if self.burrow_amount is None:
+            self.burrow_amount = self.rng.world.randint(*BURROW_AMOUNT_RANGE)
+        self.fox_amount = self.config.fox_amount
+        if self.fox_amount is None:
+            self.fox_amount = self.rng.world.randint(*FOX_AMOUNT_RANGE)
+        # Centers of the water pools, used for the initial water levels
+        self.water_pools_positions = []
 
 
         self.water_map = []
@@ -65,46 +156,130 @@ class Ecosystem():
             for y in range(self.height):
                 self.animal_map[x].append([])
 
-        self.nectar_smell_map = []
-        for x in range(self.width):
-            self.nectar_smell_map.append([])
-            for y in range(self.height):
-                self.nectar_smell_map[x].append(0)
+        # Smell maps. Nectar is deposited by the flowers in a source map and is
+        # spread with the wind when the smell map is read.
+        self.nectar_smell_source_map = np.zeros((self.width, self.height), dtype=np.float32)
+        self._nectar_smell_map = np.zeros((self.width, self.height), dtype=np.float32)
+        self._nectar_smell_spread = True
 
-        self.rabbit_smell_map = []
-        for x in range(self.width):
-            self.rabbit_smell_map.append([])
-            for y in range(self.height):
-                self.rabbit_smell_map[x].append(0)
+        self.rabbit_smell_map = np.zeros((self.width, self.height), dtype=np.float32)
+
+        # Occupancy layers used when checking if animals can walk into a cell.
+        # The occupancy map holds the space taken up by the animals (and trees)
+        # in each cell, and the blocked map marks terrain that cannot be walked on.
+        self.occupancy_map = np.zeros((self.width, self.height))
+        self.terrain_blocked_map = np.zeros((self.width, self.height), dtype=bool)
+
+        # Paths found on the layers above, invalidated when the layers change
+        self.create_pathfinders()
+
+        # Per type animal counts used by perception checks
+        self.spatial_index = SpatialIndex(self.animal_map, self.width, self.height)
 
-        self.weather = Weather(self)
+        # Water amounts of the water pools, earth and grass
+        self.water_field = WaterField(self.width, self.height, self.parameters)
+
+        # Live registry of all organisms placed in the maps
+        self.registry = OrganismRegistry()
+
+        # Organisms whose image may have changed since the set was last
+        # emptied, only kept once track_image_changes is called
+        self.changed_images = None
+        self._low_water = None
+
+        self.weather = Weather(self, storms=self.config.storms)
 
         # Add initial organisms
         self.initialize_forest()
 
+    def create_pathfinders(self):
+        """Creates the empty path cache and the pathfinders set in the config."""
+        self.path_cache = PathCache(self.width, self.height, ANIMAL_CELL_CAPACITY)
+        self.flow_fields = FlowFields(self.width, self.height, ANIMAL_CELL_CAPACITY) if self.config.flow_fields else None
+        self.hierarchical_paths = HierarchicalPathfinder(self.width, self.height) \
+            if self.config.hierarchical_paths else None
+
+    def __getstate__(self):
+        # The pathfinders only cache paths, and give the same paths when they
+        # are created again after loading
+        state = self.__dict__.copy()
+        state['path_cache'] = None
+        state['flow_fields'] = None
+        state['hierarchical_paths'] = None
+        # The event log is attached again by whoever continues the run
+        state['event_log'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.create_pathfinders()
+
+    def save(self, path):
+        """Saves the full state of the ecosystem, including all organisms, the
+        weather and the random number streams, to the given file. Loading it
+        continues the run exactly where it was saved."""
+        with open(path, 'wb') as snapshot:
+            # The header comes first, so it can be read without the ecosystem
+            pickle.dump((SNAPSHOT_VERSION, self.steps), snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def snapshot_steps(path):
+        """Returns the amount of steps the ecosystem in a snapshot had run."""
+        with open(path, 'rb') as snapshot:
+            version, steps = pickle.load(snapshot)
+        return steps
+
+    @staticmethod
+    def load(path, seed=None):
+        """Loads an ecosystem saved with save. If a seed is given the random
+        number streams are seeded again, so that several different runs can
+        be branched off from the same snapshot.
+
+        Snapshots are pickles, and loading one can run any code put in it, so
+        only load snapshots from trusted sources, such as your own runs. A
+        SnapshotVersionError is raised, before the ecosystem is unpickled, if
+        the snapshot was saved by a version of the simulation with a
+        different saved state."""
+        with open(path, 'rb') as snapshot:
+            header = pickle.load(snapshot)
+            if not isinstance(header, tuple) or len(header) != 2:
+                raise ValueError(str(path) + ' is not an ecosystem snapshot')
+            version, steps = header
+            if version != SNAPSHOT_VERSION:
+                raise SnapshotVersionError('Snapshot ' + str(path) + ' of step ' + str(steps) +
+                                           ' was saved with snapshot version ' + str(version) +
+                                           ', but this version of the simulation loads version ' +
+                                           str(SNAPSHOT_VERSION) + '. Continue it with the version of ' +
+                                           'the simulation it was saved with.')
+            ecosystem = pickle.load(snapshot)
+        if seed is not None:
+            ecosystem.rng.reseed(seed)
+        return ecosystem
+
     def initialize_forest(self):
         """Adds initial organisms to the map."""
 
         directions = list(Direction)
         # Water map
-        for pool_size in WATER_POOLS:
-            rand_x = random.randint(0, self.width - 1)
-            rand_y = random.randint(0, self.height - 1)
+        for pool_size in self.config.water_pools:
+            rand_x = self.rng.world.randint(0, self.width - 1)
+            rand_y = self.rng.world.randint(0, self.height - 1)
             while self.water_map[rand_x][rand_y]:
-                rand_x = random.randint(0, self.width - 1)
-                rand_y = random.randint(0, self.height - 1)
+                rand_x = self.rng.world.randint(0, self.width - 1)
+                rand_y = self.rng.world.randint(0, self.height - 1)
             water_pools_added = 0
             positions = [(rand_x,rand_y)]
-            WATER_POOLS_POSITIONS.append((rand_x,rand_y))
+            self.water_pools_positions.append((rand_x,rand_y))
             while water_pools_added < pool_size and positions:
                 # Breadth first add water pools around
                 x, y = positions.pop(0)
                 if not self.water_map[x][y]:
                     water = Water(self, x, y)
-                    self.water_map[x][y] = water
+                    self.set_water(x, y, water)
                     water_pools_added += 1
                     # Insert all neighbors
-                    random.shuffle(directions) # shuffle for a bit random shapes
+                    self.rng.world.shuffle(directions) # shuffle for a bit random shapes
                     for dir in directions:
                         new_x = x + dir.value[0]
                         new_y = y + dir.value[1]
@@ -121,26 +296,26 @@ class Ecosystem():
                 # check if water
                 if self.water_map[x][y]:
                     continue
-                if random.random() <= TREE_PERCENTAGE:
+                if self.rng.world.random() <= self.config.tree_percentage:
                     tree = Tree(self, x, y)
-                    self.plant_map[x][y] = tree
-                    if random.random() <= HIVES_PER_TREE:
+                    self.set_plant(x, y, tree)
+                    if self.rng.world.random() <= self.config.hives_per_tree:
                         hive = Hive(self, x, y)
-                        self.animal_map[x][y].append(hive)
-                        bee_amount = random.randint(HIVE_BEE_MIN_AMOUNT, HIVE_BEE_MAX_AMOUNT)
-                        bee = Bee(self, x, y, hive=hive, scout=True, age=random.randint(0,24*150))
+                        self.add_animal(hive)
+                        bee_amount = self.rng.world.randint(HIVE_BEE_MIN_AMOUNT, HIVE_BEE_MAX_AMOUNT)
+                        bee = Bee(self, x, y, hive=hive, scout=True, age=self.rng.world.randint(0,24*150))
                         hive.bees.append(bee)
-                        self.animal_map[x][y].append(bee)
+                        self.add_animal(bee)
                         for _ in range(bee_amount):
-                            bee = Bee(self, x, y, hive=hive, scout=False,age=random.randint(0,24*150))
-                            self.animal_map[x][y].append(bee)
+                            bee = Bee(self, x, y, hive=hive, scout=False,age=self.rng.world.randint(0,24*150))
+                            self.add_animal(bee)
                             hive.bees.append(bee)
-                elif random.random() <= GRASS_INIT_PERCENTAGE:
-                    grass = Grass(self, x, y, random.randint(-80, 100), None, self.get_initial_water_level(x,y))
-                    self.plant_map[x][y] = grass
+                elif self.rng.world.random() <= self.config.grass_init_percentage:
+                    grass = Grass(self, x, y, self.rng.world.randint(-80, 100), None, self.get_initial_water_level(x,y))
+                    self.set_plant(x, y, grass)
                 else:
                     earth = Earth(self, x, y, self.get_initial_water_level(x,y))
-                    self.plant_map[x][y] = earth
+                    self.set_plant(x, y, earth)
 
         # Flower map
         from organisms import Type
@@ -148,29 +323,28 @@ class Ecosystem():
             for y in range(self.height):
                 if self.water_map[x][y]:
                     continue
-                if random.random() <= FLOWER_PERCENTAGE:
+                if self.rng.world.random() <= self.config.flower_percentage:
                     if self.plant_map[x][y] and self.plant_map[x][y].type == Type.TREE:
                         continue
-                    for _ in range(random.randint(1, 4)):
-                        flower = Flower(self, x, y, random.randint(-50, 100), nectar=random.randint(0,100),
-                                        has_seed=random.choice([True, False]))
-                        self.flower_map[x][y].append(flower)
+                    for _ in range(self.rng.world.randint(1, 4)):
+                        flower = Flower(self, x, y, self.rng.world.randint(-50, 100), nectar=self.rng.world.randint(0,100),
+                                        has_seed=self.rng.world.choice([True, False]))
+                        self.add_flower(flower)
 
         # Animal map
-        import numpy as np
         # Rabbits
-        for _ in range(BURROW_AMOUNT):
-            x = random.randint(0, self.width-1)
-            y = random.randint(0, self.height-1)
+        for _ in range(self.burrow_amount):
+            x = self.rng.world.randint(0, self.width-1)
+            y = self.rng.world.randint(0, self.height-1)
             while self.water_map[x][y]:
-                x = random.randint(0, self.width-1)
-                y = random.randint(0, self.height-1)
+                x = self.rng.world.randint(0, self.width-1)
+                y = self.rng.world.randint(0, self.height-1)
             burrow = Burrow(self, x, y)
-            self.animal_map[x][y].append(burrow)
-            rabbit_amount = random.randint(BURROW_RABBIT_MIN_AMOUNT, BURROW_RABBIT_MAX_AMOUNT)
+            self.add_animal(burrow)
+            rabbit_amount = self.rng.world.randint(BURROW_RABBIT_MIN_AMOUNT, BURROW_RABBIT_MAX_AMOUNT)
             for _ in range(rabbit_amount):
-                dx = random.randint(-3, 3)
-                dy = random.randint(-3, 3)
+                dx = self.rng.world.randint(-3, 3)
+                dy = self.rng.world.randint(-3, 3)
 
                 if x + dx < 0 or x + dx >= self.width or y + dy < 0 or y + dy >= self.height:
                     continue
@@ -179,30 +353,206 @@ class Ecosystem():
                     continue
 
                 rabbit = Rabbit(self, x + dx, y + dy,
-                                random.choice([True, False]),
+                                self.rng.world.choice([True, False]),
                                 adult=True, burrow=burrow,
-                                age=random.randint(24*30, 24*30*3),
-                                reproduction_timer=random.randint(0, 24*6),
-                                genetics_factor=np.random.normal(1, 0.1))
-                self.animal_map[x + dx][y + dy].append(rabbit)
+                                age=self.rng.world.randint(24*30, 24*30*3),
+                                reproduction_timer=self.rng.world.randint(0, 24*6),
+                                genetics_factor=self.rng.world.gauss(1, 0.1))
+                self.add_animal(rabbit)
 
         # Foxes
-        for _ in range(FOX_AMOUNT):
-            x = random.randint(0, self.width-1)
-            y = random.randint(0, self.height-1)
+        for _ in range(self.fox_amount):
+            x = self.rng.world.randint(0, self.width-1)
+            y = self.rng.world.randint(0, self.height-1)
             while self.water_map[x][y]:
-                x = random.randint(0, self.width-1)
-                y = random.randint(0, self.height-1)
+                x = self.rng.world.randint(0, self.width-1)
+                y = self.rng.world.randint(0, self.height-1)
             fox = Fox(self, x, y,
-                      random.choice([True, False]),
-                      adult=True, age=random.randint(24*30*2, 24*30*6),
-                      genetics_factor=np.random.normal(1, 0.1))
-            self.animal_map[x][y].append(fox)
-
-
+                      self.rng.world.choice([True, False]),
+                      adult=True, age=self.rng.world.randint(24*30*2, 24*30*6),
+                      genetics_factor=self.rng.world.gauss(1, 0.1))
+            self.add_animal(fox)
+
+
+
+    def add_animal(self, animal, index=None):
+        """Places the animal in the animal map at its position. If an index is
+        given the animal is inserted at that index in the cell."""
+        if index is None:
+            self.animal_map[animal.x][animal.y].append(animal)
+        else:
+            self.animal_map[animal.x][animal.y].insert(index, animal)
+        self.registry.add(animal)
+        self.spatial_index.add(animal)
+        self.refresh_occupancy(animal.x, animal.y)
+        if self.event_log is not None:
+            self.event_log.record(self.steps, Event.ANIMAL_ADDED, animal.type.value, x=animal.x, y=animal.y)
+
+    def remove_animal(self, animal):
+        """Removes the animal from the animal map."""
+        self.animal_map[animal.x][animal.y].remove(animal)
+        self.registry.remove(animal)
+        self.spatial_index.remove(animal)
+        self.refresh_occupancy(animal.x, animal.y)
+        if self.event_log is not None:
+            self.event_log.record(self.steps, Event.ANIMAL_REMOVED, animal.type.value, x=animal.x, y=animal.y)
+
+    def move_animal(self, animal, x, y):
+        """Moves the animal to the given cell."""
+        if self.event_log is not None:
+            self.event_log.record(self.steps, Event.ANIMAL_MOVED, animal.type.value,
+                                  x=animal.x, y=animal.y, other_x=x, other_y=y)
+        self.animal_map[animal.x][animal.y].remove(animal)
+        self.spatial_index.remove(animal)
+        self.refresh_occupancy(animal.x, animal.y)
+        animal.x = x
+        animal.y = y
+        self.animal_map[x][y].append(animal)
+        self.spatial_index.add(animal)
+        self.refresh_occupancy(x, y)
+
+    def set_animal_size(self, animal, size):
+        """Changes the size of an animal placed in the animal map."""
+        animal.size = size
+        self.refresh_occupancy(animal.x, animal.y)
+
+    def set_grass_amount(self, grass, amount):
+        """Changes the amount of a grass, marking its image as changed when the
+        amount crosses one of the amounts its image changes at."""
+        if self.changed_images is not None:
+            threshold = self.parameters.grass.REPRODUCTION_THRESHOLD
+            if (grass.amount <= 0) != (amount <= 0) or (grass.amount < threshold) != (amount < threshold):
+                self.changed_images.add(grass)
+        grass.amount = amount
+
+    def track_image_changes(self):
+        """Starts keeping the organisms whose image may have changed in
+        changed_images, for drawing only the sprites that changed. The
+        visualization empties the set after each frame."""
+        self.changed_images = set()
+        self._low_water = self.low_water()
+
+    def mark_image_changed(self, organism):
+        """Adds the organism to the changed images if they are tracked."""
+        if self.changed_images is not None:
+            self.changed_images.add(organism)
+
+    def low_water(self):
+        """Returns an array marking the water pools drawn as low."""
+        water_field = self.water_field
+        parameters = self.parameters.water
+        return (water_field.kind == organisms.Type.WATER.value) & \
+            (water_field.amount < parameters.WATER_POOL_CAPACITY * parameters.LOW_WATER_SHARE)
+
+    def mark_water_image_changes(self):
+        """Marks the images of the water pools that became low or filled up
+        again since the last call as changed."""
+        low_water = self.low_water()
+        for x, y in zip(*np.nonzero(low_water != self._low_water)):
+            if self.water_map[x][y]:
+                self.changed_images.add(self.water_map[x][y])
+        self._low_water = low_water
+
+    def set_water(self, x, y, water):
+        """Sets or removes (if water is None) the water pool in the given cell."""
+        if self.event_log is not None and (water is not None or self.water_map[x][y] is not None):
+            event = Event.FLOODED if water is not None else Event.DRIED_OUT
+            self.event_log.record(self.steps, event, type_value(water), x=x, y=y)
+        if self.water_map[x][y]:
+            self.registry.remove(self.water_map[x][y])
+            self.water_field.detach(self.water_map[x][y])
+        self.water_map[x][y] = water
+        if water:
+            self.registry.add(water)
+            self.water_field.attach(water)
+        if self.terrain_blocked_map[x, y] != (water is not None):
+            self.terrain_blocked_map[x, y] = water is not None
+            self.path_cache.mark_terrain_changed(x, y)
+            if self.flow_fields is not None:
+                self.flow_fields.mark_terrain_changed(x, y)
+            if self.hierarchical_paths is not None:
+                self.hierarchical_paths.mark_terrain_changed(x, y)
+
+    def set_plant(self, x, y, plant):
+        """Sets or removes (if plant is None) the plant in the given cell."""
+        if self.event_log is not None:
+            self.event_log.record(self.steps, Event.PLANT_SET, type_value(plant), x=x, y=y)
+        if self.plant_map[x][y]:
+            self.registry.remove(self.plant_map[x][y])
+            if isinstance(self.plant_map[x][y], WaterCell):
+                self.water_field.detach(self.plant_map[x][y])
+        self.plant_map[x][y] = plant
+        if plant:
+            self.registry.add(plant)
+            if isinstance(plant, WaterCell):
+                self.water_field.attach(plant)
+        self.refresh_occupancy(x, y)
+
+    def add_flower(self, flower):
+        """Places the flower in the flower map at its position."""
+        self.flower_map[flower.x][flower.y].append(flower)
+        self.registry.add(flower)
+        if self.event_log is not None:
+            self.event_log.record(self.steps, Event.FLOWER_ADDED, flower.type.value, x=flower.x, y=flower.y)
+
+    def remove_flower(self, flower):
+        """Removes the flower from the flower map."""
+        self.flower_map[flower.x][flower.y].remove(flower)
+        self.registry.remove(flower)
+        if self.event_log is not None:
+            self.event_log.record(self.steps, Event.FLOWER_REMOVED, flower.type.value, x=flower.x, y=flower.y)
+
+    def clear_flowers(self, x, y):
+        """Removes all flowers in the given cell."""
+        for flower in self.flower_map[x][y]:
+            self.registry.remove(flower)
+            if self.event_log is not None:
+                self.event_log.record(self.steps, Event.FLOWER_REMOVED, flower.type.value, x=x, y=y)
+        self.flower_map[x][y].clear()
+
+    def record_eaten(self, eater, food):
+        """Records in the event log, if there is one, that the eater ate the
+        food."""
+        if self.event_log is not None:
+            self.event_log.record(self.steps, Event.EATEN, eater.type.value, food.type.value,
+                                  food.x, food.y, eater.x, eater.y)
+
+    def refresh_occupancy(self, x, y):
+        """Recomputes the space taken up in the given cell."""
+        occupied_space = 0
+        if self.plant_map[x][y] and self.plant_map[x][y].type == organisms.Type.TREE:
+            occupied_space = TREE_OCCUPIED_SPACE
+        for animal in self.animal_map[x][y]:
+            occupied_space += animal.size
+        if self.occupancy_map[x, y] != occupied_space:
+            self.path_cache.mark_occupancy_changed(x, y, self.occupancy_map[x, y], occupied_space)
+            self.occupancy_map[x, y] = occupied_space
+
+    def find_path(self, traverser, start_x, start_y, end_x, end_y, max_path_length=math.inf, shared_goal=False):
+        """Returns a list of tuples as a path from the given start to the given
+        end for the traverser. Paths are looked up in the path cache when the
+        cells they depend on have not changed. If the end is a goal shared by
+        many animals and flow fields are used, the path follows the flow field
+        of the end instead. Paths to far away goals are found with the
+        hierarchical pathfinder if it is used."""
+        if shared_goal and self.flow_fields is not None:
+            return self.flow_fields.find_path(self.terrain_blocked_map, self.occupancy_map, traverser.size,
+                                              start_x, start_y, end_x, end_y, max_path_length)
+        if self.hierarchical_paths is not None and max(abs(end_x - start_x), abs(end_y - start_y)) > CLUSTER_SIZE:
+            path = self.hierarchical_paths.find_path(self.terrain_blocked_map, self.occupancy_map, traverser.size,
+                                                     start_x, start_y, end_x, end_y, max_path_length)
+            if path is not None:
+                return path
+        return self.path_cache.find_path(self.terrain_blocked_map, self.occupancy_map, traverser.size,
+                                         start_x, start_y, end_x, end_y, max_path_length)
+
+    def has_room(self, x, y, size):
+        """Checks if an animal of the given size can walk into the given cell."""
+        return not self.terrain_blocked_map[x, y] and self.occupancy_map[x, y] + size <= ANIMAL_CELL_CAPACITY
 
     def get_organisms_from_maps(self):
-        """Looks through the maps to find organisms, and returns these in a list."""
+        """Looks through the maps to find organisms, and returns these in a list.
+        This is slow on large maps, use the registry to get the organisms."""
         organisms = []
 
         # Water map
@@ -235,9 +585,10 @@ class Ecosystem():
     def get_initial_water_level(self, x, y):
         """Calulate initial water level on earth and grass depending on the proximity to water supplies"""
         max_possible_distance = EuclidianDistance(0, 0, self.width - 1, self.height - 1)
-        closest_lake_distance = EuclidianDistance(x, y, WATER_POOLS_POSITIONS[0][0], WATER_POOLS_POSITIONS[0][1])
+        closest_lake_distance = EuclidianDistance(x, y, self.water_pools_positions[0][0],
+                                                  self.water_pools_positions[0][1])
         min_distance_lake_index = 0
-        for (index, lake_position) in enumerate(WATER_POOLS_POSITIONS):
+        for (index, lake_position) in enumerate(self.water_pools_positions):
             distace = EuclidianDistance(x, y , lake_position[0], lake_position[1])
             if distace < closest_lake_distance:
                 closest_lake_distance = distace
@@ -245,31 +596,58 @@ class Ecosystem():
 
         return INITAL_WATER_MAX_AMOUNT * (1 - InverseLerp(0, max_possible_distance, closest_lake_distance))
 
+    def add_nectar_smell(self, x, y, nectar):
+        """Adds the smell of a flower with the given amount of nectar."""
+        self.nectar_smell_source_map[x, y] += nectar
+        self._nectar_smell_spread = False
+
+    @property
+    def nectar_smell_map(self):
+        """The nectar smell of all flowers in this time step, carried further
+        in the direction of the wind."""
+        if not self._nectar_smell_spread:
+            self.spread_nectar_smell()
+        return self._nectar_smell_map
+
+    def spread_nectar_smell(self):
+        """Spreads the nectar smell from the sources in rays in every
+        direction. The smell gets weaker further away, and the ray in the
+        direction of the wind is longer."""
+        source = self.nectar_smell_source_map
+        smell = self._nectar_smell_map
+        smell[:] = source
+        wind_direction, wind_speed = self.weather.get_wind_velocity()
+        for direction in list(Direction):
+            wind_effect = 0
+            if direction.value == wind_direction.value:
+                wind_effect += wind_speed
+            for i in range(0, self.parameters.constants.NECTAR_SMELL_RANGE + wind_effect):
+                dx = direction.value[0] * (i + 1)
+                dy = direction.value[1] * (i + 1)
+                if abs(dx) >= self.width or abs(dy) >= self.height:
+                    break
+                smell[max(0, dx):self.width + min(0, dx), max(0, dy):self.height + min(0, dy)] += \
+                    source[max(0, -dx):self.width - max(0, dx), max(0, -dy):self.height - max(0, dy)] / (i + 1)
+        self._nectar_smell_spread = True
+
     def reset_nectar_smell_map(self):
-        for x in range(self.width):
-            for y in range(self.height):
-                self.nectar_smell_map[x][y] = 0
+        self.nectar_smell_source_map[:] = 0
+        self._nectar_smell_map[:] = 0
+        self._nectar_smell_spread = True
 
     def update_rabbit_smell_map(self):
-        from organisms import Type
-        for x in range(self.width):
-            for y in range(self.height):
-                found_rabbit = False
-                for animal in self.animal_map[x][y]:
-                    if animal.type == Type.RABBIT:
-                        found_rabbit = True
-                        break
-
-                if found_rabbit:
-                    self.rabbit_smell_map[x][y] = 1
-                else:
-                    self.rabbit_smell_map[x][y] *= 0.9
-                    if self.rabbit_smell_map[x][y] <= 0.1:
-                        self.rabbit_smell_map[x][y] = 0
+        found_rabbit = self.spatial_index.counts(organisms.Type.RABBIT) > 0
+        self.rabbit_smell_map *= 0.9
+        self.rabbit_smell_map[self.rabbit_smell_map <= 0.1] = 0
+        self.rabbit_smell_map[found_rabbit] = 1
 
     def run(self):
         """Run the behaviour of all organisms for one time step."""
-        organisms = self.get_organisms_from_maps()
+        # Changes made in the step are recorded as done after it
+        self.steps += 1
+
+        # Organisms created during the step start running in the next step
+        organisms = self.registry.snapshot()
 
         self.weather.simulate_weather()
 
@@ -278,7 +656,10 @@ class Ecosystem():
         for organism in organisms:
             organism.run()
 
-        organisms = self.get_organisms_from_maps()
+        self.water_field.step()
+        if self.changed_images is not None:
+            self.mark_water_image_changes()
+
         self.reset_nectar_smell_map()
 
-        return organisms
+        return self.registry
@@ -0,0 +1,245 @@
+import argparse
+import os
+import struct
+from enum import Enum
+import numpy as np
+from organisms import Type
+
+EVENT_LOG_MAGIC = b'EVLG'
+EVENT_LOG_BUFFER_SIZE = 2 ** 20 # Bytes written to the file at once
+HEADER = struct.Struct('<4sHH') # Magic, width and height of the map
+RECORD = struct.Struct('<IBBBxhhhh') # Step, event, type, other type, x, y, other x, other y
+NO_TYPE = 255
+
+# The records as a numpy structured type, for reading a whole log at once
+RECORD_DTYPE = np.dtype([
+    ('step', '<u4'),
+    ('event', 'u1'),
+    ('type', 'u1'),
+    ('other_type', 'u1'),
+    ('padding', 'u1'),
+    ('x', '<i2'),
+    ('y', '<i2'),
+    ('other_x', '<i2'),
+    ('other_y', '<i2')
+])
+
+
+class Event(Enum):
+    """The changes to the ecosystem recorded in the event log."""
+    ANIMAL_ADDED = 0 # Births, and animals and homes placed on the map
+    ANIMAL_REMOVED = 1 # Deaths, and animals and homes taken off the map
+    ANIMAL_MOVED = 2 # From (x, y) to (other x, other y)
+    EATEN = 3 # The animal at (other x, other y) ate food of the other type at (x, y)
+    FLOODED = 4 # A water pool was placed
+    DRIED_OUT = 5 # A water pool was removed
+    PLANT_SET = 6 # The plant of a cell was replaced, the type is NO_TYPE if it was removed
+    FLOWER_ADDED = 7
+    FLOWER_REMOVED = 8
+
+
+def type_value(organism):
+    """Returns the type value of an organism for a record."""
+    return NO_TYPE if organism is None else organism.type.value
+
+
+class EventLog():
+    """Append-only log of the changes to an ecosystem, written as fixed size
+    binary records through a large write buffer. Each record holds the amount
+    of steps after which the change had happened, so changes made while the
+    map is created have step 0."""
+    def __init__(self, path, width, height):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab', buffering=EVENT_LOG_BUFFER_SIZE)
+        if new_file:
+            self._file.write(HEADER.pack(EVENT_LOG_MAGIC, width, height))
+
+    def record(self, step, event, type=NO_TYPE, other_type=NO_TYPE, x=0, y=0, other_x=0, other_y=0):
+        """Appends a record to the log."""
+        self._file.write(RECORD.pack(step, event.value, type, other_type, x, y, other_x, other_y))
+
+    def flush(self):
+        """Writes the buffered records to the file."""
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def truncate_log(path, step):
+    """Removes the records of the changes made after the given step from an
+    event log, so that a run resumed from a snapshot of that step does not
+    record its changes twice."""
+    width, height, records = read_log(path)
+    kept = np.searchsorted(records['step'], step, side='right')
+    with open(path, 'r+b') as log:
+        log.truncate(HEADER.size + kept * RECORD_DTYPE.itemsize)
+
+
+class GridState():
+    """What is in each cell of the map: the amount of animals of every type,
+    the amount of flowers, the plant type and whether there is a water pool."""
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.steps = 0
+        self.animals = np.zeros((len(Type), width, height), dtype=np.int32)
+        self.flowers = np.zeros((width, height), dtype=np.int32)
+        self.plants = np.full((width, height), NO_TYPE, dtype=np.uint8)
+        self.water = np.zeros((width, height), dtype=bool)
+
+    @classmethod
+    def from_ecosystem(cls, ecosystem):
+        """Returns the grid state of an ecosystem."""
+        state = cls(ecosystem.width, ecosystem.height)
+        state.steps = ecosystem.steps
+        for x in range(ecosystem.width):
+            for y in range(ecosystem.height):
+                for animal in ecosystem.animal_map[x][y]:
+                    state.animals[animal.type.value, x, y] += 1
+                state.flowers[x, y] = len(ecosystem.flower_map[x][y])
+                state.plants[x, y] = type_value(ecosystem.plant_map[x][y])
+                state.water[x, y] = ecosystem.water_map[x][y] is not None
+        return state
+
+    def apply(self, records):
+        """Applies the changes of the given records, in order. Animal and
+        flower amounts only add up, so they are applied all at once, and for
+        plants and water the last record of each cell wins."""
+        event = records['event']
+        x = records['x']
+        y = records['y']
+
+        added = event == Event.ANIMAL_ADDED.value
+        np.add.at(self.animals, (records['type'][added], x[added], y[added]), 1)
+        removed = event == Event.ANIMAL_REMOVED.value
+        np.subtract.at(self.animals, (records['type'][removed], x[removed], y[removed]), 1)
+        moved = event == Event.ANIMAL_MOVED.value
+        np.subtract.at(self.animals, (records['type'][moved], x[moved], y[moved]), 1)
+        np.add.at(self.animals, (records['type'][moved], records['other_x'][moved], records['other_y'][moved]), 1)
+
+        np.add.at(self.flowers, (x[event == Event.FLOWER_ADDED.value], y[event == Event.FLOWER_ADDED.value]), 1)
+        np.subtract.at(self.flowers, (x[event == Event.FLOWER_REMOVED.value],
+                                      y[event == Event.FLOWER_REMOVED.value]), 1)
+
+        plants = records[event == Event.PLANT_SET.value]
+        self._apply_last(self.plants, plants, plants['type'])
+        water = records[(event == Event.FLOODED.value) | (event == Event.DRIED_OUT.value)]
+        self._apply_last(self.water, water, water['event'] == Event.FLOODED.value)
+
+        if len(records):
+            self.steps = max(self.steps, int(records['step'][-1]))
+
+    def _apply_last(self, grid, records, values):
+        """Sets the cell of each record to the value of the record, where the
+        last record of a cell wins."""
+        if len(records) == 0:
+            return
+        cells = records['x'].astype(np.int64) * self.height + records['y']
+        # The first occurrence in the reversed records is the last record
+        _, last = np.unique(cells[::-1], return_index=True)
+        last = len(records) - 1 - last
+        grid[records['x'][last], records['y'][last]] = values[last]
+
+    def populations(self):
+        """Returns a dict with the amount of organisms of every type."""
+        counts = {organism_type.name: int(self.animals[organism_type.value].sum()) for organism_type in Type}
+        counts[Type.FLOWER.name] = int(self.flowers.sum())
+        for organism_type in (Type.EARTH, Type.GRASS, Type.TREE):
+            counts[organism_type.name] = int((self.plants == organism_type.value).sum())
+        counts[Type.WATER.name] = int(self.water.sum())
+        return counts
+
+
+def read_log(path):
+    """Returns the width and height of the map and all records of an event log."""
+    with open(path, 'rb') as log:
+        magic, width, height = HEADER.unpack(log.read(HEADER.size))
+        if magic != EVENT_LOG_MAGIC:
+            raise ValueError(str(path) + ' is not an event log')
+        data = log.read()
+    # A record cut off by a crash is left out
+    usable = len(data) - len(data) % RECORD_DTYPE.itemsize
+    return width, height, np.frombuffer(data[:usable], dtype=RECORD_DTYPE)
+
+
+class Replayer():
+    """Rebuilds the grid state after any step from the closest earlier
+    snapshot and the records of the event log, without running any
+    organisms."""
+    def __init__(self, log_path, snapshot_paths=()):
+        from ecosystem import Ecosystem
+        self.width, self.height, self.records = read_log(log_path)
+        # Steps of each snapshot, read from the snapshot headers
+        self.snapshots = sorted((Ecosystem.snapshot_steps(path), path) for path in snapshot_paths)
+
+    def state_at(self, step):
+        """Returns the grid state after the given amount of steps."""
+        from ecosystem import Ecosystem
+        start = None
+        for snapshot_steps, path in self.snapshots:
+            if snapshot_steps <= step:
+                start = (snapshot_steps, path)
+
+        if start is not None:
+            state = GridState.from_ecosystem(Ecosystem.load(start[1]))
+            first = np.searchsorted(self.records['step'], start[0], side='right')
+        else:
+            state = GridState(self.width, self.height)
+            first = 0
+        last = np.searchsorted(self.records['step'], step, side='right')
+        state.apply(self.records[first:last])
+        state.steps = step
+        return state
+
+    def events_at(self, step):
+        """Returns the records of the changes made in the given step."""
+        first, last = np.searchsorted(self.records['step'], [step, step + 1])
+        return self.records[first:last]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replays an event log written by simulate.py --event-log, ' +
+                                     'and prints the populations after a step.')
+    parser.add_argument('log', help='The event log.')
+    parser.add_argument(
+        '--step',
+        dest='step',
+        help='The step to print the populations after. Default the last step in the log.',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '--snapshots',
+        dest='snapshots',
+        help='Snapshots saved during the run, to start replaying from.',
+        nargs='*',
+        default=[]
+    )
+    parser.add_argument(
+        '--events',
+        dest='events',
+        help='Also print the amount of every kind of event in the step.',
+        action='store_true'
+    )
+
+    args = parser.parse_args()
+
+    replayer = Replayer(args.log, args.snapshots)
+    step = args.step
+    if step is None:
+        step = int(replayer.records['step'][-1]) if len(replayer.records) else 0
+    state = replayer.state_at(step)
+    print('Populations after step ' + str(step) + ':')
+    for name, amount in state.populations().items():
+        print('  {:<8}{:>8}'.format(name, amount))
+    if args.events:
+        events = replayer.events_at(step)['event']
+        print('Events in step ' + str(step) + ':')
+        for event in Event:
+            print('  {:<16}{:>8}'.format(event.name, int((events == event.value).sum())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import math
+import numpy as np
+import helpers
+from path_cache import size_class
+
+UNREACHABLE = np.iinfo(np.int32).max
+MAX_FLOW_FIELDS = 256
+DIRECTIONS = [direction.value for direction in helpers.Direction]
+NEIGHBOURS = [direction.value for direction in helpers.Direction if direction != helpers.Direction.CENTER]
+
+
+class DistanceField():
+    """The number of steps from every cell to a goal, walking only on passable
+    cells. The goal itself does not have to be passable. The field grows one
+    step from the goal at a time, which is a Dijkstra search with unit step
+    costs, and only as far as it is needed."""
+    def __init__(self, width, height, goal_x, goal_y):
+        self.distance = np.full((width, height), UNREACHABLE, dtype=np.int32)
+        self.distance[goal_x, goal_y] = 0
+        self.frontier = np.zeros((width, height), dtype=bool)
+        self.frontier[goal_x, goal_y] = True
+        self.steps = 0
+
+    def depends_on(self, x, y):
+        """Checks if the field looked at the given cell, which is the case if
+        the cell or one of its neighbours has been reached."""
+        return (self.distance[max(0, x - 1):x + 2, max(0, y - 1):y + 2] != UNREACHABLE).any()
+
+    def grow(self, passable):
+        """Adds the cells one step further away from the goal to the field.
+        Returns False if there were no cells left to add."""
+        width, height = self.distance.shape
+        if not self.frontier.any():
+            return False
+        self.steps += 1
+        padded_frontier = np.pad(self.frontier, 1)
+        grown = np.zeros((width, height), dtype=bool)
+        for dx, dy in DIRECTIONS:
+            grown |= padded_frontier[1 + dx:1 + dx + width, 1 + dy:1 + dy + height]
+        self.frontier = grown & passable & (self.distance == UNREACHABLE)
+        self.distance[self.frontier] = self.steps
+        return True
+
+
+class FlowFields():
+    """Finds paths to goals shared by many animals, such as burrows, dens and
+    water pools. One distance field is kept per goal, built on the terrain
+    only, so that it is shared by all size classes and reused until the
+    terrain it covers changes. A path is found by walking down the field from
+    the start, into the closest cell to the goal with room for the
+    traverser."""
+    def __init__(self, width, height, cell_capacity):
+        self.width = width
+        self.height = height
+        self.cell_capacity = cell_capacity
+        # Distance fields, or None for fields that were dropped since they were
+        # last looked up
+        self._fields = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def mark_terrain_changed(self, x, y):
+        """Drops the fields depending on the given cell."""
+        for key, field in self._fields.items():
+            if field is not None and field.depends_on(x, y):
+                self._fields[key] = None
+
+    def get_field(self, terrain_blocked_map, goal_x, goal_y, start_x, start_y):
+        """Returns the distance field to the goal, grown until it reaches a
+        neighbour of the start."""
+        key = (goal_x, goal_y)
+        field = self._fields.get(key)
+        if field is not None:
+            self.hits += 1
+        else:
+            if key in self._fields:
+                self.stale += 1
+                del self._fields[key]
+            else:
+                self.misses += 1
+            field = DistanceField(self.width, self.height, goal_x, goal_y)
+            if len(self._fields) >= MAX_FLOW_FIELDS:
+                # Drop the oldest field
+                del self._fields[next(iter(self._fields))]
+            self._fields[key] = field
+
+        neighbourhood = field.distance[max(0, start_x - 1):start_x + 2, max(0, start_y - 1):start_y + 2]
+        if (neighbourhood == UNREACHABLE).all():
+            passable = ~terrain_blocked_map
+            while (neighbourhood == UNREACHABLE).all() and field.grow(passable):
+                pass
+        return field.distance
+
+    def find_path(self, terrain_blocked_map, occupancy_map, size, start_x, start_y, end_x, end_y,
+                  max_path_length=math.inf):
+        """Returns a list of tuples as a path from the given start to the given
+        end, following the distance field of the end through cells with room
+        for the size class of the given size. Like astar, at most
+        max_path_length + 1 steps are taken, the end is left out if it cannot
+        be walked on, and an empty list is returned if the end cannot be
+        reached. If all cells closer to the end are taken up, the path stops
+        before them."""
+        free_space = self.cell_capacity - size_class(size)
+        field = self.get_field(terrain_blocked_map, end_x, end_y, start_x, start_y)
+        width = self.width
+        height = self.height
+        end_blocked = terrain_blocked_map[end_x, end_y] or occupancy_map[end_x, end_y] > free_space
+
+        x = start_x
+        y = start_y
+        path = [(x, y)]
+        distance = field[x, y]
+        while distance > 0 and len(path) <= max_path_length + 1:
+            next_position = None
+            next_distance = distance
+            for dx, dy in NEIGHBOURS:
+                if 0 <= x + dx < width and 0 <= y + dy < height and field[x + dx, y + dy] < next_distance and \
+                        (field[x + dx, y + dy] == 0 or occupancy_map[x + dx, y + dy] <= free_space):
+                    next_distance = field[x + dx, y + dy]
+                    next_position = (x + dx, y + dy)
+            if next_position is None:
+                return path if len(path) > 1 else []
+            if next_distance == 0 and end_blocked:
+                break
+            distance = next_distance
+            x, y = next_position
+            path.append(next_position)
+        return path
+
+    def stats(self):
+        """Returns a dict with the amount of fields reused, computed for a new
+        goal and recomputed after a change, and the share of lookups that
+        reused a field."""
+        lookups = self.hits + self.misses + self.stale
+        return {
+            'lookups': lookups,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'hit_rate': self.hits / lookups if lookups else 0,
+            'entries': len(self._fields)
+        }
@@ -1,7 +1,6 @@
 import organisms
 import behaviour_tree as bt
-import constants
-from helpers import Lerp, InverseLerp, Direction
+from helpers import Lerp, InverseLerp
 
 REPRODUCTION_THRESHOLD = 60 # Amout of flower needed to be able to reproduce
 MAX_GROWTH_SPEED = 0.5 # Based on that FLOWER takes around five weeks to grow
@@ -24,7 +23,12 @@ POLLEN_PRODUCTION_SPEED = 2
 
 class Flower(organisms.Organism):
     """Defines the flower."""
+    __slots__ = (
+        'seed', '_amount', 'nectar', 'has_seed', 'pollen', '_pollen_timer'
+    )
+
     def __init__(self, ecosystem, x, y, amount, seed=False, nectar=0, has_seed=False):
+        parameters = ecosystem.parameters
         super().__init__(ecosystem, organisms.Type.FLOWER, x, y)
         if seed:
             self.seed = seed
@@ -35,7 +39,7 @@ class Flower(organisms.Organism):
         self.has_seed = has_seed
 
         if not self.seed:
-            self.pollen = self._amount * MAX_POLLEN_AMOUNT_MULTIPLIER
+            self.pollen = self._amount * parameters.flower.MAX_POLLEN_AMOUNT_MULTIPLIER
         else:
             self.pollen = 0
         self._pollen_timer = 0
@@ -47,175 +51,140 @@ class Flower(organisms.Organism):
             return 'images/flower.png'
 
 
-    def generate_tree(self):
+    @classmethod
+    def generate_tree(cls):
         """Generates the tree for the tree."""
         tree = bt.Sequence()
-        tree.add_child(self.Grow(self))
-        tree.add_child(self.DecreasePollenTimer(self))
+        tree.add_child(cls.Grow())
+        tree.add_child(cls.DecreasePollenTimer())
 
-        logic_fallback = bt.FallBack()
+        logic_fallback = bt.FallBack('logic_fallback')
         tree.add_child(logic_fallback)
 
         # Check if dead
-        dead_or_alive_sequence = bt.Sequence()
+        dead_or_alive_sequence = bt.Sequence('dead_or_alive_sequence')
         logic_fallback.add_child(dead_or_alive_sequence)
-        dead_or_alive_sequence.add_child(self.IsDead(self))
-        dead_or_alive_sequence.add_child(self.Die(self))
+        dead_or_alive_sequence.add_child(cls.IsDead())
+        dead_or_alive_sequence.add_child(cls.Die())
 
-        production_sequence = bt.Sequence()
+        production_sequence = bt.Sequence('production_sequence')
         logic_fallback.add_child(production_sequence)
 
         # Produce nectar
-        nectar_production = bt.FallBack()
+        nectar_production = bt.FallBack('nectar_production')
         production_sequence.add_child(nectar_production)
-        nectar_production.add_child(self.CantProduceNectar(self))
-        nectar_production.add_child(self.ProduceNectar(self))
+        nectar_production.add_child(cls.CantProduceNectar())
+        nectar_production.add_child(cls.ProduceNectar())
 
         # Produce pollen
-        pollen_production = bt.FallBack()
+        pollen_production = bt.FallBack('pollen_production')
         production_sequence.add_child(pollen_production)
-        pollen_production.add_child(self.CantProducePollen(self))
-        pollen_production.add_child(self.ProducePollen(self))
+        pollen_production.add_child(cls.CantProducePollen())
+        pollen_production.add_child(cls.ProducePollen())
 
         return tree
 
 
     class Grow(bt.Action):
         """Makes the flower grow."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
             # get water info from groud organism (earth or grass)
-            if not self.__outer._ecosystem.plant_map[x][y]:
-                return
-            water_amount = self.__outer._ecosystem.plant_map[x][y].water_amount
-            water_capacity = self.__outer._ecosystem.plant_map[x][y].water_capacity
+            if not agent._ecosystem.plant_map[x][y]:
+                # Nothing grows without ground, the flower dies in IsDead
+                return bt.Status.SUCCESS
+            water_amount = agent._ecosystem.plant_map[x][y].water_amount
+            water_capacity = agent._ecosystem.plant_map[x][y].water_capacity
             water_percentage = water_amount / water_capacity
             if water_percentage <= 0:
-                growth_speed = MAX_DEGRADE_SPEED
-            elif water_percentage <= FLOWER_OPTIMAL_WATER_PERCENTAGE:
-                growth_speed = Lerp(MIN_GROWTH_SPEED, MAX_GROWTH_SPEED, InverseLerp(0, FLOWER_OPTIMAL_WATER_PERCENTAGE, water_percentage))
-            elif water_percentage <= FLOWER_MAX_WATER_PERCENTAGE:
-                growth_speed = Lerp(MIN_GROWTH_SPEED, MAX_GROWTH_SPEED, 1 - InverseLerp(FLOWER_OPTIMAL_WATER_PERCENTAGE,FLOWER_MAX_WATER_PERCENTAGE, water_percentage))
+                growth_speed = parameters.flower.MAX_DEGRADE_SPEED
+            elif water_percentage <= parameters.flower.FLOWER_OPTIMAL_WATER_PERCENTAGE:
+                growth_speed = Lerp(parameters.flower.MIN_GROWTH_SPEED, parameters.flower.MAX_GROWTH_SPEED, InverseLerp(0, parameters.flower.FLOWER_OPTIMAL_WATER_PERCENTAGE, water_percentage))
+            elif water_percentage <= parameters.flower.FLOWER_MAX_WATER_PERCENTAGE:
+                growth_speed = Lerp(parameters.flower.MIN_GROWTH_SPEED, parameters.flower.MAX_GROWTH_SPEED, 1 - InverseLerp(parameters.flower.FLOWER_OPTIMAL_WATER_PERCENTAGE,parameters.flower.FLOWER_MAX_WATER_PERCENTAGE, water_percentage))
             else:
-                growth_speed = Lerp(MAX_DEGRADE_SPEED, MIN_GROWTH_SPEED, 1 - InverseLerp(FLOWER_MAX_WATER_PERCENTAGE, 1, water_percentage))
+                growth_speed = Lerp(parameters.flower.MAX_DEGRADE_SPEED, parameters.flower.MIN_GROWTH_SPEED, 1 - InverseLerp(parameters.flower.FLOWER_MAX_WATER_PERCENTAGE, 1, water_percentage))
 
-            self.__outer._amount = min(MAX_FLOWER_AMOUNT, self.__outer._amount + growth_speed)
-            self.__outer._ecosystem.plant_map[x][y].water_amount = max(0, self.__outer._ecosystem.plant_map[x][y].water_amount - FLOWER_WATER_USAGE)
-            if self.__outer._amount > 0:
-                self.__outer.seed = False
-            self._status = bt.Status.SUCCESS
+            agent._amount = min(parameters.flower.MAX_FLOWER_AMOUNT, agent._amount + growth_speed)
+            agent._ecosystem.plant_map[x][y].water_amount = max(0, agent._ecosystem.plant_map[x][y].water_amount - parameters.flower.FLOWER_WATER_USAGE)
+            if agent._amount > 0 and agent.seed:
+                agent.seed = False
+                agent._ecosystem.mark_image_changed(agent)
+            return bt.Status.SUCCESS
 
     class DecreasePollenTimer(bt.Action):
         """Decreases the timer for controlling pollen production."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._pollen_timer = max(0, self.__outer._pollen_timer - 1)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._pollen_timer = max(0, agent._pollen_timer - 1)
+            return bt.Status.SUCCESS
 
     class IsDead(bt.Condition):
         """Check if flower is alive."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            isFlowerAlive = self.__outer._amount >= 0 or (self.__outer.seed and self.__outer._amount >= PLANTED_SEED_AMOUNT)
-            isGroundDead = self.__outer._ecosystem.plant_map[self.__outer.x][self.__outer.y] == None # Check if there is grass or ground under. Could be flooded
-            isTree = not isGroundDead and self.__outer._ecosystem.plant_map[self.__outer.x][self.__outer.y].type == organisms.Type.TREE
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            isFlowerAlive = agent._amount >= 0 or (agent.seed and agent._amount >= parameters.flower.PLANTED_SEED_AMOUNT)
+            isGroundDead = agent._ecosystem.plant_map[agent.x][agent.y] == None # Check if there is grass or ground under. Could be flooded
+            isTree = not isGroundDead and agent._ecosystem.plant_map[agent.x][agent.y].type == organisms.Type.TREE
             return (not isFlowerAlive) or isGroundDead or isTree
 
     class Die(bt.Action):
         """Performs action after flower dies."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            if self.__outer in self.__outer._ecosystem.flower_map[x][y]:
-                self.__outer._ecosystem.flower_map[x][y].remove(self.__outer)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            x = agent.x
+            y = agent.y
+            if agent in agent._ecosystem.flower_map[x][y]:
+                agent._ecosystem.remove_flower(agent)
+            return bt.Status.SUCCESS
 
 
     class CantProduceNectar(bt.Condition):
         """Check if flower cannot produce nectar."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            is_big_enough = self.__outer._amount > REPRODUCTION_THRESHOLD
-            have_enough_water = self.__outer._ecosystem.plant_map[x][y].water_amount >= NECTAR_WATER_USAGE
-            have_room_for_more_nectar = self.__outer.nectar < self.__outer._amount * MAX_NECTAR_AMOUNT_MULTIPLIER
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            is_big_enough = agent._amount > parameters.flower.REPRODUCTION_THRESHOLD
+            have_enough_water = agent._ecosystem.plant_map[x][y].water_amount >= parameters.flower.NECTAR_WATER_USAGE
+            have_room_for_more_nectar = agent.nectar < agent._amount * parameters.flower.MAX_NECTAR_AMOUNT_MULTIPLIER
             return not (is_big_enough and have_enough_water and have_room_for_more_nectar)
 
     class ProduceNectar(bt.Action):
         """Produces nectar."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            self.__outer.nectar = min(self.__outer._amount * MAX_NECTAR_AMOUNT_MULTIPLIER, self.__outer.nectar + NECTAR_PRODUCTION_SPEED)
-            self.__outer._ecosystem.plant_map[x][y].water_amount = max(0, self.__outer._ecosystem.plant_map[x][y].water_amount - NECTAR_WATER_USAGE)
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            agent.nectar = min(agent._amount * parameters.flower.MAX_NECTAR_AMOUNT_MULTIPLIER, agent.nectar + parameters.flower.NECTAR_PRODUCTION_SPEED)
+            agent._ecosystem.plant_map[x][y].water_amount = max(0, agent._ecosystem.plant_map[x][y].water_amount - parameters.flower.NECTAR_WATER_USAGE)
             # Update nectar smell map
-            if self.__outer.nectar >= NECTAR_SMELL_THRESHOLD:
-                self.__outer._ecosystem.nectar_smell_map[x][y] += self.__outer.nectar
-                wind_direction, wind_speed = self.__outer._ecosystem.weather.get_wind_velocity()
-                for dir in list(Direction):
-                    wind_effect = 0
-                    if dir.value[0] == wind_direction.value[0] and dir.value[1] == wind_direction.value[1]:
-                        wind_effect += wind_speed
-                    for i in range(0, constants.NECTAR_SMELL_RANGE + wind_effect):
-                        new_x = x + (dir.value[0] * (i + 1))
-                        new_y = y + (dir.value[1] * (i + 1))
-                        # check if in bounds
-                        if new_x < 0 or new_x >= self.__outer._ecosystem.width or new_y < 0 or new_y >= self.__outer._ecosystem.height:
-                            continue
-                        self.__outer._ecosystem.nectar_smell_map[new_x][new_y] += self.__outer.nectar/(i+1)
-
-            self._status = bt.Status.SUCCESS
+            if agent.nectar >= parameters.flower.NECTAR_SMELL_THRESHOLD:
+                agent._ecosystem.add_nectar_smell(x, y, agent.nectar)
+
+            return bt.Status.SUCCESS
 
     class CantProducePollen(bt.Condition):
         """Check if flower cannot produce pollen."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            is_big_enough = self.__outer._amount > REPRODUCTION_THRESHOLD
-            have_enough_water = self.__outer._ecosystem.plant_map[x][y].water_amount >= POLLEN_WATER_USAGE
-            have_room_for_more_pollen = self.__outer.pollen < self.__outer._amount * MAX_POLLEN_AMOUNT_MULTIPLIER
-            return self.__outer._pollen_timer > 0 or not (is_big_enough and have_enough_water and have_room_for_more_pollen)
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            is_big_enough = agent._amount > parameters.flower.REPRODUCTION_THRESHOLD
+            have_enough_water = agent._ecosystem.plant_map[x][y].water_amount >= parameters.flower.POLLEN_WATER_USAGE
+            have_room_for_more_pollen = agent.pollen < agent._amount * parameters.flower.MAX_POLLEN_AMOUNT_MULTIPLIER
+            return agent._pollen_timer > 0 or not (is_big_enough and have_enough_water and have_room_for_more_pollen)
 
     class ProducePollen(bt.Action):
         """Produces pollen."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
 
-            self.__outer.pollen = min(self.__outer._amount * MAX_POLLEN_AMOUNT_MULTIPLIER, self.__outer.pollen + POLLEN_PRODUCTION_SPEED)
-            self.__outer._ecosystem.plant_map[x][y].water_amount = max(0, self.__outer._ecosystem.plant_map[x][y].water_amount - POLLEN_WATER_USAGE)
+            agent.pollen = min(agent._amount * parameters.flower.MAX_POLLEN_AMOUNT_MULTIPLIER, agent.pollen + parameters.flower.POLLEN_PRODUCTION_SPEED)
+            agent._ecosystem.plant_map[x][y].water_amount = max(0, agent._ecosystem.plant_map[x][y].water_amount - parameters.flower.POLLEN_WATER_USAGE)
 
-            self.__outer._pollen_timer = POLLEN_COOLDOWN
+            agent._pollen_timer = parameters.flower.POLLEN_COOLDOWN
 
-            self._status = bt.Status.SUCCESS
+            return bt.Status.SUCCESS
@@ -1,10 +1,9 @@
 import organisms
 import behaviour_tree as bt
 import helpers
-import random
-import math
-from astar import astar
-from water import WATER_POOL_CAPACITY
+import numpy as np
+import spatial_index
+from spatial_index import in_box, box_window
 
 HUNGER_SEEK_THRESHOLD = 30
 THIRST_SEEK_THRESHOLD = 50
@@ -17,7 +16,7 @@ THIRST_DAMAGE_FACTOR = 0.3
 TIRED_DAMAGE_FACTOR = 0.1
 FOX_HUNGER_SATISFACTION = 100
 FOX_SIZE_FACTOR = 1/10
-WATER_DRINKING_AMOUNT = 0.00001 * WATER_POOL_CAPACITY
+WATER_DRINKING_SHARE = 0.00001 # Share of the water pool capacity drunk at once
 
 EATING_AND_DRINKING_SLEEP_FACTOR = 0.3
 SLEEP_TIME = 10
@@ -35,10 +34,22 @@ PATH_LENGTH = 5
 
 class Fox(organisms.Organism):
     """Defines the fox."""
+    __slots__ = (
+        'female', '_adult', '_hunger', '_thirst', '_tired', '_health',
+        '_life_span', 'age', '_hunger_speed', '_thirst_speed', '_tired_speed',
+        'genetics_factor', '_needs_to_poop', '_poop_contains_seed', 'size',
+        '_max_size', '_vision_range', '_max_vision_range', 'can_reproduce',
+        'pregnant', 'partner', 'reproduction_timer', '_stabilized_health',
+        '_nurse_timer', '_stop_nursing_timer', 'mother', 'mother_drinking',
+        'mother_sleeping', 'children', 'den', 'in_den', '_asleep',
+        '_sleep_time', '_movement_cooldown', '_min_movement_cooldown',
+        '_movement_timer', '_movement_path', 'partner_genetics_factor'
+    )
+
     def __init__(self, ecosystem, x, y, female, adult=False, hunger=0,
                  thirst=0, tired=0, health=100, size=35, life_span=24*30*8,
                  hunger_speed=50/72, thirst_speed=50/100, tired_speed=50/36,
-                 vision_range={'left': 5, 'right': 5, 'up': 5, 'down': 5},
+                 vision_range=5,
                  den=None, in_den=False, movement_cooldown=2, age=0, mother=None,
                  genetics_factor=1):
         super().__init__(ecosystem, organisms.Type.FOX, x, y)
@@ -66,12 +77,7 @@ class Fox(organisms.Organism):
         else:
             self.size = 1
             self._max_size = size
-            self._vision_range = {
-                'left': 0,
-                'right': 0,
-                'up': 0,
-                'down': 0
-            }
+            self._vision_range = 0
             self._max_vision_range = vision_range
 
 
@@ -104,7 +110,7 @@ class Fox(organisms.Organism):
             self._movement_cooldown = movement_cooldown / genetics_factor
             self._min_movement_cooldown = movement_cooldown / genetics_factor
 
-        self._movement_timer = random.uniform(0, self._movement_cooldown)
+        self._movement_timer = ecosystem.rng.fox.uniform(0, self._movement_cooldown)
         self._movement_path = None
 
 
@@ -115,242 +121,243 @@ class Fox(organisms.Organism):
             return 'images/foxYoung.png'
 
 
-    def generate_tree(self):
+    @classmethod
+    def generate_tree(cls):
         """Generates the tree for the fox."""
         tree = bt.Sequence()
-        tree.add_child(self.ReduceMovementTimer(self))
-        tree.add_child(self.ReduceReproductionTimer(self))
-        tree.add_child(self.DenMovement(self))
-        tree.add_child(self.IncreaseHunger(self))
-        tree.add_child(self.IncreaseThirst(self))
-        tree.add_child(self.ChangeTired(self))
-        tree.add_child(self.HandleNursing(self))
-        tree.add_child(self.IncreaseAge(self))
-        tree.add_child(self.TakeDamage(self))
-        tree.add_child(self.HandlePartner(self))
-        tree.add_child(self.ReplenishHealth(self))
-        tree.add_child(self.HandleChildrenList(self))
+        tree.add_child(cls.ReduceMovementTimer())
+        tree.add_child(cls.ReduceReproductionTimer())
+        tree.add_child(cls.DenMovement())
+        tree.add_child(cls.IncreaseHunger())
+        tree.add_child(cls.IncreaseThirst())
+        tree.add_child(cls.ChangeTired())
+        tree.add_child(cls.HandleNursing())
+        tree.add_child(cls.IncreaseAge())
+        tree.add_child(cls.TakeDamage())
+        tree.add_child(cls.HandlePartner())
+        tree.add_child(cls.ReplenishHealth())
+        tree.add_child(cls.HandleChildrenList())
 
         # Logic for the fox
-        logic_fallback = bt.FallBack()
+        logic_fallback = bt.FallBack('logic_fallback')
         tree.add_child(logic_fallback)
 
         # Dying
-        die_sequence = bt.Sequence()
+        die_sequence = bt.Sequence('die_sequence')
         logic_fallback.add_child(die_sequence)
-        die_sequence.add_child(self.Dying(self))
-        die_sequence.add_child(self.Die(self))
+        die_sequence.add_child(cls.Dying())
+        die_sequence.add_child(cls.Die())
 
         # New born
-        logic_fallback.add_child(self.NewBorn(self))
+        logic_fallback.add_child(cls.NewBorn())
 
         # Sleeping
-        sleep_sequence = bt.Sequence()
+        sleep_sequence = bt.Sequence('sleep_sequence')
         logic_fallback.add_child(sleep_sequence)
-        sleep_sequence.add_child(self.Sleeping(self))
+        sleep_sequence.add_child(cls.Sleeping())
 
-        sleep_fallback = bt.FallBack()
+        sleep_fallback = bt.FallBack('sleep_fallback')
         sleep_sequence.add_child(sleep_fallback)
-        sleep_fallback.add_child(self.ShouldNotWakeUp(self))
-        sleep_fallback.add_child(self.WakeUp(self))
+        sleep_fallback.add_child(cls.ShouldNotWakeUp())
+        sleep_fallback.add_child(cls.WakeUp())
 
         # Cub
-        cub_sequence = bt.Sequence()
+        cub_sequence = bt.Sequence('cub_sequence')
         logic_fallback.add_child(cub_sequence)
-        cub_sequence.add_child(self.Cub(self))
+        cub_sequence.add_child(cls.Cub())
 
-        cub_fallback = bt.FallBack()
+        cub_fallback = bt.FallBack('cub_fallback')
         cub_sequence.add_child(cub_fallback)
 
-        drink_sequence = bt.Sequence()
+        drink_sequence = bt.Sequence('drink_sequence')
         cub_fallback.add_child(drink_sequence)
-        drink_sequence.add_child(self.MotherDrinking(self))
+        drink_sequence.add_child(cls.MotherDrinking())
 
-        drink_fallback = bt.FallBack()
+        drink_fallback = bt.FallBack('drink_fallback')
         drink_sequence.add_child(drink_fallback)
 
-        adjacent_water_sequence = bt.Sequence()
+        adjacent_water_sequence = bt.Sequence('adjacent_water_sequence')
         drink_fallback.add_child(adjacent_water_sequence)
-        adjacent_water_sequence.add_child(self.WaterAdjacent(self))
-        adjacent_water_sequence.add_child(self.Drink(self))
+        adjacent_water_sequence.add_child(cls.WaterAdjacent())
+        adjacent_water_sequence.add_child(cls.Drink())
 
-        water_nearby_sequence = bt.Sequence()
+        water_nearby_sequence = bt.Sequence('water_nearby_sequence')
         drink_fallback.add_child(water_nearby_sequence)
         # Might want foxes to only know about water they've seen,
         # instead of knowing about water globally
-        water_nearby_sequence.add_child(self.CanMove(self))
-        water_nearby_sequence.add_child(self.FindPathToWater(self))
-        water_nearby_sequence.add_child(self.MoveOnPath(self))
+        water_nearby_sequence.add_child(cls.CanMove())
+        water_nearby_sequence.add_child(cls.FindPathToWater())
+        water_nearby_sequence.add_child(cls.MoveOnPath())
 
-        mother_sleeping_sequence = bt.Sequence()
+        mother_sleeping_sequence = bt.Sequence('mother_sleeping_sequence')
         cub_fallback.add_child(mother_sleeping_sequence)
-        mother_sleeping_sequence.add_child(self.MotherSleeping(self))
-        mother_sleeping_sequence.add_child(self.Sleep(self))
+        mother_sleeping_sequence.add_child(cls.MotherSleeping())
+        mother_sleeping_sequence.add_child(cls.Sleep())
 
-        follow_mother_sequence = bt.Sequence()
+        follow_mother_sequence = bt.Sequence('follow_mother_sequence')
         cub_fallback.add_child(follow_mother_sequence)
-        follow_mother_sequence.add_child(self.CanMove(self))
-        follow_mother_sequence.add_child(self.FindPathToMother(self))
-        follow_mother_sequence.add_child(self.MoveOnPath(self))
+        follow_mother_sequence.add_child(cls.CanMove())
+        follow_mother_sequence.add_child(cls.FindPathToMother())
+        follow_mother_sequence.add_child(cls.MoveOnPath())
 
-        cub_fallback.add_child(self.Cub(self)) # We always want cub to succeed to not continue in the tree.
+        cub_fallback.add_child(cls.Cub()) # We always want cub to succeed to not continue in the tree.
 
         # Eating
-        adjacent_food_sequence = bt.Sequence()
+        adjacent_food_sequence = bt.Sequence('adjacent_food_sequence')
         logic_fallback.add_child(adjacent_food_sequence)
-        adjacent_food_sequence.add_child(self.CanEat(self))
-        adjacent_food_sequence.add_child(self.RabbitAdjacent(self))
-        adjacent_food_sequence.add_child(self.Eat(self))
+        adjacent_food_sequence.add_child(cls.CanEat())
+        adjacent_food_sequence.add_child(cls.RabbitAdjacent())
+        adjacent_food_sequence.add_child(cls.Eat())
 
-        hungry_sequence = bt.Sequence()
+        hungry_sequence = bt.Sequence('hungry_sequence')
         logic_fallback.add_child(hungry_sequence)
-        hungry_sequence.add_child(self.HungrierThanThirsty(self))
-        hungry_sequence.add_child(self.HungrierThanTired(self))
-        hungry_sequence.add_child(self.Hungry(self))
+        hungry_sequence.add_child(cls.HungrierThanThirsty())
+        hungry_sequence.add_child(cls.HungrierThanTired())
+        hungry_sequence.add_child(cls.Hungry())
 
-        hungry_fallback = bt.FallBack()
+        hungry_fallback = bt.FallBack('hungry_fallback')
         hungry_sequence.add_child(hungry_fallback)
 
-        rabbit_sequence = bt.Sequence()
+        rabbit_sequence = bt.Sequence('rabbit_sequence')
         hungry_fallback.add_child(rabbit_sequence)
-        rabbit_sequence.add_child(self.RabbitVisible(self))
-        rabbit_sequence.add_child(self.CanMove(self))
-        rabbit_sequence.add_child(self.FindPathToRabbit(self))
-        rabbit_sequence.add_child(self.MoveOnPath(self))
+        rabbit_sequence.add_child(cls.RabbitVisible())
+        rabbit_sequence.add_child(cls.CanMove())
+        rabbit_sequence.add_child(cls.FindPathToRabbit())
+        rabbit_sequence.add_child(cls.MoveOnPath())
 
-        smell_sequence = bt.Sequence()
+        smell_sequence = bt.Sequence('smell_sequence')
         hungry_fallback.add_child(smell_sequence)
-        smell_sequence.add_child(self.SmellExists(self))
-        smell_sequence.add_child(self.CanMove(self))
-        smell_sequence.add_child(self.FindPathToSmell(self))
-        smell_sequence.add_child(self.MoveOnPath(self))
+        smell_sequence.add_child(cls.SmellExists())
+        smell_sequence.add_child(cls.CanMove())
+        smell_sequence.add_child(cls.FindPathToSmell())
+        smell_sequence.add_child(cls.MoveOnPath())
 
         # Drinking
-        thirsty_sequence = bt.Sequence()
+        thirsty_sequence = bt.Sequence('thirsty_sequence')
         logic_fallback.add_child(thirsty_sequence)
-        thirsty_sequence.add_child(self.ThirstierThanTired(self))
-        thirsty_sequence.add_child(self.Thirsty(self))
+        thirsty_sequence.add_child(cls.ThirstierThanTired())
+        thirsty_sequence.add_child(cls.Thirsty())
 
-        thirsty_fallback = bt.FallBack()
+        thirsty_fallback = bt.FallBack('thirsty_fallback')
         thirsty_sequence.add_child(thirsty_fallback)
 
-        adjacent_water_sequence = bt.Sequence()
+        adjacent_water_sequence = bt.Sequence('adjacent_water_sequence')
         thirsty_fallback.add_child(adjacent_water_sequence)
-        adjacent_water_sequence.add_child(self.WaterAdjacent(self))
-        adjacent_water_sequence.add_child(self.Drink(self))
+        adjacent_water_sequence.add_child(cls.WaterAdjacent())
+        adjacent_water_sequence.add_child(cls.Drink())
 
-        water_nearby_sequence = bt.Sequence()
+        water_nearby_sequence = bt.Sequence('water_nearby_sequence')
         thirsty_fallback.add_child(water_nearby_sequence)
         # Might want foxes to only know about water they've seen,
         # instead of knowing about water globally
-        water_nearby_sequence.add_child(self.CanMove(self))
-        water_nearby_sequence.add_child(self.FindPathToWater(self))
-        water_nearby_sequence.add_child(self.MoveOnPath(self))
+        water_nearby_sequence.add_child(cls.CanMove())
+        water_nearby_sequence.add_child(cls.FindPathToWater())
+        water_nearby_sequence.add_child(cls.MoveOnPath())
 
         # Tiredness
-        tired_sequence = bt.Sequence()
+        tired_sequence = bt.Sequence('tired_sequence')
         logic_fallback.add_child(tired_sequence)
-        tired_sequence.add_child(self.Tired(self))
-        tired_sequence.add_child(self.Sleep(self))
+        tired_sequence.add_child(cls.Tired())
+        tired_sequence.add_child(cls.Sleep())
 
         # Nursing
-        nurse_sequence = bt.Sequence()
+        nurse_sequence = bt.Sequence('nurse_sequence')
         logic_fallback.add_child(nurse_sequence)
-        nurse_sequence.add_child(self.ShouldNurse(self))
+        nurse_sequence.add_child(cls.ShouldNurse())
 
-        nurse_fallback = bt.FallBack()
+        nurse_fallback = bt.FallBack('nurse_fallback')
         nurse_sequence.add_child(nurse_fallback)
 
-        burrow_nurse_sequence = bt.Sequence()
+        burrow_nurse_sequence = bt.Sequence('burrow_nurse_sequence')
         nurse_fallback.add_child(burrow_nurse_sequence)
-        burrow_nurse_sequence.add_child(self.InDen(self))
-        burrow_nurse_sequence.add_child(self.Nurse(self))
+        burrow_nurse_sequence.add_child(cls.InDen())
+        burrow_nurse_sequence.add_child(cls.Nurse())
 
-        move_to_burrow_nurse_sequence = bt.Sequence()
+        move_to_burrow_nurse_sequence = bt.Sequence('move_to_burrow_nurse_sequence')
         nurse_fallback.add_child(move_to_burrow_nurse_sequence)
-        move_to_burrow_nurse_sequence.add_child(self.CanMove(self))
-        move_to_burrow_nurse_sequence.add_child(self.FindPathToDen(self))
-        move_to_burrow_nurse_sequence.add_child(self.MoveOnPath(self))
+        move_to_burrow_nurse_sequence.add_child(cls.CanMove())
+        move_to_burrow_nurse_sequence.add_child(cls.FindPathToDen())
+        move_to_burrow_nurse_sequence.add_child(cls.MoveOnPath())
 
         # Giving birth
-        birth_sequence = bt.Sequence()
+        birth_sequence = bt.Sequence('birth_sequence')
         logic_fallback.add_child(birth_sequence)
-        birth_sequence.add_child(self.Pregnant(self))
+        birth_sequence.add_child(cls.Pregnant())
 
-        birth_fallback = bt.FallBack()
+        birth_fallback = bt.FallBack('birth_fallback')
         birth_sequence.add_child(birth_fallback)
 
-        birth_time_sequence = bt.Sequence()
+        birth_time_sequence = bt.Sequence('birth_time_sequence')
         birth_fallback.add_child(birth_time_sequence)
-        birth_time_sequence.add_child(self.TimeToGiveBirth(self))
-        birth_time_sequence.add_child(self.GiveBirth(self))
+        birth_time_sequence.add_child(cls.TimeToGiveBirth())
+        birth_time_sequence.add_child(cls.GiveBirth())
 
-        close_to_birth_sequence = bt.Sequence()
+        close_to_birth_sequence = bt.Sequence('close_to_birth_sequence')
         birth_fallback.add_child(close_to_birth_sequence)
-        close_to_birth_sequence.add_child(self.CloseToBirth(self))
+        close_to_birth_sequence.add_child(cls.CloseToBirth())
 
-        close_to_birth_fallback = bt.FallBack()
+        close_to_birth_fallback = bt.FallBack('close_to_birth_fallback')
         close_to_birth_sequence.add_child(close_to_birth_fallback)
-        close_to_birth_fallback.add_child(self.InDen(self))
+        close_to_birth_fallback.add_child(cls.InDen())
 
-        close_to_birth_burrow_sequence = bt.Sequence()
+        close_to_birth_burrow_sequence = bt.Sequence('close_to_birth_burrow_sequence')
         close_to_birth_fallback.add_child(close_to_birth_burrow_sequence)
-        close_to_birth_burrow_sequence.add_child(self.StabilizeHealth(self))
-        close_to_birth_burrow_sequence.add_child(self.CreateDen(self))
+        close_to_birth_burrow_sequence.add_child(cls.StabilizeHealth())
+        close_to_birth_burrow_sequence.add_child(cls.CreateDen())
 
         # Reproducing
-        reproduction_sequence = bt.Sequence()
+        reproduction_sequence = bt.Sequence('reproduction_sequence')
         logic_fallback.add_child(reproduction_sequence)
-        reproduction_sequence.add_child(self.CanReproduce(self))
+        reproduction_sequence.add_child(cls.CanReproduce())
 
-        reproduction_fallback = bt.FallBack()
+        reproduction_fallback = bt.FallBack('reproduction_fallback')
         reproduction_sequence.add_child(reproduction_fallback)
 
-        partner_sequence = bt.Sequence()
+        partner_sequence = bt.Sequence('partner_sequence')
         reproduction_fallback.add_child(partner_sequence)
-        partner_sequence.add_child(self.HavePartner(self))
-        partner_sequence.add_child(self.PartnerCanReproduce(self))
+        partner_sequence.add_child(cls.HavePartner())
+        partner_sequence.add_child(cls.PartnerCanReproduce())
 
-        partner_reproduction_fallback = bt.FallBack()
+        partner_reproduction_fallback = bt.FallBack('partner_reproduction_fallback')
         partner_sequence.add_child(partner_reproduction_fallback)
 
-        partner_adjacent_sequence = bt.Sequence()
+        partner_adjacent_sequence = bt.Sequence('partner_adjacent_sequence')
         partner_reproduction_fallback.add_child(partner_adjacent_sequence)
-        partner_adjacent_sequence.add_child(self.PartnerAdjacent(self))
-        partner_adjacent_sequence.add_child(self.Reproduce(self))
+        partner_adjacent_sequence.add_child(cls.PartnerAdjacent())
+        partner_adjacent_sequence.add_child(cls.Reproduce())
 
-        partner_nearby_sequence = bt.Sequence()
+        partner_nearby_sequence = bt.Sequence('partner_nearby_sequence')
         partner_reproduction_fallback.add_child(partner_nearby_sequence)
-        #partner_nearby_sequence.add_child(self.PartnerNearby(self))
-        partner_nearby_sequence.add_child(self.CanMove(self))
-        partner_nearby_sequence.add_child(self.FindPathToPartner(self))
-        partner_nearby_sequence.add_child(self.MoveOnPath(self))
+        #partner_nearby_sequence.add_child(cls.PartnerNearby())
+        partner_nearby_sequence.add_child(cls.CanMove())
+        partner_nearby_sequence.add_child(cls.FindPathToPartner())
+        partner_nearby_sequence.add_child(cls.MoveOnPath())
 
-        no_partner_sequence = bt.Sequence()
+        no_partner_sequence = bt.Sequence('no_partner_sequence')
         reproduction_fallback.add_child(no_partner_sequence)
-        no_partner_sequence.add_child(self.NoPartner(self))
+        no_partner_sequence.add_child(cls.NoPartner())
 
-        no_partner_fallback = bt.FallBack()
+        no_partner_fallback = bt.FallBack('no_partner_fallback')
         no_partner_sequence.add_child(no_partner_fallback)
 
-        adjacent_fox_sequence = bt.Sequence()
+        adjacent_fox_sequence = bt.Sequence('adjacent_fox_sequence')
         no_partner_fallback.add_child(adjacent_fox_sequence)
-        adjacent_fox_sequence.add_child(self.AvailableFoxAdjacent(self))
-        adjacent_fox_sequence.add_child(self.MakePartner(self))
-        adjacent_fox_sequence.add_child(self.Reproduce(self))
+        adjacent_fox_sequence.add_child(cls.AvailableFoxAdjacent())
+        adjacent_fox_sequence.add_child(cls.MakePartner())
+        adjacent_fox_sequence.add_child(cls.Reproduce())
 
-        fox_nearby_sequence = bt.Sequence()
+        fox_nearby_sequence = bt.Sequence('fox_nearby_sequence')
         no_partner_fallback.add_child(fox_nearby_sequence)
-        fox_nearby_sequence.add_child(self.AvailableFoxNearby(self))
-        fox_nearby_sequence.add_child(self.CanMove(self))
-        fox_nearby_sequence.add_child(self.FindPathToFox(self))
-        fox_nearby_sequence.add_child(self.MoveOnPath(self))
+        fox_nearby_sequence.add_child(cls.AvailableFoxNearby())
+        fox_nearby_sequence.add_child(cls.CanMove())
+        fox_nearby_sequence.add_child(cls.FindPathToFox())
+        fox_nearby_sequence.add_child(cls.MoveOnPath())
 
         # Moving randomly
-        random_movement_sequence = bt.Sequence()
+        random_movement_sequence = bt.Sequence('random_movement_sequence')
         logic_fallback.add_child(random_movement_sequence)
-        random_movement_sequence.add_child(self.CanMove(self))
-        random_movement_sequence.add_child(self.MoveRandomly(self))
+        random_movement_sequence.add_child(cls.CanMove())
+        random_movement_sequence.add_child(cls.MoveRandomly())
 
         return tree
 
@@ -360,185 +367,141 @@ class Fox(organisms.Organism):
 
     class ReduceMovementTimer(bt.Action):
         """Ticks down the movement timer for the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._movement_timer = max(0, self.__outer._movement_timer - 1)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._movement_timer = max(0, agent._movement_timer - 1)
+            return bt.Status.SUCCESS
 
     class ReduceReproductionTimer(bt.Action):
         """Ticks down the reproduction timer for the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer.reproduction_timer = max(0, self.__outer.reproduction_timer - 1)
-            if self.__outer.reproduction_timer == 0 and self.__outer._adult:
-                self.__outer.can_reproduce = True
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent.reproduction_timer = max(0, agent.reproduction_timer - 1)
+            if agent.reproduction_timer == 0 and agent._adult:
+                agent.can_reproduce = True
+            return bt.Status.SUCCESS
 
     class DenMovement(bt.Action):
         """Updates whether the fox is in its den or not."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            den = self.__outer.den
+        def action(self, agent):
+            x = agent.x
+            y = agent.y
+            den = agent.den
 
             if den is None:
-                self.__outer.in_den = False
+                agent.in_den = False
             else:
-                self.__outer.in_den = (x == den.x and y == den.y)
-            self._status = bt.Status.SUCCESS
+                agent.in_den = (x == den.x and y == den.y)
+            return bt.Status.SUCCESS
 
     class IncreaseHunger(bt.Action):
         """Increases the fox's hunger."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            factor = 1 if not self.__outer._asleep else EATING_AND_DRINKING_SLEEP_FACTOR
-            if not self.__outer._stabilized_health:
-                self.__outer._hunger += factor * self.__outer._hunger_speed
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            factor = 1 if not agent._asleep else parameters.fox.EATING_AND_DRINKING_SLEEP_FACTOR
+            if not agent._stabilized_health:
+                agent._hunger += factor * agent._hunger_speed
+            return bt.Status.SUCCESS
 
     class IncreaseThirst(bt.Action):
         """Increases the fox's thirst."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            factor = 1 if not self.__outer._asleep else EATING_AND_DRINKING_SLEEP_FACTOR
-            if not self.__outer._stabilized_health:
-                self.__outer._thirst += factor * self.__outer._thirst_speed
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            factor = 1 if not agent._asleep else parameters.fox.EATING_AND_DRINKING_SLEEP_FACTOR
+            if not agent._stabilized_health:
+                agent._thirst += factor * agent._thirst_speed
+            return bt.Status.SUCCESS
 
     class ChangeTired(bt.Action):
         """Changes the fox's tiredness depending on if it is awake."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            if not self.__outer._asleep:
-                if not self.__outer._stabilized_health:
-                    self.__outer._tired += self.__outer._tired_speed
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            if not agent._asleep:
+                if not agent._stabilized_health:
+                    agent._tired += agent._tired_speed
             else:
-                self.__outer._tired = max(0, self.__outer._tired - TIRED_DAMAGE_THRESHOLD / SLEEP_TIME)
-                self.__outer._sleep_time += 1
-            self._status = bt.Status.SUCCESS
+                agent._tired = max(0, agent._tired - parameters.fox.TIRED_DAMAGE_THRESHOLD / parameters.fox.SLEEP_TIME)
+                agent._sleep_time += 1
+            return bt.Status.SUCCESS
 
     class HandleNursing(bt.Action):
         """Handles nursing variables."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            if self.__outer.female:
-                if self.__outer._stop_nursing_timer > 0:
-                    self.__outer._stop_nursing_timer = max(0, self.__outer._stop_nursing_timer - 1)
-                    self.__outer._nurse_timer = max(0, self.__outer._nurse_timer - 1)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            if agent.female:
+                if agent._stop_nursing_timer > 0:
+                    agent._stop_nursing_timer = max(0, agent._stop_nursing_timer - 1)
+                    agent._nurse_timer = max(0, agent._nurse_timer - 1)
+            return bt.Status.SUCCESS
 
     class IncreaseAge(bt.Action):
         """Increases the fox's age."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer.age += 1
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            agent.age += 1
 
             # Become adults
-            if not self.__outer._adult and self.__outer.age >= ADULT_AGE:
-                self.__outer._adult = True
-                self.__outer.can_reproduce = True
-                self.__outer.size = self.__outer._max_size
-                self.__outer._vision_range = self.__outer._max_vision_range
-                self.__outer._movement_cooldown = self.__outer._min_movement_cooldown
+            if not agent._adult and agent.age >= parameters.fox.ADULT_AGE:
+                agent._adult = True
+                agent.can_reproduce = True
+                agent._ecosystem.set_animal_size(agent, agent._max_size)
+                agent._ecosystem.mark_image_changed(agent)
+                agent._vision_range = agent._max_vision_range
+                agent._movement_cooldown = agent._min_movement_cooldown
 
             # Lerp values depending on age
-            if not self.__outer._adult:
-                self.__outer.size = helpers.Lerp(0, self.__outer._max_size, self.__outer.age / (ADULT_AGE))
-                for key in self.__outer._vision_range:
-                    self.__outer._vision_range[key] = min(self.__outer._max_vision_range[key], helpers.Lerp(0, self.__outer._max_vision_range[key], self.__outer.age / (NEW_BORN_TIME)))
-                #self.__outer._movement_cooldown = helpers.Lerp(2 * self.__outer._min_movement_cooldown, self.__outer._min_movement_cooldown, self.__outer.age / (ADULT_AGE))
+            if not agent._adult:
+                agent._ecosystem.set_animal_size(agent, helpers.Lerp(0, agent._max_size, agent.age / (parameters.fox.ADULT_AGE)))
+                agent._vision_range = int(min(agent._max_vision_range, helpers.Lerp(0, agent._max_vision_range, agent.age / (parameters.fox.NEW_BORN_TIME))))
+                #agent._movement_cooldown = helpers.Lerp(2 * agent._min_movement_cooldown, agent._min_movement_cooldown, agent.age / (ADULT_AGE))
 
 
-            self._status = bt.Status.SUCCESS
+            return bt.Status.SUCCESS
 
     class TakeDamage(bt.Action):
         """Take damage from various sources."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self._status = bt.Status.SUCCESS
-
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
             # Hunger
-            hunger = self.__outer._hunger
-            if hunger >= HUNGER_DAMAGE_THRESHOLD:
-                self.__outer._health -= (hunger - HUNGER_DAMAGE_THRESHOLD) * HUNGER_DAMAGE_FACTOR
+            hunger = agent._hunger
+            if hunger >= parameters.fox.HUNGER_DAMAGE_THRESHOLD:
+                agent._health -= (hunger - parameters.fox.HUNGER_DAMAGE_THRESHOLD) * parameters.fox.HUNGER_DAMAGE_FACTOR
 
             # Thirst
-            thirst = self.__outer._thirst
-            if thirst >= THIRST_DAMAGE_THRESHOLD:
-                self.__outer._health -= (thirst - THIRST_DAMAGE_THRESHOLD) * THIRST_DAMAGE_FACTOR
+            thirst = agent._thirst
+            if thirst >= parameters.fox.THIRST_DAMAGE_THRESHOLD:
+                agent._health -= (thirst - parameters.fox.THIRST_DAMAGE_THRESHOLD) * parameters.fox.THIRST_DAMAGE_FACTOR
 
             # Tiredness
-            tired = self.__outer._tired
-            if tired >= TIRED_DAMAGE_THRESHOLD:
-                self.__outer._health -= (tired - TIRED_DAMAGE_THRESHOLD) * TIRED_DAMAGE_FACTOR
+            tired = agent._tired
+            if tired >= parameters.fox.TIRED_DAMAGE_THRESHOLD:
+                agent._health -= (tired - parameters.fox.TIRED_DAMAGE_THRESHOLD) * parameters.fox.TIRED_DAMAGE_FACTOR
+            return bt.Status.SUCCESS
 
     class HandlePartner(bt.Action):
         """Remove partner if it has died."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self._status = bt.Status.SUCCESS
-
-            if self.__outer.partner is not None:
-                if self.__outer.partner._health <= 0:
-                    self.__outer.partner = None
+        def action(self, agent):
+            if agent.partner is not None:
+                if agent.partner._health <= 0:
+                    agent.partner = None
+            return bt.Status.SUCCESS
 
     class ReplenishHealth(bt.Action):
         """Replenish health if in a healthy condition."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            hunger = agent._hunger
+            thirst = agent._thirst
+            tired = agent._tired
 
-        def action(self):
-            self._status = bt.Status.SUCCESS
-
-            hunger = self.__outer._hunger
-            thirst = self.__outer._thirst
-            tired = self.__outer._tired
-
-            if hunger < HUNGER_SEEK_THRESHOLD and thirst < THIRST_SEEK_THRESHOLD and tired < TIRED_SEEK_THRESHOLD and self.__outer._health > 0:
-                self.__outer._health = min(100, self.__outer._health + HEAL_AMOUNT)
+            if hunger < parameters.fox.HUNGER_SEEK_THRESHOLD and thirst < parameters.fox.THIRST_SEEK_THRESHOLD and tired < parameters.fox.TIRED_SEEK_THRESHOLD and agent._health > 0:
+                agent._health = min(100, agent._health + parameters.fox.HEAL_AMOUNT)
+            return bt.Status.SUCCESS
 
     class HandleChildrenList(bt.Action):
         """Check if children are big enough to take care of themselves."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self._status = bt.Status.SUCCESS
-            children = self.__outer.children
-            self.__outer.children = [child for child in children if child.age < NEW_BORN_TIME + NEW_BORN_FOLLOW_TIME]
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            children = agent.children
+            agent.children = [child for child in children if child.age < parameters.fox.NEW_BORN_TIME + parameters.fox.NEW_BORN_FOLLOW_TIME]
+            return bt.Status.SUCCESS
 
     #########
     # DYING #
@@ -546,24 +509,14 @@ class Fox(organisms.Organism):
 
     class Dying(bt.Condition):
         """Check if the fox is dying."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._health <= 0 or self.__outer.age >= self.__outer._life_span
+        def condition(self, agent):
+            return agent._health <= 0 or agent.age >= agent._life_span
 
     class Die(bt.Action):
         """Kill the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            self.__outer._ecosystem.animal_map[x][y].remove(self.__outer)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._ecosystem.remove_animal(agent)
+            return bt.Status.SUCCESS
 
     ############
     # NEW BORN #
@@ -571,12 +524,9 @@ class Fox(organisms.Organism):
 
     class NewBorn(bt.Condition):
         """Check if the fox is newly born."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.age <= NEW_BORN_TIME
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.age <= parameters.fox.NEW_BORN_TIME
 
     #######
     # CUB #
@@ -584,91 +534,65 @@ class Fox(organisms.Organism):
 
     class Cub(bt.Condition):
         """Check if the fox is a cub following its mother."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.age <= NEW_BORN_TIME + NEW_BORN_FOLLOW_TIME
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.age <= parameters.fox.NEW_BORN_TIME + parameters.fox.NEW_BORN_FOLLOW_TIME
 
     class MotherDrinking(bt.Condition):
         """Check if the fox's mother has been drinking water."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.mother_drinking
+        def condition(self, agent):
+            return agent.mother_drinking
 
     class CanMove(bt.Condition):
         """Check if the fox can move."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._movement_timer == 0
+        def condition(self, agent):
+            return agent._movement_timer == 0
 
     class FindPathToMother(bt.Action):
         """Finds a path to the fox's mother."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            mother = self.__outer.mother
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            mother = agent.mother
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
             path = []
             if mother is not None:
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                             x, y, mother.x, mother.y, max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, mother.x, mother.y, max_path_length=parameters.fox.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     class MoveOnPath(bt.Action):
         """Moves on the current path."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            path = self.__outer._movement_path
+        def action(self, agent):
+            path = agent._movement_path
 
             if not path:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
             else:
                 next_point = path.pop(0)
                 x = next_point[0]
                 y = next_point[1]
-                ecosystem = self.__outer._ecosystem
-                if helpers.EuclidianDistance(self.__outer.x, self.__outer.y, x, y) <= 2:
-                    self._status = bt.Status.SUCCESS
-                    self.__outer._movement_timer += self.__outer._movement_cooldown
-                    index = ecosystem.animal_map[self.__outer.x][self.__outer.y].index(self.__outer)
-                    self.__outer._ecosystem.animal_map[x][y].append(ecosystem.animal_map[self.__outer.x][self.__outer.y].pop(index))
-                    self.__outer.x = x
-                    self.__outer.y = y
+                ecosystem = agent._ecosystem
+                if helpers.EuclidianDistance(agent.x, agent.y, x, y) <= 2:
+                    agent._movement_timer += agent._movement_cooldown
+                    ecosystem.move_animal(agent, x, y)
+                    return bt.Status.SUCCESS
                 else:
-                    self._status = bt.Status.FAIL
+                    return bt.Status.FAIL
 
     class MotherSleeping(bt.Condition):
         """Check if the fox's mother has been sleeping."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.mother_sleeping
+        def condition(self, agent):
+            return agent.mother_sleeping
 
     ############
     # SLEEPING #
@@ -676,32 +600,21 @@ class Fox(organisms.Organism):
 
     class Sleeping(bt.Condition):
         """Determines if the fox is sleeping or not."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._asleep
+        def condition(self, agent):
+            return agent._asleep
 
     class ShouldNotWakeUp(bt.Condition):
         """Determines if the fox should continue to sleep."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._sleep_time < SLEEP_TIME
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent._sleep_time < parameters.fox.SLEEP_TIME
 
     class WakeUp(bt.Action):
         """Wakes up the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._asleep = False
-            self.__outer._sleep_time = 0
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._asleep = False
+            agent._sleep_time = 0
+            return bt.Status.SUCCESS
 
     ##########
     # HUNGER #
@@ -709,76 +622,47 @@ class Fox(organisms.Organism):
 
     class HungrierThanThirsty(bt.Condition):
         """Check if the fox is hungrier than it is thirsty."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._hunger / HUNGER_SEEK_THRESHOLD >= self.__outer._thirst / THIRST_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent._hunger / parameters.fox.HUNGER_SEEK_THRESHOLD >= agent._thirst / parameters.fox.THIRST_SEEK_THRESHOLD
 
     class HungrierThanTired(bt.Condition):
         """Check if the fox is hungrier than it is tired."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._hunger / HUNGER_SEEK_THRESHOLD >= self.__outer._tired / TIRED_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent._hunger / parameters.fox.HUNGER_SEEK_THRESHOLD >= agent._tired / parameters.fox.TIRED_SEEK_THRESHOLD
 
     class Hungry(bt.Condition):
         """Check if the fox is hungry."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return not self.__outer._stabilized_health and self.__outer._hunger >= HUNGER_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return not agent._stabilized_health and agent._hunger >= parameters.fox.HUNGER_SEEK_THRESHOLD
 
     class CanEat(bt.Condition):
         """Check if the fox can eat."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._hunger >= 0
+        def condition(self, agent):
+            return agent._hunger >= 0
 
     class RabbitAdjacent(bt.Condition):
         """Check if there is a rabbit next to the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
-
-            for direction in list(helpers.Direction):
-                dx = direction.value[0]
-                dy = direction.value[1]
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-                if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                    continue
-
-                for animal in ecosystem.animal_map[x + dx][y + dy]:
-                    if animal.type == organisms.Type.RABBIT:
-                        return True
-            return False
+            return ecosystem.spatial_index.any_in_box(organisms.Type.RABBIT, x, y, spatial_index.ADJACENT)
 
     class Eat(bt.Action):
         """Eats the largest rabbit adjacent to the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
             best_rabbit = None
             best_rabbit_size = 0
+            rabbit_counts = ecosystem.spatial_index.counts(organisms.Type.RABBIT)
             for direction in list(helpers.Direction):
                 dx = direction.value[0]
                 dy = direction.value[1]
@@ -786,6 +670,9 @@ class Fox(organisms.Organism):
                 if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
                     continue
 
+                if not rabbit_counts[x + dx, y + dy]:
+                    continue
+
                 for animal in ecosystem.animal_map[x + dx][y + dy]:
                     if animal.type == organisms.Type.RABBIT:
                         if not animal.in_burrow:
@@ -794,134 +681,86 @@ class Fox(organisms.Organism):
                                 best_rabbit_size = animal.size
 
             if best_rabbit is not None:
-                self.__outer._hunger -= 100 * FOX_SIZE_FACTOR * best_rabbit.size
-                for child in self.__outer.children:
-                    child._hunger -= 100 * FOX_SIZE_FACTOR * best_rabbit.size
-                self._status = bt.Status.SUCCESS
+                agent._hunger -= 100 * parameters.fox.FOX_SIZE_FACTOR * best_rabbit.size
+                for child in agent.children:
+                    child._hunger -= 100 * parameters.fox.FOX_SIZE_FACTOR * best_rabbit.size
+                ecosystem.record_eaten(agent, best_rabbit)
                 best_rabbit.health = 0
+                return bt.Status.SUCCESS
             else:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
 
     class RabbitVisible(bt.Condition):
         """Check if there is a rabbit in the fox's vision range."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    for animal in ecosystem.animal_map[x + dx][y + dy]:
-                        if animal.type == organisms.Type.RABBIT:
-                            return True
-            return False
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            return ecosystem.spatial_index.any_in_box(organisms.Type.RABBIT, x, y, vision_range)
 
     class FindPathToRabbit(bt.Action):
         """Finds a path to the closest rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            rabbit = None
-            best_distance = math.inf
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    distance = helpers.EuclidianDistance(x, y, x + dx, y + dy)
-                    if distance < best_distance:
-                        for animal in ecosystem.animal_map[x + dx][y + dy]:
-                            if animal.type == organisms.Type.RABBIT:
-                                rabbit = animal
-                                best_distance = distance
-                                break
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            rabbit = ecosystem.spatial_index.nearest(organisms.Type.RABBIT, x, y, vision_range)
 
             path = []
             if rabbit is not None:
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                             x, y, rabbit.x, rabbit.y, max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, rabbit.x, rabbit.y, max_path_length=parameters.fox.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     class SmellExists(bt.Condition):
         """Check if there is smell of a rabbit nearby."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    if ecosystem.rabbit_smell_map[x + dx][y + dy] > 0:
-                        return True
-            return False
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            smell, _, _ = box_window(ecosystem.rabbit_smell_map, x, y, vision_range)
+            return (smell > 0).any()
 
     class FindPathToSmell(bt.Action):
         """Find a path to the cell with the largest rabbit smell."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
             smell_position = None
-            largest_smell = 0
 
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    if ecosystem.rabbit_smell_map[x + dx][y + dy] > largest_smell:
-                        smell_position = (x + dx, y + dy)
-                        largest_smell = ecosystem.rabbit_smell_map[x + dx][y + dy]
+            smell, min_x, min_y = box_window(ecosystem.rabbit_smell_map, x, y, vision_range)
+            largest_x, largest_y = np.unravel_index(smell.argmax(), smell.shape)
+            if smell[largest_x, largest_y] > 0:
+                smell_position = (min_x + int(largest_x), min_y + int(largest_y))
 
             path = []
             if smell_position is not None:
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                             x, y, smell_position[0], smell_position[1], max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, smell_position[0], smell_position[1], max_path_length=parameters.fox.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     ##########
     # THIRST #
@@ -929,32 +768,21 @@ class Fox(organisms.Organism):
 
     class ThirstierThanTired(bt.Condition):
         """Check if the fox is thirstier than it is tired."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._thirst >= self.__outer._tired
+        def condition(self, agent):
+            return agent._thirst >= agent._tired
 
     class Thirsty(bt.Condition):
         """Check if the fox is thirsty."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return not self.__outer._stabilized_health and self.__outer._thirst >= THIRST_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return not agent._stabilized_health and agent._thirst >= parameters.fox.THIRST_SEEK_THRESHOLD
 
     class WaterAdjacent(bt.Condition):
         """Check if there is water next to the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
             for direction in list(helpers.Direction):
                 dx = direction.value[0]
@@ -970,16 +798,12 @@ class Fox(organisms.Organism):
 
     class Drink(bt.Action):
         """Drinks from an adjacent cell."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-            self._status = bt.Status.FAIL
             for direction in list(helpers.Direction):
                 dx = direction.value[0]
                 dy = direction.value[1]
@@ -988,47 +812,35 @@ class Fox(organisms.Organism):
                     continue
 
                 if ecosystem.water_map[x + dx][y + dy]:
-                    ecosystem.water_map[x + dx][y + dy].water_amount -= WATER_DRINKING_AMOUNT
-                    self.__outer._thirst = 0
-                    for child in self.__outer.children:
+                    ecosystem.water_map[x + dx][y + dy].water_amount -= parameters.fox.WATER_DRINKING_SHARE * parameters.water.WATER_POOL_CAPACITY
+                    agent._thirst = 0
+                    for child in agent.children:
                         child.mother_drinking = True
-                    self._status = bt.Status.SUCCESS
-                    if self.__outer.mother_drinking:
-                        self.__outer.mother_drinking = False
-                    break
+                    if agent.mother_drinking:
+                        agent.mother_drinking = False
+                    return bt.Status.SUCCESS
+            return bt.Status.FAIL
 
     class FindPathToWater(bt.Action):
         """Finds a path to the best water source."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-            best_water = None
-            best_distance = math.inf
-
-            for water_x in range(ecosystem.width):
-                for water_y in range(ecosystem.height):
-                    distance = helpers.EuclidianDistance(x, y, water_x, water_y)
-                    if distance < best_distance:
-                        if ecosystem.water_map[water_x][water_y]:
-                            best_water = ecosystem.water_map[water_x][water_y]
-                            best_distance = distance
-
-
-            path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                               x, y, best_water.x, best_water.y, max_path_length=PATH_LENGTH)
+            path = []
+            best_water = ecosystem.water_field.nearest_water(x, y)
+            if best_water is not None:
+                path = ecosystem.find_path(agent, x, y, best_water[0], best_water[1], max_path_length=parameters.fox.PATH_LENGTH,
+                                           shared_goal=True)
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     #############
     # TIREDNESS #
@@ -1036,25 +848,18 @@ class Fox(organisms.Organism):
 
     class Tired(bt.Condition):
         """Determines if the fox is tired."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return not self.__outer._stabilized_health and self.__outer._tired >= TIRED_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return not agent._stabilized_health and agent._tired >= parameters.fox.TIRED_SEEK_THRESHOLD
 
     class Sleep(bt.Action):
         """Fox goes to sleep."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._asleep = True
-            for child in self.__outer.children:
+        def action(self, agent):
+            agent._asleep = True
+            for child in agent.children:
                 child.mother_sleeping = True
-            self.__outer.mother_sleeping = False
-            self._status = bt.Status.SUCCESS
+            agent.mother_sleeping = False
+            return bt.Status.SUCCESS
 
     ###########
     # NURSING #
@@ -1062,70 +867,60 @@ class Fox(organisms.Organism):
 
     class ShouldNurse(bt.Condition):
         """Determines if the fox should nurse its children or not."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            den = self.__outer.den
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            den = agent.den
 
             if den is not None:
                 # Should nurse if the time it takes to reach den is what's left
                 # on the timer.
                 distance = helpers.EuclidianDistance(x, y, den.x, den.y)
-                nurse_timer = self.__outer._nurse_timer
+                nurse_timer = agent._nurse_timer
                 return distance >= nurse_timer
             else:
                 return False
 
     class Nurse(bt.Action):
         """The fox nurses its children."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-            self.__outer._nurse_timer = NURSE_COOLDOWN
+            agent._nurse_timer = parameters.fox.NURSE_COOLDOWN
 
             for animal in ecosystem.animal_map[x][y]:
-                if animal.type == organisms.Type.FOX and animal.age <= NEW_BORN_TIME:
+                if animal.type == organisms.Type.FOX and animal.age <= parameters.fox.NEW_BORN_TIME:
                     animal._hunger = 0
                     animal._thirst = 0
                     animal._tired = 0
 
-            self._status = bt.Status.SUCCESS
+            return bt.Status.SUCCESS
 
     class FindPathToDen(bt.Action):
         """Finds a path to the fox's den."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            den = self.__outer.den
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            den = agent.den
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
             path = []
             if den is not None:
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                             x, y, den.x, den.y, max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, den.x, den.y, max_path_length=parameters.fox.PATH_LENGTH,
+                                           shared_goal=True)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     ################
     # GIVING BIRTH #
@@ -1133,107 +928,81 @@ class Fox(organisms.Organism):
 
     class Pregnant(bt.Condition):
         """Determines if the fox is pregnant or not."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.pregnant
+        def condition(self, agent):
+            return agent.pregnant
 
     class TimeToGiveBirth(bt.Condition):
         """Determines if the time has come to give birth."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.reproduction_timer <= REPRODUCTION_COOLDOWN
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.reproduction_timer <= parameters.fox.REPRODUCTION_COOLDOWN
 
     class GiveBirth(bt.Action):
         """The fox gives birth."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._stabilized_health = False
-            self.__outer.pregnant = False
-            self.__outer._stop_nursing_timer = NEW_BORN_TIME
-            self.__outer._nurse_timer = 0
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            agent._stabilized_health = False
+            agent.pregnant = False
+            agent._stop_nursing_timer = parameters.fox.NEW_BORN_TIME
+            agent._nurse_timer = 0
 
             minimum_amount = 4
             maximum_amount = 6
 
-            x = self.__outer.x
-            y = self.__outer.y
-            den = self.__outer.den
-            ecosystem = self.__outer._ecosystem
+            x = agent.x
+            y = agent.y
+            den = agent.den
+            ecosystem = agent._ecosystem
 
             if den is not None:
-                import numpy as np
-                for _ in range(random.randint(minimum_amount, maximum_amount)):
-                    gender = random.choice([True, False])
-                    genetics_factor = (self.__outer.genetics_factor + self.__outer.partner_genetics_factor) / 2
-                    mutation = np.random.normal(0, 0.1)
+                for _ in range(ecosystem.rng.fox.randint(minimum_amount, maximum_amount)):
+                    gender = ecosystem.rng.fox.choice([True, False])
+                    genetics_factor = (agent.genetics_factor + agent.partner_genetics_factor) / 2
+                    mutation = ecosystem.rng.fox.gauss(0, 0.1)
                     genetics_factor += mutation
                     fox = Fox(ecosystem, x, y, gender, adult=False, den=den,
-                              in_den=True, mother=self.__outer,
+                              in_den=True, mother=agent,
                               genetics_factor=genetics_factor)
-                    ecosystem.animal_map[x][y].append(fox)
-                    self.__outer.children.append(fox)
+                    ecosystem.add_animal(fox)
+                    agent.children.append(fox)
 
-                self._status = bt.Status.SUCCESS
+                return bt.Status.SUCCESS
             else:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
 
     class CloseToBirth(bt.Condition):
         """Determines if the fox is about to give birth."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.reproduction_timer <= REPRODUCTION_COOLDOWN + 24*1
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.reproduction_timer <= parameters.fox.REPRODUCTION_COOLDOWN + 24*1
 
     class InDen(bt.Condition):
         """Determines if the fox is in its burrow."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.in_den
+        def condition(self, agent):
+            return agent.in_den
 
     class StabilizeHealth(bt.Action):
         """Stabilizes the fox's health for the remainder of the pregnancy."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._stabilized_health = True
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._stabilized_health = True
+            return bt.Status.SUCCESS
 
     class CreateDen(bt.Action):
         """The fox creates a new den."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
+        def action(self, agent):
             from den import Den
 
-            if not self.__outer.in_den:
-                x = self.__outer.x
-                y = self.__outer.y
-                den = Den(self.__outer._ecosystem, x, y)
-                self.__outer._ecosystem.animal_map[x][y].insert(0, den)
-                self.__outer.den = den
+            if not agent.in_den:
+                x = agent.x
+                y = agent.y
+                den = Den(agent._ecosystem, x, y)
+                agent._ecosystem.add_animal(den, index=0)
+                agent.den = den
 
                 # Increase hunger due to having to dig a hole
-                if not self.__outer._stabilized_health:
-                    self.__outer._hunger += 3 * self.__outer._hunger_speed
-            self._status = bt.Status.SUCCESS
+                if not agent._stabilized_health:
+                    agent._hunger += 3 * agent._hunger_speed
+            return bt.Status.SUCCESS
 
     ################
     # REPRODUCTION #
@@ -1241,223 +1010,152 @@ class Fox(organisms.Organism):
 
     class CanReproduce(bt.Condition):
         """Determines if the fox can reproduce."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.can_reproduce
+        def condition(self, agent):
+            return agent.can_reproduce
 
     class HavePartner(bt.Condition):
         """Determines if the fox has a partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.partner is not None
+        def condition(self, agent):
+            return agent.partner is not None
 
     class PartnerCanReproduce(bt.Condition):
         """Determines if the fox's partner can reproduce."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.partner.can_reproduce
+        def condition(self, agent):
+            return agent.partner.can_reproduce
 
     class PartnerAdjacent(bt.Condition):
         """Determines if the partner is in the same cell as the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            partner = self.__outer.partner
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            partner = agent.partner
 
             return x == partner.x and y == partner.y
 
     class Reproduce(bt.Action):
         """The fox and its partner do the funky stuff."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            partner = self.__outer.partner
-
-            if self.__outer.female:
-                self.__outer.pregnant = True
-                self.__outer.reproduction_timer = REPRODUCTION_COOLDOWN + REPRODUCTION_TIME
-                self.__outer.can_reproduce = False
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            partner = agent.partner
+
+            if agent.female:
+                agent.pregnant = True
+                agent.reproduction_timer = parameters.fox.REPRODUCTION_COOLDOWN + parameters.fox.REPRODUCTION_TIME
+                agent.can_reproduce = False
             else:
                 partner.pregnant = True
-                partner.reproduction_timer = REPRODUCTION_COOLDOWN + REPRODUCTION_TIME
+                partner.reproduction_timer = parameters.fox.REPRODUCTION_COOLDOWN + parameters.fox.REPRODUCTION_TIME
                 partner.can_reproduce = False
-            self._status = bt.Status.SUCCESS
+            return bt.Status.SUCCESS
 
     class PartnerNearby(bt.Condition):
         """Determines if the fox's partner is within vision range."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-            partner = self.__outer.partner
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    if x + dx == partner.x and y + dy == partner.y:
-                        return True
-            return False
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+            partner = agent.partner
+
+            return in_box(x, y, vision_range, partner.x, partner.y)
 
     class FindPathToPartner(bt.Action):
         """Finds a path to the fox's partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
-            partner = self.__outer.partner
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
+            partner = agent.partner
 
-            path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                         x, y, partner.x, partner.y, max_path_length=PATH_LENGTH)
+            path = ecosystem.find_path(agent, x, y, partner.x, partner.y, max_path_length=parameters.fox.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     class NoPartner(bt.Condition):
         """Determines if the fox has no partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.partner is None
+        def condition(self, agent):
+            return agent.partner is None
 
     class AvailableFoxAdjacent(bt.Condition):
         """Determines if there is a fox with no partner that can reproduce
         that is on the same cell as the fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
             for animal in ecosystem.animal_map[x][y]:
-                if animal is not self.__outer:
+                if animal is not agent:
                     if animal.type == organisms.Type.FOX:
-                        if not animal.partner and animal.can_reproduce and animal.female != self.__outer.female:
+                        if not animal.partner and animal.can_reproduce and animal.female != agent.female:
                             return True
             return False
 
     class MakePartner(bt.Action):
         """Make the available fox this fox's partner and vice versa."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-            self._status = bt.Status.FAIL
+            status = bt.Status.FAIL
             for animal in ecosystem.animal_map[x][y]:
-                if animal is not self.__outer:
+                if animal is not agent:
                     if animal.type == organisms.Type.FOX:
-                        if not animal.partner and animal.can_reproduce and animal.female is not self.__outer.female:
-                            self._status = bt.Status.SUCCESS
-                            self.__outer.partner = animal
-                            animal.partner_genetics_factor = self.__outer.genetics_factor
-                            animal.partner = self.__outer
-                            self.__outer.partner_genetics_factor = animal.genetics_factor
+                        if not animal.partner and animal.can_reproduce and animal.female is not agent.female:
+                            status = bt.Status.SUCCESS
+                            agent.partner = animal
+                            animal.partner_genetics_factor = agent.genetics_factor
+                            animal.partner = agent
+                            agent.partner_genetics_factor = animal.genetics_factor
+            return status
 
     class AvailableFoxNearby(bt.Condition):
         """Determines if there is a fox in this fox's vision range
         that can reproduce and has no partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    for animal in ecosystem.animal_map[x + dx][y + dy]:
-                        if animal is not self.__outer:
-                            if animal.type == organisms.Type.FOX:
-                                if not animal.partner and animal.can_reproduce and animal.female is not self.__outer.female:
-                                    return True
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            for animal in ecosystem.spatial_index.animals_in_box(organisms.Type.FOX, x, y, vision_range):
+                if animal is not agent:
+                    if not animal.partner and animal.can_reproduce and animal.female is not agent.female:
+                        return True
             return False
 
     class FindPathToFox(bt.Action):
         """Finds a path to the available fox."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            closest_rabbit = None
-            best_distance = math.inf
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    distance = helpers.EuclidianDistance(x, y, x + dx, y + dy)
-                    if distance < best_distance:
-                        for animal in ecosystem.animal_map[x + dx][y + dy]:
-                            if animal is not self.__outer:
-                                if animal.type == organisms.Type.FOX:
-                                    if not animal.partner and animal.can_reproduce and animal.female is not self.__outer.female:
-                                        closest_rabbit = animal
-                                        best_distance = distance
-                                        break
-
-            path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                         x, y, closest_rabbit.x, closest_rabbit.y, max_path_length=PATH_LENGTH)
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            def available(animal):
+                return (animal is not agent and not animal.partner and
+                        animal.can_reproduce and animal.female is not agent.female)
+
+            closest_rabbit = ecosystem.spatial_index.nearest(organisms.Type.FOX, x, y, vision_range, available)
+
+            path = ecosystem.find_path(agent, x, y, closest_rabbit.x, closest_rabbit.y, max_path_length=parameters.fox.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     ###################
     # RANDOM MOVEMENT #
@@ -1465,36 +1163,23 @@ class Fox(organisms.Organism):
 
     class MoveRandomly(bt.Action):
         """Moves the fox randomly."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
+        def action(self, agent):
             # TODO: Make excessive movement result in size decrease?
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
-            direction = random.choice(list(helpers.Direction))
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
+            direction = ecosystem.rng.fox.choice(list(helpers.Direction))
             dx = direction.value[0]
             dy = direction.value[1]
 
             if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
             elif ecosystem.water_map[x + dx][y + dy]:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
             elif ecosystem.animal_map[x + dx][y + dy]:
-                occupied_space = 0
-                if ecosystem.plant_map[x + dx][y + dy] and ecosystem.plant_map[x + dx][y + dy].type == organisms.Type.TREE:
-                    occupied_space += 50
-                for animal in ecosystem.animal_map[x + dx][y + dy]:
-                    occupied_space += animal.size
-                from ecosystem import ANIMAL_CELL_CAPACITY
-                if occupied_space + self.__outer.size > ANIMAL_CELL_CAPACITY:
-                    self._status = bt.Status.FAIL
+                # The animal stays where it is, also when the cell has room left
+                return bt.Status.FAIL
             else:
-                self._status = bt.Status.SUCCESS
-                self.__outer._movement_timer += self.__outer._movement_cooldown
-                index = ecosystem.animal_map[x][y].index(self.__outer)
-                ecosystem.animal_map[x + dx][y + dy].append(ecosystem.animal_map[x][y].pop(index))
-                self.__outer.x += dx
-                self.__outer.y += dy
+                agent._movement_timer += agent._movement_cooldown
+                ecosystem.move_animal(agent, x + dx, y + dy)
+                return bt.Status.SUCCESS
@@ -0,0 +1,210 @@
+import heapq
+import math
+from collections import deque
+import helpers
+from astar import astar_on_layers
+
+CLUSTER_SIZE = 16 # Width and height of the clusters the map is split into
+DIRECTIONS = [direction.value for direction in helpers.Direction if direction != helpers.Direction.CENTER]
+
+
+class HierarchicalPathfinder():
+    """Finds long paths HPA* style. The map is split into clusters, and
+    entrances are placed in the middle of each open stretch of the border
+    between two clusters. The abstract graph connects the entrances of a
+    cluster with the walking distance between them inside the cluster, and
+    the entrances on both sides of a border with one step. A path is first
+    found on the abstract graph and then refined with astar between the
+    entrances along it, only as far as it is needed.
+
+    The graph only depends on the terrain blocked map. It is built lazily per
+    cluster and border, and the parts around a cell are dropped when the
+    terrain of the cell changes."""
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        # Transitions over the border between two clusters, keyed on the
+        # clusters ordered on x and then on y
+        self._transitions = {}
+        # Entrances of each cluster, with the cells they step to in other
+        # clusters and the distance to the other entrances of the cluster
+        self._clusters = {}
+
+    def mark_terrain_changed(self, x, y):
+        """Drops the parts of the graph depending on the given cell."""
+        cluster_x = x // CLUSTER_SIZE
+        cluster_y = y // CLUSTER_SIZE
+        self._clusters.pop((cluster_x, cluster_y), None)
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            neighbour = (cluster_x + dx, cluster_y + dy)
+            self._transitions.pop(tuple(sorted(((cluster_x, cluster_y), neighbour))), None)
+            self._clusters.pop(neighbour, None)
+
+    def cluster_bounds(self, cluster):
+        """Returns the first and one past the last cell of the cluster along
+        each axis."""
+        min_x = cluster[0] * CLUSTER_SIZE
+        min_y = cluster[1] * CLUSTER_SIZE
+        return min_x, min(min_x + CLUSTER_SIZE, self.width), min_y, min(min_y + CLUSTER_SIZE, self.height)
+
+    def get_transitions(self, terrain_blocked_map, cluster, neighbour):
+        """Returns a list of pairs of cells, the first in the cluster and the
+        second in the neighbouring cluster, where the border between them can
+        be crossed."""
+        first, second = sorted((cluster, neighbour))
+        key = (first, second)
+        if key not in self._transitions:
+            min_x, max_x, min_y, max_y = self.cluster_bounds(first)
+            if second[0] != first[0]:
+                # The second cluster is to the east of the first
+                pairs = [((max_x - 1, y), (max_x, y)) for y in range(min_y, max_y)]
+            else:
+                # The second cluster is to the north of the first
+                pairs = [((x, max_y - 1), (x, max_y)) for x in range(min_x, max_x)]
+
+            transitions = []
+            stretch = []
+            for pair in pairs + [None]:
+                if pair is not None and not terrain_blocked_map[pair[0]] and not terrain_blocked_map[pair[1]]:
+                    stretch.append(pair)
+                elif stretch:
+                    transitions.append(stretch[len(stretch) // 2])
+                    stretch = []
+            self._transitions[key] = transitions
+
+        transitions = self._transitions[key]
+        if cluster == first:
+            return transitions
+        return [(inside, outside) for outside, inside in transitions]
+
+    def distances_in_cluster(self, terrain_blocked_map, cluster, start):
+        """Returns a dict with the walking distance from the start to the cells
+        of the cluster that can be reached without leaving it. The start
+        itself does not have to be walkable."""
+        min_x, max_x, min_y, max_y = self.cluster_bounds(cluster)
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            distance = distances[current] + 1
+            for dx, dy in DIRECTIONS:
+                node = (current[0] + dx, current[1] + dy)
+                if min_x <= node[0] < max_x and min_y <= node[1] < max_y and \
+                        node not in distances and not terrain_blocked_map[node]:
+                    distances[node] = distance
+                    queue.append(node)
+        return distances
+
+    def get_cluster(self, terrain_blocked_map, cluster):
+        """Returns a dict from each entrance of the cluster to a list of
+        (cell, cost) edges, to entrances of neighbouring clusters and to the
+        other entrances of the cluster."""
+        if cluster not in self._clusters:
+            cluster_x, cluster_y = cluster
+            columns = math.ceil(self.width / CLUSTER_SIZE)
+            rows = math.ceil(self.height / CLUSTER_SIZE)
+            entrances = {}
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                neighbour = (cluster_x + dx, cluster_y + dy)
+                if 0 <= neighbour[0] < columns and 0 <= neighbour[1] < rows:
+                    for inside, outside in self.get_transitions(terrain_blocked_map, cluster, neighbour):
+                        entrances.setdefault(inside, []).append((outside, 1))
+
+            for entrance, edges in entrances.items():
+                distances = self.distances_in_cluster(terrain_blocked_map, cluster, entrance)
+                for other in entrances:
+                    if other != entrance and other in distances:
+                        edges.append((other, distances[other]))
+            self._clusters[cluster] = entrances
+        return self._clusters[cluster]
+
+    def find_abstract_path(self, terrain_blocked_map, start, end):
+        """Returns the list of cells along the shortest path from the start to
+        the end on the abstract graph, or None if there is none."""
+        start_cluster = (start[0] // CLUSTER_SIZE, start[1] // CLUSTER_SIZE)
+        end_cluster = (end[0] // CLUSTER_SIZE, end[1] // CLUSTER_SIZE)
+
+        # Connect the start and the end to the entrances of their clusters
+        start_distances = self.distances_in_cluster(terrain_blocked_map, start_cluster, start)
+        start_entrances = self.get_cluster(terrain_blocked_map, start_cluster)
+        start_edges = [(entrance, start_distances[entrance])
+                       for entrance in start_entrances if entrance in start_distances]
+        start_edges += start_entrances.get(start, [])
+        if end in start_distances:
+            start_edges.append((end, start_distances[end]))
+        end_distances = self.distances_in_cluster(terrain_blocked_map, end_cluster, end)
+
+        # The Chebyshev distance never overestimates with diagonal steps
+        def heuristic(node):
+            return max(abs(node[0] - end[0]), abs(node[1] - end[1]))
+
+        open_heap = [(heuristic(start), 0, start)]
+        best_g = {start: 0}
+        parents = {start: None}
+        closed = set()
+        discovered = 0
+        while open_heap:
+            _, _, current = heapq.heappop(open_heap)
+            if current in closed:
+                continue
+            closed.add(current)
+
+            if current == end:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1]
+
+            if current == start:
+                edges = start_edges
+            else:
+                cluster = (current[0] // CLUSTER_SIZE, current[1] // CLUSTER_SIZE)
+                edges = self.get_cluster(terrain_blocked_map, cluster)[current]
+                if cluster == end_cluster and current in end_distances:
+                    edges = edges + [(end, end_distances[current])]
+
+            for node, cost in edges:
+                g = best_g[current] + cost
+                if node in closed or (node in best_g and best_g[node] <= g):
+                    continue
+                best_g[node] = g
+                parents[node] = current
+                discovered += 1
+                heapq.heappush(open_heap, (g + heuristic(node), discovered, node))
+        return None
+
+    def find_path(self, terrain_blocked_map, occupancy_map, size, start_x, start_y, end_x, end_y,
+                  max_path_length=math.inf):
+        """Returns a list of tuples as a path from the given start to the given
+        end, or None if no path was found on the abstract graph or it could not
+        be refined. Like astar, the path stops after max_path_length + 1 steps.
+        If the end cannot be walked on, the path goes to its free neighbour
+        closest to the start."""
+        start = (start_x, start_y)
+        end = (end_x, end_y)
+        if terrain_blocked_map[end]:
+            free_neighbours = [(end_x + dx, end_y + dy) for dx, dy in DIRECTIONS
+                               if 0 <= end_x + dx < self.width and 0 <= end_y + dy < self.height and
+                               not terrain_blocked_map[end_x + dx, end_y + dy]]
+            if not free_neighbours:
+                return None
+            end = min(free_neighbours, key=lambda node: (node[0] - start_x) ** 2 + (node[1] - start_y) ** 2)
+
+        abstract_path = self.find_abstract_path(terrain_blocked_map, start, end)
+        if abstract_path is None:
+            return None
+
+        path = [start]
+        for waypoint in abstract_path[1:]:
+            if len(path) > max_path_length + 1:
+                break
+            # Animals in the way may make the refined part longer than the
+            # distance on the abstract graph, but not much longer
+            distance = max(abs(waypoint[0] - path[-1][0]), abs(waypoint[1] - path[-1][1]))
+            segment = astar_on_layers(size, terrain_blocked_map, occupancy_map, path[-1][0], path[-1][1],
+                                      waypoint[0], waypoint[1], max_path_length=2 * distance + CLUSTER_SIZE)
+            if not segment or segment[-1] != waypoint:
+                return None
+            path.extend(segment[1:])
+        return path[:int(min(max_path_length + 2, len(path)))]
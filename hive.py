@@ -8,6 +8,10 @@ BEE_FOOD_COST = 5
 
 class Hive(organisms.Organism):
     """Defines the hive, which is just an immovable object."""
+    __slots__ = (
+        'size', 'food', 'bees', '_capacity', 'has_scout'
+    )
+
     def __init__(self, ecosystem, x, y, size=10, food=300, capacity=10):
         super().__init__(ecosystem, organisms.Type.HIVE, x, y)
         self.size = size
@@ -19,15 +23,16 @@ class Hive(organisms.Organism):
     def get_image(self):
         return 'images/hive.png'
 
-    def generate_tree(self):
+    @classmethod
+    def generate_tree(cls):
         """Generates the tree for the hive."""
         tree = bt.FallBack()
 
-        sequence = bt.Sequence()
-        create_bee_sequence = bt.Sequence()
-        create_bee_sequence.add_child(self.ShouldCreateBee(self))
-        create_bee_sequence.add_child(self.HaveEnoughtRoom(self))
-        create_bee_sequence.add_child(self.CreateBee(self))
+        sequence = bt.Sequence('sequence')
+        create_bee_sequence = bt.Sequence('create_bee_sequence')
+        create_bee_sequence.add_child(cls.ShouldCreateBee())
+        create_bee_sequence.add_child(cls.HaveEnoughtRoom())
+        create_bee_sequence.add_child(cls.CreateBee())
         sequence.add_child(create_bee_sequence)
 
         tree.add_child(sequence)
@@ -37,34 +42,24 @@ class Hive(organisms.Organism):
 
     class ShouldCreateBee(bt.Condition):
         """Check if the hive can create a bee"""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.food >= HIVE_BEE_MAKING_THRESHOLD or (self.__outer.food >= BEE_FOOD_COST and len(self.__outer.bees) <= 5 )
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.food >= parameters.hive.HIVE_BEE_MAKING_THRESHOLD or (agent.food >= parameters.hive.BEE_FOOD_COST and len(agent.bees) <= 5 )
 
 
     class HaveEnoughtRoom(bt.Condition):
         """Check if there is enough room in the hive"""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._capacity > len(self.__outer.bees)
+        def condition(self, agent):
+            return agent._capacity > len(agent.bees)
 
 
     class CreateBee(bt.Action):
-            def __init__(self, outer):
-                super().__init__()
-                self.__outer = outer
-
-            def action(self):
-                x = self.__outer.x
-                y = self.__outer.y
-                bee = Bee(self.__outer._ecosystem,x, y, hive = self.__outer)
-                self.__outer._ecosystem.animal_map[x][y].append(bee)
-                self.__outer.bees.append(bee)
-                self.__outer.food -= BEE_FOOD_COST
-                self._status = bt.Status.SUCCESS
+            def action(self, agent):
+                parameters = agent._ecosystem.parameters
+                x = agent.x
+                y = agent.y
+                bee = Bee(agent._ecosystem,x, y, hive = agent)
+                agent._ecosystem.add_animal(bee)
+                agent.bees.append(bee)
+                agent.food -= parameters.hive.BEE_FOOD_COST
+                return bt.Status.SUCCESS
@@ -0,0 +1,92 @@
+import csv
+import numpy as np
+from organisms import Type
+
+METRICS_CHUNK_SIZE = 1000 # Rows of metrics kept in memory before they are written
+
+# Columns of the metrics file, one row is written per step
+METRICS = ['step', 'rabbits', 'foxes', 'bees', 'flowers', 'grass', 'rabbit_genetics_factor', 'fox_genetics_factor']
+POPULATIONS = ['rabbits', 'foxes', 'bees', 'flowers', 'grass']
+
+
+def measure(step, registry):
+    """Returns the population amounts and the average genetics factors of the
+    rabbits and foxes after the given step, read from the counters of the
+    organism registry returned by Ecosystem.run."""
+    metrics = dict.fromkeys(METRICS, 0)
+    metrics['step'] = step
+    metrics['rabbits'] = registry.count(Type.RABBIT)
+    metrics['foxes'] = registry.count(Type.FOX)
+    metrics['bees'] = registry.count(Type.BEE)
+    metrics['flowers'] = registry.count(Type.FLOWER)
+    metrics['grass'] = registry.count(Type.GRASS)
+
+    if metrics['rabbits'] != 0:
+        metrics['rabbit_genetics_factor'] = registry.genetics_factor_sum(Type.RABBIT) / metrics['rabbits']
+    if metrics['foxes'] != 0:
+        metrics['fox_genetics_factor'] = registry.genetics_factor_sum(Type.FOX) / metrics['foxes']
+    return metrics
+
+
+class MetricsWriter():
+    """Writes the metrics of every step as CSV to an output file. The rows are
+    kept in a chunk of a fixed size and written when it is full, so the memory
+    used stays the same however many steps are run. The header is left out
+    when continuing a file that already has one."""
+    def __init__(self, output, chunk_size=METRICS_CHUNK_SIZE, header=True):
+        self.output = output
+        self.chunk_size = chunk_size
+        self._writer = csv.writer(output)
+        if header:
+            self._writer.writerow(METRICS)
+        self._chunk = []
+
+    def append(self, metrics):
+        """Adds the metrics of a step."""
+        self._chunk.append([metrics[name] for name in METRICS])
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the rows in the chunk to the output file."""
+        self._writer.writerows(self._chunk)
+        self._chunk.clear()
+        self.output.flush()
+
+
+def truncate_metrics(path, step):
+    """Removes the rows of the given step and later from a metrics file, so
+    that a run resumed from a snapshot of that step does not write them
+    twice. Returns False if there is no metrics file with a header to
+    continue."""
+    try:
+        metrics_file = open(path, 'r+b')
+    except FileNotFoundError:
+        return False
+    with metrics_file:
+        if not metrics_file.readline():
+            return False
+        kept = metrics_file.tell()
+        step_column = METRICS.index('step')
+        for row in metrics_file:
+            if int(row.split(b',')[step_column]) >= step:
+                break
+            kept += len(row)
+        metrics_file.truncate(kept)
+    return True
+
+
+def read_metrics(path, every=1):
+    """Returns a dict with a numpy array of every column of a metrics file,
+    keeping only every given amount of rows, to plot long runs without
+    loading all of them."""
+    columns = {name: [] for name in METRICS}
+    with open(path, newline='') as metrics_file:
+        reader = csv.reader(metrics_file)
+        header = next(reader)
+        for row_index, row in enumerate(reader):
+            if row_index % every:
+                continue
+            for name, value in zip(header, row):
+                columns[name].append(float(value))
+    return {name: np.array(values) for name, values in columns.items()}
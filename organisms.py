@@ -19,24 +19,37 @@ class Type(Enum):
 
 
 class Organism(ABC):
-    """An abstract class container for organisms. Contains the tree for the
-    organism. Subclasses must implement a tree generation function.
+    """An abstract class container for organisms. The behaviour tree is
+    generated and compiled once per species, and shared by all organisms of
+    that species, so its nodes must not keep any state of the organism they
+    run for. The state lives on the organism, and statuses are returned by
+    the nodes. Subclasses must implement a tree generation function, and list
+    their attributes in __slots__.
     """
+    __slots__ = ('_ecosystem', 'type', 'x', 'y')
+
     def __init__(self, ecosystem, type, x, y):
         self._ecosystem = ecosystem
         self.type = type
         self.x = x
         self.y = y
-        self._tree = self.generate_tree()
 
+    @classmethod
     @abstractmethod
-    def generate_tree(self):
+    def generate_tree(cls):
         pass
 
+    @classmethod
+    def get_tree(cls):
+        """Returns the compiled behaviour tree of the species."""
+        if '_compiled_tree' not in cls.__dict__:
+            cls._compiled_tree = bt.compile_tree(cls.generate_tree())
+        return cls._compiled_tree
+
     @abstractmethod
     def get_image(self):
         pass
 
     def run(self):
         """Runs the organism's behaviour tree and returns the result."""
-        return self._tree.run()
+        return self.get_tree().run(self)
@@ -0,0 +1,119 @@
+import math
+import helpers
+from astar import astar_on_layers
+
+SIZE_CLASS_STEP = 5 # Traverser sizes are rounded up to a multiple of this
+MAX_ENTRIES = 20000
+DIRECTIONS = [direction.value for direction in helpers.Direction]
+
+
+def size_class(size):
+    """Returns the size class of a traverser of the given size. Paths are
+    searched for the size class, which is never smaller than the size."""
+    return math.ceil(size / SIZE_CLASS_STEP) * SIZE_CLASS_STEP
+
+
+class PathCache():
+    """Caches the paths found by astar. Each path is stored with the cells the
+    search looked at, and is dropped when one of these cells changes in a way
+    that changes whether the size class of the path can walk into it. A search
+    only depends on the cells it looked at, so a cached path is always the
+    path astar would find."""
+    def __init__(self, width, height, cell_capacity):
+        self.width = width
+        self.height = height
+        self.cell_capacity = cell_capacity
+        # Cached paths with the cells they depend on, or None for paths that
+        # were dropped since they were last looked up
+        self._entries = {}
+        # Keys of the cached paths depending on each cell
+        self._dependents = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def mark_terrain_changed(self, x, y):
+        """Invalidates the paths depending on the given cell."""
+        for key in list(self._dependents.get((x, y), ())):
+            self.drop(key)
+
+    def mark_occupancy_changed(self, x, y, old_occupancy, new_occupancy):
+        """Invalidates the paths depending on the given cell if the change makes
+        the cell blocked or free for their size class."""
+        keys = self._dependents.get((x, y))
+        if not keys:
+            return
+        cell_capacity = self.cell_capacity
+        for key in [key for key in keys if (old_occupancy > cell_capacity - key[4]) !=
+                    (new_occupancy > cell_capacity - key[4])]:
+            self.drop(key)
+
+    def drop(self, key):
+        """Drops the cached path with the given key, keeping the key to count
+        the next lookup of it as stale."""
+        path, cells = self._entries[key]
+        self._entries[key] = None
+        self.forget(key, cells)
+
+    def forget(self, key, cells):
+        """Removes the key from the dependents of the given cells."""
+        dependents = self._dependents
+        for cell in cells:
+            keys = dependents[cell]
+            keys.discard(key)
+            if not keys:
+                del dependents[cell]
+
+    def find_path(self, terrain_blocked_map, occupancy_map, size, start_x, start_y, end_x, end_y,
+                  max_path_length=math.inf):
+        """Returns a new list with the path from astar for the size class of the
+        given size, from the cache if it is still valid."""
+        traverser_size = size_class(size)
+        key = (start_x, start_y, end_x, end_y, traverser_size, max_path_length)
+        if key in self._entries:
+            entry = self._entries[key]
+            if entry is not None:
+                self.hits += 1
+                return list(entry[0])
+            self.stale += 1
+            del self._entries[key]
+        else:
+            self.misses += 1
+
+        closed = set()
+        path = astar_on_layers(traverser_size, terrain_blocked_map, occupancy_map,
+                               start_x, start_y, end_x, end_y, max_path_length=max_path_length, closed=closed)
+        # The search looked at the expanded cells and their neighbours
+        width = self.width
+        height = self.height
+        cells = {(x + dx, y + dy) for x, y in closed for dx, dy in DIRECTIONS
+                 if 0 <= x + dx < width and 0 <= y + dy < height}
+
+        if len(self._entries) >= MAX_ENTRIES:
+            # Drop the oldest entry
+            oldest = next(iter(self._entries))
+            entry = self._entries.pop(oldest)
+            if entry is not None:
+                self.forget(oldest, entry[1])
+        self._entries[key] = (path, cells)
+        dependents = self._dependents
+        for cell in cells:
+            if cell in dependents:
+                dependents[cell].add(key)
+            else:
+                dependents[cell] = {key}
+        return list(path)
+
+    def stats(self):
+        """Returns a dict with the amount of cache hits, misses and stale
+        entries, and the share of lookups that were hits."""
+        lookups = self.hits + self.misses + self.stale
+        return {
+            'lookups': lookups,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'hit_rate': self.hits / lookups if lookups else 0,
+            'entries': sum(entry is not None for entry in self._entries.values())
+        }
@@ -0,0 +1,193 @@
+import time
+import behaviour_tree as bt
+import ecosystem
+import hierarchical_paths
+import path_cache
+import water_field
+import weather
+
+# Methods and functions timed while profiling, as (owner, attribute, name)
+SECTIONS = [
+    (ecosystem.Ecosystem, 'run', 'Ecosystem.run'),
+    (weather.Weather, 'simulate_weather', 'simulate_weather'),
+    (ecosystem.Ecosystem, 'update_rabbit_smell_map', 'update_rabbit_smell_map'),
+    (water_field.WaterField, 'step', 'water_field.step'),
+    (ecosystem.Ecosystem, 'reset_nectar_smell_map', 'reset_nectar_smell_map'),
+    (ecosystem.Ecosystem, 'find_path', 'find_path'),
+    (path_cache, 'astar_on_layers', 'astar'),
+    (hierarchical_paths, 'astar_on_layers', 'astar')
+]
+
+
+class PathStats():
+    """The calls, the time and the statuses of one profiled call path."""
+    __slots__ = ('calls', 'time', 'success', 'fail', 'running')
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0
+        self.success = 0
+        self.fail = 0
+        self.running = 0
+
+
+class Profiler():
+    """Gathers the call counts, the time and the statuses of the behaviour
+    tree nodes of every species and of the phases of Ecosystem.run, keyed on
+    the call path, for example Ecosystem.run/Rabbit/logic_fallback/
+    hungry_sequence/FindPathToFood. While the profiler is entered it is the
+    timer of the compiled behaviour trees, which call it around every tree
+    run and instruction, and the SECTIONS are replaced with timed versions.
+    The composite nodes are not run by compiled trees, so they are timed
+    from the start of their first instruction to the end of their last one,
+    and have no statuses. Nothing is changed when the profiler is not
+    entered, so profiling costs nothing when it is off."""
+    def __init__(self):
+        self.stats = {}
+        self.stack = []
+        # The nodes open in the behaviour trees being run, with their start
+        # times, and the depth in the stack of every tree being run
+        self._open_nodes = []
+        self._tree_depths = []
+        self._original_values = []
+
+    def record(self, path, elapsed, status=None):
+        """Adds a call of the given path that took the given time."""
+        stats = self.stats.get(path)
+        if stats is None:
+            stats = self.stats[path] = PathStats()
+        stats.calls += 1
+        stats.time += elapsed
+        if status is bt.Status.SUCCESS:
+            stats.success += 1
+        elif status is bt.Status.FAIL:
+            stats.fail += 1
+        elif status is bt.Status.RUNNING:
+            stats.running += 1
+
+    def timed(self, name, function):
+        """Returns a version of the function that records its calls."""
+        profiler = self
+
+        def timed_function(*args, **kwargs):
+            profiler.stack.append(name)
+            path = tuple(profiler.stack)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(path, time.perf_counter() - start)
+                profiler.stack.pop()
+        return timed_function
+
+    def start_tree(self, agent):
+        """Starts timing the behaviour tree run of the agent."""
+        self.stack.append(type(agent).__name__)
+        self._open_nodes.append((None, time.perf_counter()))
+        self._tree_depths.append(len(self._open_nodes))
+
+    def start_instruction(self, nodes):
+        """Starts timing an instruction of the tree being run. The nodes are
+        the composite nodes from below the root down to the leaf. The
+        composite nodes left since the last instruction are ended, and the
+        ones entered are started."""
+        depth = self._tree_depths[-1]
+        open_nodes = self._open_nodes
+        kept = 0
+        while kept < len(nodes) - 1 and depth + kept < len(open_nodes) and \
+                open_nodes[depth + kept][0] is nodes[kept]:
+            kept += 1
+        self.end_nodes(depth + kept)
+        start = time.perf_counter()
+        for node in nodes[kept:]:
+            self.stack.append(bt.node_name(node))
+            open_nodes.append((node, start))
+
+    def end_instruction(self, status):
+        """Ends timing the leaf of the instruction being run."""
+        self.end_node(status)
+
+    def end_tree(self, status):
+        """Ends timing the open composite nodes and the behaviour tree run."""
+        self.end_nodes(self._tree_depths.pop())
+        self.end_node(status)
+
+    def end_nodes(self, depth):
+        """Ends timing the open nodes of the tree being run above the given
+        depth."""
+        while len(self._open_nodes) > depth:
+            self.end_node()
+
+    def end_node(self, status=None):
+        """Ends timing the last opened node."""
+        node, start = self._open_nodes.pop()
+        self.record(tuple(self.stack), time.perf_counter() - start, status)
+        self.stack.pop()
+
+    def __enter__(self):
+        self._original_values = [(bt.CompiledTree, 'timer', bt.CompiledTree.timer)]
+        bt.CompiledTree.timer = self
+        for owner, attribute, name in SECTIONS:
+            function = getattr(owner, attribute)
+            self._original_values.append((owner, attribute, function))
+            setattr(owner, attribute, self.timed(name, function))
+        return self
+
+    def __exit__(self, *exception):
+        for owner, attribute, value in reversed(self._original_values):
+            setattr(owner, attribute, value)
+        self._original_values = []
+
+    def self_times(self):
+        """Returns a dict with the time spent in every call path outside of
+        the paths below it."""
+        self_times = {path: stats.time for path, stats in self.stats.items()}
+        for path, stats in self.stats.items():
+            if len(path) > 1 and path[:-1] in self_times:
+                self_times[path[:-1]] -= stats.time
+        return self_times
+
+    def report(self):
+        """Returns a list with a dict for every call path, with the amount of
+        calls, the total and self time in seconds, and for behaviour tree
+        nodes the ratios of the statuses returned. The slowest paths come
+        first."""
+        self_times = self.self_times()
+        rows = [self._row({'path': '/'.join(path)}, stats, self_times[path]) for path, stats in self.stats.items()]
+        return sorted(rows, key=lambda row: row['time'], reverse=True)
+
+    def class_report(self):
+        """Returns the report with the paths of each node class or section
+        added together, keyed on the last part of the path."""
+        path_self_times = self.self_times()
+        totals = {}
+        self_times = {}
+        for path, stats in self.stats.items():
+            total = totals.setdefault(path[-1], PathStats())
+            total.calls += stats.calls
+            total.time += stats.time
+            total.success += stats.success
+            total.fail += stats.fail
+            total.running += stats.running
+            self_times[path[-1]] = self_times.get(path[-1], 0) + path_self_times[path]
+        rows = [self._row({'name': name}, stats, self_times[name]) for name, stats in totals.items()]
+        return sorted(rows, key=lambda row: row['self_time'], reverse=True)
+
+    def _row(self, row, stats, self_time):
+        row['calls'] = stats.calls
+        row['time'] = stats.time
+        row['self_time'] = self_time
+        statuses = stats.success + stats.fail + stats.running
+        for status in ('success', 'fail', 'running'):
+            row[status] = getattr(stats, status) / statuses if statuses else None
+        return row
+
+    def write_collapsed(self, path):
+        """Writes the self time of every call path in microseconds in the
+        collapsed stack format read by flamegraph.pl and speedscope."""
+        self_times = self.self_times()
+        with open(path, 'w') as output:
+            for stack in sorted(self.stats):
+                microseconds = int(round(self_times[stack] * 1e6))
+                if microseconds > 0:
+                    output.write(';'.join(stack) + ' ' + str(microseconds) + '\n')
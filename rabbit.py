@@ -1,12 +1,8 @@
 import organisms
 import behaviour_tree as bt
 import helpers
-import random
 import math
-from astar import astar
-from grass import MAX_GRASS_AMOUNT
-from grass import REPRODUCTION_THRESHOLD as MUCH_GRASS
-from water import WATER_POOL_CAPACITY
+from spatial_index import in_box
 
 HUNGER_SEEK_THRESHOLD = 50
 THIRST_SEEK_THRESHOLD = 50
@@ -20,8 +16,8 @@ THIRST_DAMAGE_FACTOR = 0.3
 TIRED_DAMAGE_FACTOR = 0.1
 FLOWER_HUNGER_SATISFACTION = 45
 GRASS_HUNGER_SATISFACTION = 20
-GRASS_EATING_AMOUNT = 0.2 * MAX_GRASS_AMOUNT
-WATER_DRINKING_AMOUNT = 0.00001 * WATER_POOL_CAPACITY
+GRASS_EATING_SHARE = 0.2 # Share of the largest grass amount eaten at once
+WATER_DRINKING_SHARE = 0.00001 # Share of the water pool capacity drunk at once
 
 EATING_AND_DRINKING_SLEEP_FACTOR = 0.3
 SLEEP_TIME = 8
@@ -43,10 +39,22 @@ PATH_LENGTH = 5
 
 class Rabbit(organisms.Organism):
     """Defines the rabbit."""
+    __slots__ = (
+        'female', '_adult', '_hunger', '_thirst', '_tired', 'health',
+        '_life_span', 'age', '_hunger_speed', '_thirst_speed', '_tired_speed',
+        'genetics_factor', 'partner_genetics_factor', '_needs_to_poop',
+        '_poop_contains_seed', 'size', '_max_size', '_vision_range',
+        '_max_vision_range', 'can_reproduce', 'pregnant', 'partner',
+        'reproduction_timer', '_stabilized_health', '_nurse_timer',
+        '_stop_nursing_timer', 'burrow', 'in_burrow', '_asleep', '_sleep_time',
+        '_movement_cooldown', '_min_movement_cooldown', '_movement_timer',
+        '_movement_path'
+    )
+
     def __init__(self, ecosystem, x, y, female, adult=False, hunger=0,
                  thirst=0, tired=0, health=100, size=20, life_span=24*30*4,
                  hunger_speed=50/36, thirst_speed=50/72, tired_speed=50/36,
-                 vision_range={'left': 4, 'right': 4, 'up': 4, 'down': 4},
+                 vision_range=4,
                  burrow=None, in_burrow=False, movement_cooldown=3, age=0,
                  reproduction_timer=0, genetics_factor=1):
         super().__init__(ecosystem, organisms.Type.RABBIT, x, y)
@@ -75,12 +83,7 @@ class Rabbit(organisms.Organism):
         else:
             self.size = 1
             self._max_size = size
-            self._vision_range = {
-                'left': 0,
-                'right': 0,
-                'up': 0,
-                'down': 0
-            }
+            self._vision_range = 0
             self._max_vision_range = vision_range
 
 
@@ -108,7 +111,7 @@ class Rabbit(organisms.Organism):
             self._movement_cooldown = 2 * movement_cooldown / genetics_factor
             self._min_movement_cooldown = movement_cooldown / genetics_factor
 
-        self._movement_timer = random.uniform(0, self._movement_cooldown)
+        self._movement_timer = ecosystem.rng.rabbit.uniform(0, self._movement_cooldown)
         self._movement_path = None
 
 
@@ -119,241 +122,242 @@ class Rabbit(organisms.Organism):
             return 'images/rabbitYoung.png'
 
 
-    def generate_tree(self):
+    @classmethod
+    def generate_tree(cls):
         """Generates the tree for the rabbit."""
         tree = bt.Sequence()
-        tree.add_child(self.ReduceMovementTimer(self))
-        tree.add_child(self.ReduceReproductionTimer(self))
-        tree.add_child(self.BurrowMovement(self))
-        tree.add_child(self.IncreaseHunger(self))
-        tree.add_child(self.IncreaseThirst(self))
-        tree.add_child(self.ChangeTired(self))
-        tree.add_child(self.HandleNursing(self))
-        tree.add_child(self.IncreaseAge(self))
-        tree.add_child(self.TakeDamage(self))
-        tree.add_child(self.HandlePartner(self))
-        tree.add_child(self.ReplenishHealth(self))
-
-        logic_fallback = bt.FallBack()
+        tree.add_child(cls.ReduceMovementTimer())
+        tree.add_child(cls.ReduceReproductionTimer())
+        tree.add_child(cls.BurrowMovement())
+        tree.add_child(cls.IncreaseHunger())
+        tree.add_child(cls.IncreaseThirst())
+        tree.add_child(cls.ChangeTired())
+        tree.add_child(cls.HandleNursing())
+        tree.add_child(cls.IncreaseAge())
+        tree.add_child(cls.TakeDamage())
+        tree.add_child(cls.HandlePartner())
+        tree.add_child(cls.ReplenishHealth())
+
+        logic_fallback = bt.FallBack('logic_fallback')
         tree.add_child(logic_fallback)
 
         # Dying
-        die_sequence = bt.Sequence()
+        die_sequence = bt.Sequence('die_sequence')
         logic_fallback.add_child(die_sequence)
-        die_sequence.add_child(self.Dying(self))
-        die_sequence.add_child(self.Die(self))
+        die_sequence.add_child(cls.Dying())
+        die_sequence.add_child(cls.Die())
 
         # New born
-        logic_fallback.add_child(self.NewBorn(self))
+        logic_fallback.add_child(cls.NewBorn())
 
         # Sleeping
-        sleep_sequence = bt.Sequence()
+        sleep_sequence = bt.Sequence('sleep_sequence')
         logic_fallback.add_child(sleep_sequence)
-        sleep_sequence.add_child(self.Sleeping(self))
+        sleep_sequence.add_child(cls.Sleeping())
 
-        sleep_fallback = bt.FallBack()
+        sleep_fallback = bt.FallBack('sleep_fallback')
         sleep_sequence.add_child(sleep_fallback)
-        sleep_fallback.add_child(self.ShouldNotWakeUp(self))
-        sleep_fallback.add_child(self.WakeUp(self))
+        sleep_fallback.add_child(cls.ShouldNotWakeUp())
+        sleep_fallback.add_child(cls.WakeUp())
 
         # Avoiding enemies
-        enemy_sequence = bt.Sequence()
+        enemy_sequence = bt.Sequence('enemy_sequence')
         logic_fallback.add_child(enemy_sequence)
 
-        should_act_on_enemy_fallback = bt.FallBack()
+        should_act_on_enemy_fallback = bt.FallBack('should_act_on_enemy_fallback')
         enemy_sequence.add_child(should_act_on_enemy_fallback)
-        should_act_on_enemy_fallback.add_child(self.MoreScaredThanHungry(self))
-        should_act_on_enemy_fallback.add_child(self.MoreScaredThanThirsty(self))
-        should_act_on_enemy_fallback.add_child(self.MoreScaredThanTired(self))
-        enemy_sequence.add_child(self.EnemyNearby(self))
-        enemy_sequence.add_child(self.CanMove(self))
+        should_act_on_enemy_fallback.add_child(cls.MoreScaredThanHungry())
+        should_act_on_enemy_fallback.add_child(cls.MoreScaredThanThirsty())
+        should_act_on_enemy_fallback.add_child(cls.MoreScaredThanTired())
+        enemy_sequence.add_child(cls.EnemyNearby())
+        enemy_sequence.add_child(cls.CanMove())
 
-        enemy_fallback = bt.FallBack()
+        enemy_fallback = bt.FallBack('enemy_fallback')
         enemy_sequence.add_child(enemy_fallback)
 
-        burrow_enemy_sequence = bt.Sequence()
+        burrow_enemy_sequence = bt.Sequence('burrow_enemy_sequence')
         enemy_fallback.add_child(burrow_enemy_sequence)
-        burrow_enemy_sequence.add_child(self.BurrowAvailable(self))
-        burrow_enemy_sequence.add_child(self.FindPathToBurrow(self))
-        burrow_enemy_sequence.add_child(self.MoveOnPath(self))
+        burrow_enemy_sequence.add_child(cls.BurrowAvailable())
+        burrow_enemy_sequence.add_child(cls.FindPathToBurrow())
+        burrow_enemy_sequence.add_child(cls.MoveOnPath())
 
-        enemy_fallback.add_child(self.RunAway(self))
+        enemy_fallback.add_child(cls.RunAway())
 
         # Eating
-        hungry_sequence = bt.Sequence()
+        hungry_sequence = bt.Sequence('hungry_sequence')
         logic_fallback.add_child(hungry_sequence)
-        hungry_sequence.add_child(self.HungrierThanThirsty(self))
-        hungry_sequence.add_child(self.HungrierThanTired(self))
-        hungry_sequence.add_child(self.Hungry(self))
+        hungry_sequence.add_child(cls.HungrierThanThirsty())
+        hungry_sequence.add_child(cls.HungrierThanTired())
+        hungry_sequence.add_child(cls.Hungry())
 
-        hungry_fallback = bt.FallBack()
+        hungry_fallback = bt.FallBack('hungry_fallback')
         hungry_sequence.add_child(hungry_fallback)
 
-        adjacent_food_sequence = bt.Sequence()
+        adjacent_food_sequence = bt.Sequence('adjacent_food_sequence')
         hungry_fallback.add_child(adjacent_food_sequence)
-        adjacent_food_sequence.add_child(self.FoodAdjacent(self))
-        adjacent_food_sequence.add_child(self.Eat(self))
+        adjacent_food_sequence.add_child(cls.FoodAdjacent())
+        adjacent_food_sequence.add_child(cls.Eat())
 
-        food_nearby_sequence = bt.Sequence()
+        food_nearby_sequence = bt.Sequence('food_nearby_sequence')
         hungry_fallback.add_child(food_nearby_sequence)
-        food_nearby_sequence.add_child(self.FoodNearby(self))
-        food_nearby_sequence.add_child(self.CanMove(self))
-        food_nearby_sequence.add_child(self.FindPathToFood(self))
-        food_nearby_sequence.add_child(self.MoveOnPath(self))
+        food_nearby_sequence.add_child(cls.FoodNearby())
+        food_nearby_sequence.add_child(cls.CanMove())
+        food_nearby_sequence.add_child(cls.FindPathToFood())
+        food_nearby_sequence.add_child(cls.MoveOnPath())
 
         # Drinking
-        thirsty_sequence = bt.Sequence()
+        thirsty_sequence = bt.Sequence('thirsty_sequence')
         logic_fallback.add_child(thirsty_sequence)
-        thirsty_sequence.add_child(self.ThirstierThanTired(self))
-        thirsty_sequence.add_child(self.Thirsty(self))
+        thirsty_sequence.add_child(cls.ThirstierThanTired())
+        thirsty_sequence.add_child(cls.Thirsty())
 
-        thirsty_fallback = bt.FallBack()
+        thirsty_fallback = bt.FallBack('thirsty_fallback')
         thirsty_sequence.add_child(thirsty_fallback)
 
-        adjacent_water_sequence = bt.Sequence()
+        adjacent_water_sequence = bt.Sequence('adjacent_water_sequence')
         thirsty_fallback.add_child(adjacent_water_sequence)
-        adjacent_water_sequence.add_child(self.WaterAdjacent(self))
-        adjacent_water_sequence.add_child(self.Drink(self))
+        adjacent_water_sequence.add_child(cls.WaterAdjacent())
+        adjacent_water_sequence.add_child(cls.Drink())
 
-        water_nearby_sequence = bt.Sequence()
+        water_nearby_sequence = bt.Sequence('water_nearby_sequence')
         thirsty_fallback.add_child(water_nearby_sequence)
         # Might want rabbits to only know about water they've seen,
         # instead of knowing about water globally
-        water_nearby_sequence.add_child(self.CanMove(self))
-        water_nearby_sequence.add_child(self.FindPathToWater(self))
-        water_nearby_sequence.add_child(self.MoveOnPath(self))
+        water_nearby_sequence.add_child(cls.CanMove())
+        water_nearby_sequence.add_child(cls.FindPathToWater())
+        water_nearby_sequence.add_child(cls.MoveOnPath())
 
         # Tiredness
-        tired_sequence = bt.Sequence()
+        tired_sequence = bt.Sequence('tired_sequence')
         logic_fallback.add_child(tired_sequence)
-        tired_sequence.add_child(self.Tired(self))
+        tired_sequence.add_child(cls.Tired())
 
-        tired_fallback = bt.FallBack()
+        tired_fallback = bt.FallBack('tired_fallback')
         tired_sequence.add_child(tired_fallback)
 
-        burrow_sequence = bt.Sequence()
+        burrow_sequence = bt.Sequence('burrow_sequence')
         tired_fallback.add_child(burrow_sequence)
-        burrow_sequence.add_child(self.InBurrowOrGrass(self))
-        burrow_sequence.add_child(self.Sleep(self))
+        burrow_sequence.add_child(cls.InBurrowOrGrass())
+        burrow_sequence.add_child(cls.Sleep())
 
-        burrow_available_sequence = bt.Sequence()
+        burrow_available_sequence = bt.Sequence('burrow_available_sequence')
         tired_fallback.add_child(burrow_available_sequence)
-        burrow_available_sequence.add_child(self.BurrowOrGrassAvailable(self))
-        burrow_available_sequence.add_child(self.CanMove(self))
-        burrow_available_sequence.add_child(self.FindPathToBurrowOrGrass(self))
-        burrow_available_sequence.add_child(self.MoveOnPath(self))
+        burrow_available_sequence.add_child(cls.BurrowOrGrassAvailable())
+        burrow_available_sequence.add_child(cls.CanMove())
+        burrow_available_sequence.add_child(cls.FindPathToBurrowOrGrass())
+        burrow_available_sequence.add_child(cls.MoveOnPath())
 
-        create_burrow_sequence = bt.Sequence()
+        create_burrow_sequence = bt.Sequence('create_burrow_sequence')
         tired_fallback.add_child(create_burrow_sequence)
-        create_burrow_sequence.add_child(self.NotBurrowOrGrassAvailable(self))
-        create_burrow_sequence.add_child(self.CreateBurrow(self))
-        create_burrow_sequence.add_child(self.Sleep(self))
+        create_burrow_sequence.add_child(cls.NotBurrowOrGrassAvailable())
+        create_burrow_sequence.add_child(cls.CreateBurrow())
+        create_burrow_sequence.add_child(cls.Sleep())
 
         # Pooping
-        poop_sequence = bt.Sequence()
+        poop_sequence = bt.Sequence('poop_sequence')
         logic_fallback.add_child(poop_sequence)
-        poop_sequence.add_child(self.CanPoop(self))
-        poop_sequence.add_child(self.Poop(self))
+        poop_sequence.add_child(cls.CanPoop())
+        poop_sequence.add_child(cls.Poop())
 
         # Nursing
-        nurse_sequence = bt.Sequence()
+        nurse_sequence = bt.Sequence('nurse_sequence')
         logic_fallback.add_child(nurse_sequence)
-        nurse_sequence.add_child(self.ShouldNurse(self))
+        nurse_sequence.add_child(cls.ShouldNurse())
 
-        nurse_fallback = bt.FallBack()
+        nurse_fallback = bt.FallBack('nurse_fallback')
         nurse_sequence.add_child(nurse_fallback)
 
-        burrow_nurse_sequence = bt.Sequence()
+        burrow_nurse_sequence = bt.Sequence('burrow_nurse_sequence')
         nurse_fallback.add_child(burrow_nurse_sequence)
-        burrow_nurse_sequence.add_child(self.InBurrow(self))
-        burrow_nurse_sequence.add_child(self.Nurse(self))
+        burrow_nurse_sequence.add_child(cls.InBurrow())
+        burrow_nurse_sequence.add_child(cls.Nurse())
 
-        move_to_burrow_nurse_sequence = bt.Sequence()
+        move_to_burrow_nurse_sequence = bt.Sequence('move_to_burrow_nurse_sequence')
         nurse_fallback.add_child(move_to_burrow_nurse_sequence)
-        move_to_burrow_nurse_sequence.add_child(self.CanMove(self))
-        move_to_burrow_nurse_sequence.add_child(self.FindPathToBurrow(self))
-        move_to_burrow_nurse_sequence.add_child(self.MoveOnPath(self))
+        move_to_burrow_nurse_sequence.add_child(cls.CanMove())
+        move_to_burrow_nurse_sequence.add_child(cls.FindPathToBurrow())
+        move_to_burrow_nurse_sequence.add_child(cls.MoveOnPath())
 
         # Giving birth
-        birth_sequence = bt.Sequence()
+        birth_sequence = bt.Sequence('birth_sequence')
         logic_fallback.add_child(birth_sequence)
-        birth_sequence.add_child(self.Pregnant(self))
+        birth_sequence.add_child(cls.Pregnant())
 
-        birth_fallback = bt.FallBack()
+        birth_fallback = bt.FallBack('birth_fallback')
         birth_sequence.add_child(birth_fallback)
 
-        birth_time_sequence = bt.Sequence()
+        birth_time_sequence = bt.Sequence('birth_time_sequence')
         birth_fallback.add_child(birth_time_sequence)
-        birth_time_sequence.add_child(self.TimeToGiveBirth(self))
-        birth_time_sequence.add_child(self.GiveBirth(self))
+        birth_time_sequence.add_child(cls.TimeToGiveBirth())
+        birth_time_sequence.add_child(cls.GiveBirth())
 
-        close_to_birth_sequence = bt.Sequence()
+        close_to_birth_sequence = bt.Sequence('close_to_birth_sequence')
         birth_fallback.add_child(close_to_birth_sequence)
-        close_to_birth_sequence.add_child(self.CloseToBirth(self))
+        close_to_birth_sequence.add_child(cls.CloseToBirth())
 
 
-        close_to_birth_fallback = bt.FallBack()
+        close_to_birth_fallback = bt.FallBack('close_to_birth_fallback')
         close_to_birth_sequence.add_child(close_to_birth_fallback)
-        close_to_birth_fallback.add_child(self.InBurrow(self))
+        close_to_birth_fallback.add_child(cls.InBurrow())
 
-        close_to_birth_burrow_sequence = bt.Sequence()
+        close_to_birth_burrow_sequence = bt.Sequence('close_to_birth_burrow_sequence')
         close_to_birth_fallback.add_child(close_to_birth_burrow_sequence)
-        close_to_birth_burrow_sequence.add_child(self.StabilizeHealth(self))
-        close_to_birth_burrow_sequence.add_child(self.CreateBurrow(self))
+        close_to_birth_burrow_sequence.add_child(cls.StabilizeHealth())
+        close_to_birth_burrow_sequence.add_child(cls.CreateBurrow())
 
         # Reproducing
-        reproduction_sequence = bt.Sequence()
+        reproduction_sequence = bt.Sequence('reproduction_sequence')
         logic_fallback.add_child(reproduction_sequence)
-        reproduction_sequence.add_child(self.CanReproduce(self))
+        reproduction_sequence.add_child(cls.CanReproduce())
 
-        reproduction_fallback = bt.FallBack()
+        reproduction_fallback = bt.FallBack('reproduction_fallback')
         reproduction_sequence.add_child(reproduction_fallback)
 
-        partner_sequence = bt.Sequence()
+        partner_sequence = bt.Sequence('partner_sequence')
         reproduction_fallback.add_child(partner_sequence)
-        partner_sequence.add_child(self.HavePartner(self))
-        partner_sequence.add_child(self.PartnerCanReproduce(self))
+        partner_sequence.add_child(cls.HavePartner())
+        partner_sequence.add_child(cls.PartnerCanReproduce())
 
-        partner_reproduction_fallback = bt.FallBack()
+        partner_reproduction_fallback = bt.FallBack('partner_reproduction_fallback')
         partner_sequence.add_child(partner_reproduction_fallback)
 
-        partner_adjacent_sequence = bt.Sequence()
+        partner_adjacent_sequence = bt.Sequence('partner_adjacent_sequence')
         partner_reproduction_fallback.add_child(partner_adjacent_sequence)
-        partner_adjacent_sequence.add_child(self.PartnerAdjacent(self))
-        partner_adjacent_sequence.add_child(self.Reproduce(self))
+        partner_adjacent_sequence.add_child(cls.PartnerAdjacent())
+        partner_adjacent_sequence.add_child(cls.Reproduce())
 
-        partner_nearby_sequence = bt.Sequence()
+        partner_nearby_sequence = bt.Sequence('partner_nearby_sequence')
         partner_reproduction_fallback.add_child(partner_nearby_sequence)
-        partner_nearby_sequence.add_child(self.PartnerNearby(self))
-        partner_nearby_sequence.add_child(self.CanMove(self))
-        partner_nearby_sequence.add_child(self.FindPathToPartner(self))
-        partner_nearby_sequence.add_child(self.MoveOnPath(self))
+        partner_nearby_sequence.add_child(cls.PartnerNearby())
+        partner_nearby_sequence.add_child(cls.CanMove())
+        partner_nearby_sequence.add_child(cls.FindPathToPartner())
+        partner_nearby_sequence.add_child(cls.MoveOnPath())
 
-        no_partner_sequence = bt.Sequence()
+        no_partner_sequence = bt.Sequence('no_partner_sequence')
         reproduction_fallback.add_child(no_partner_sequence)
-        no_partner_sequence.add_child(self.NoPartner(self))
+        no_partner_sequence.add_child(cls.NoPartner())
 
-        no_partner_fallback = bt.FallBack()
+        no_partner_fallback = bt.FallBack('no_partner_fallback')
         no_partner_sequence.add_child(no_partner_fallback)
 
-        adjacent_rabbit_sequence = bt.Sequence()
+        adjacent_rabbit_sequence = bt.Sequence('adjacent_rabbit_sequence')
         no_partner_fallback.add_child(adjacent_rabbit_sequence)
-        adjacent_rabbit_sequence.add_child(self.AvailableRabbitAdjacent(self))
-        adjacent_rabbit_sequence.add_child(self.MakePartner(self))
-        adjacent_rabbit_sequence.add_child(self.Reproduce(self))
+        adjacent_rabbit_sequence.add_child(cls.AvailableRabbitAdjacent())
+        adjacent_rabbit_sequence.add_child(cls.MakePartner())
+        adjacent_rabbit_sequence.add_child(cls.Reproduce())
 
-        rabbit_nearby_sequence = bt.Sequence()
+        rabbit_nearby_sequence = bt.Sequence('rabbit_nearby_sequence')
         no_partner_fallback.add_child(rabbit_nearby_sequence)
-        rabbit_nearby_sequence.add_child(self.AvailableRabbitNearby(self))
-        rabbit_nearby_sequence.add_child(self.CanMove(self))
-        rabbit_nearby_sequence.add_child(self.FindPathToRabbit(self))
-        rabbit_nearby_sequence.add_child(self.MoveOnPath(self))
+        rabbit_nearby_sequence.add_child(cls.AvailableRabbitNearby())
+        rabbit_nearby_sequence.add_child(cls.CanMove())
+        rabbit_nearby_sequence.add_child(cls.FindPathToRabbit())
+        rabbit_nearby_sequence.add_child(cls.MoveOnPath())
 
         # Moving randomly
-        random_movement_sequence = bt.Sequence()
+        random_movement_sequence = bt.Sequence('random_movement_sequence')
         logic_fallback.add_child(random_movement_sequence)
-        random_movement_sequence.add_child(self.CanMove(self))
-        random_movement_sequence.add_child(self.MoveRandomly(self))
+        random_movement_sequence.add_child(cls.CanMove())
+        random_movement_sequence.add_child(cls.MoveRandomly())
 
         return tree
 
@@ -363,174 +367,133 @@ class Rabbit(organisms.Organism):
 
     class ReduceMovementTimer(bt.Action):
         """Ticks down the movement timer for the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._movement_timer = max(0, self.__outer._movement_timer - 1)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._movement_timer = max(0, agent._movement_timer - 1)
+            return bt.Status.SUCCESS
 
     class ReduceReproductionTimer(bt.Action):
         """Ticks down the reproduction timer for the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer.reproduction_timer = max(0, self.__outer.reproduction_timer - 1)
-            if self.__outer.reproduction_timer == 0 and self.__outer._adult:
-                self.__outer.can_reproduce = True
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent.reproduction_timer = max(0, agent.reproduction_timer - 1)
+            if agent.reproduction_timer == 0 and agent._adult:
+                agent.can_reproduce = True
+            return bt.Status.SUCCESS
 
     class BurrowMovement(bt.Action):
         """Updates whether the rabbit is in its burrow or not."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
+        def action(self, agent):
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
 
             if burrow is None:
-                self.__outer.in_burrow = False
+                agent.in_burrow = False
             else:
-                self.__outer.in_burrow = (x == burrow.x and y == burrow.y)
-            self._status = bt.Status.SUCCESS
+                agent.in_burrow = (x == burrow.x and y == burrow.y)
+            return bt.Status.SUCCESS
 
     class IncreaseHunger(bt.Action):
         """Increases the rabbit's hunger."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            factor = 1 if not self.__outer._asleep else EATING_AND_DRINKING_SLEEP_FACTOR
-            if not self.__outer._stabilized_health:
-                self.__outer._hunger += factor * self.__outer._hunger_speed
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            factor = 1 if not agent._asleep else parameters.rabbit.EATING_AND_DRINKING_SLEEP_FACTOR
+            if not agent._stabilized_health:
+                agent._hunger += factor * agent._hunger_speed
+            return bt.Status.SUCCESS
 
     class IncreaseThirst(bt.Action):
         """Increases the rabbit's thirst."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            factor = 1 if not self.__outer._asleep else EATING_AND_DRINKING_SLEEP_FACTOR
-            if not self.__outer._stabilized_health:
-                self.__outer._thirst += factor * self.__outer._thirst_speed
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            factor = 1 if not agent._asleep else parameters.rabbit.EATING_AND_DRINKING_SLEEP_FACTOR
+            if not agent._stabilized_health:
+                agent._thirst += factor * agent._thirst_speed
+            return bt.Status.SUCCESS
 
     class ChangeTired(bt.Action):
         """Changes the rabbit's tiredness depending on if it is awake."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            if not self.__outer._asleep:
-                if not self.__outer._stabilized_health:
-                    self.__outer._tired += self.__outer._tired_speed
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            if not agent._asleep:
+                if not agent._stabilized_health:
+                    agent._tired += agent._tired_speed
             else:
-                self.__outer._tired = max(0, self.__outer._tired - TIRED_DAMAGE_THRESHOLD / SLEEP_TIME)
-                self.__outer._sleep_time += 1
-            self._status = bt.Status.SUCCESS
+                agent._tired = max(0, agent._tired - parameters.rabbit.TIRED_DAMAGE_THRESHOLD / parameters.rabbit.SLEEP_TIME)
+                agent._sleep_time += 1
+            return bt.Status.SUCCESS
 
     class HandleNursing(bt.Action):
         """Handles nursing variables."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            if self.__outer.female:
-                if self.__outer._stop_nursing_timer > 0:
-                    self.__outer._stop_nursing_timer = max(0, self.__outer._stop_nursing_timer - 1)
-                    self.__outer._nurse_timer = max(0, self.__outer._nurse_timer - 1)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            if agent.female:
+                if agent._stop_nursing_timer > 0:
+                    agent._stop_nursing_timer = max(0, agent._stop_nursing_timer - 1)
+                    agent._nurse_timer = max(0, agent._nurse_timer - 1)
+            return bt.Status.SUCCESS
 
     class IncreaseAge(bt.Action):
         """Increases the rabbit's age."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer.age += 1
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            agent.age += 1
 
             # Become adults
-            if not self.__outer._adult and self.__outer.age >= ADULT_AGE:
-                self.__outer._adult = True
-                self.__outer.can_reproduce = True
-                self.__outer.size = self.__outer._max_size
-                self.__outer._vision_range = self.__outer._max_vision_range
-                self.__outer._movement_cooldown = self.__outer._min_movement_cooldown
+            if not agent._adult and agent.age >= parameters.rabbit.ADULT_AGE:
+                agent._adult = True
+                agent.can_reproduce = True
+                agent._ecosystem.set_animal_size(agent, agent._max_size)
+                agent._ecosystem.mark_image_changed(agent)
+                agent._vision_range = agent._max_vision_range
+                agent._movement_cooldown = agent._min_movement_cooldown
 
             # Lerp values depending on age
-            if not self.__outer._adult:
-                self.__outer.size = helpers.Lerp(0, self.__outer._max_size, self.__outer.age / (ADULT_AGE))
-                for key in self.__outer._vision_range:
-                    self.__outer._vision_range[key] = min(self.__outer._max_vision_range[key], helpers.Lerp(0, self.__outer._max_vision_range[key], self.__outer.age / (NEW_BORN_TIME)))
-                self.__outer._movement_cooldown = helpers.Lerp(2 * self.__outer._min_movement_cooldown, self.__outer._min_movement_cooldown, self.__outer.age / (ADULT_AGE))
+            if not agent._adult:
+                agent._ecosystem.set_animal_size(agent, helpers.Lerp(0, agent._max_size, agent.age / (parameters.rabbit.ADULT_AGE)))
+                agent._vision_range = int(min(agent._max_vision_range, helpers.Lerp(0, agent._max_vision_range, agent.age / (parameters.rabbit.NEW_BORN_TIME))))
+                agent._movement_cooldown = helpers.Lerp(2 * agent._min_movement_cooldown, agent._min_movement_cooldown, agent.age / (parameters.rabbit.ADULT_AGE))
 
 
-            self._status = bt.Status.SUCCESS
+            return bt.Status.SUCCESS
 
     class TakeDamage(bt.Action):
         """Take damage from various sources."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self._status = bt.Status.SUCCESS
-
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
             # Hunger
-            hunger = self.__outer._hunger
-            if hunger >= HUNGER_DAMAGE_THRESHOLD:
-                self.__outer.health -= (hunger - HUNGER_DAMAGE_THRESHOLD) * HUNGER_DAMAGE_FACTOR
+            hunger = agent._hunger
+            if hunger >= parameters.rabbit.HUNGER_DAMAGE_THRESHOLD:
+                agent.health -= (hunger - parameters.rabbit.HUNGER_DAMAGE_THRESHOLD) * parameters.rabbit.HUNGER_DAMAGE_FACTOR
 
             # Thirst
-            thirst = self.__outer._thirst
-            if thirst >= THIRST_DAMAGE_THRESHOLD:
-                self.__outer.health -= (thirst - THIRST_DAMAGE_THRESHOLD) * THIRST_DAMAGE_FACTOR
+            thirst = agent._thirst
+            if thirst >= parameters.rabbit.THIRST_DAMAGE_THRESHOLD:
+                agent.health -= (thirst - parameters.rabbit.THIRST_DAMAGE_THRESHOLD) * parameters.rabbit.THIRST_DAMAGE_FACTOR
 
             # Tiredness
-            tired = self.__outer._tired
-            if tired >= TIRED_DAMAGE_THRESHOLD:
-                self.__outer.health -= (tired - TIRED_DAMAGE_THRESHOLD) * TIRED_DAMAGE_FACTOR
+            tired = agent._tired
+            if tired >= parameters.rabbit.TIRED_DAMAGE_THRESHOLD:
+                agent.health -= (tired - parameters.rabbit.TIRED_DAMAGE_THRESHOLD) * parameters.rabbit.TIRED_DAMAGE_FACTOR
+            return bt.Status.SUCCESS
 
     class HandlePartner(bt.Action):
         """Remove partner if it has died."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self._status = bt.Status.SUCCESS
-
-            if self.__outer.partner is not None:
-                if self.__outer.partner.health <= 0:
-                    self.__outer.partner = None
+        def action(self, agent):
+            if agent.partner is not None:
+                if agent.partner.health <= 0:
+                    agent.partner = None
+            return bt.Status.SUCCESS
 
     class ReplenishHealth(bt.Action):
         """Replenish health if in a healthy condition."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            hunger = agent._hunger
+            thirst = agent._thirst
+            tired = agent._tired
 
-        def action(self):
-            self._status = bt.Status.SUCCESS
-
-            hunger = self.__outer._hunger
-            thirst = self.__outer._thirst
-            tired = self.__outer._tired
-
-            if hunger < HUNGER_SEEK_THRESHOLD and thirst < THIRST_SEEK_THRESHOLD and tired < TIRED_SEEK_THRESHOLD and self.__outer.health > 0:
-                self.__outer.health = min(100, self.__outer.health + HEAL_AMOUNT)
+            if hunger < parameters.rabbit.HUNGER_SEEK_THRESHOLD and thirst < parameters.rabbit.THIRST_SEEK_THRESHOLD and tired < parameters.rabbit.TIRED_SEEK_THRESHOLD and agent.health > 0:
+                agent.health = min(100, agent.health + parameters.rabbit.HEAL_AMOUNT)
+            return bt.Status.SUCCESS
 
     #########
     # DYING #
@@ -538,24 +501,14 @@ class Rabbit(organisms.Organism):
 
     class Dying(bt.Condition):
         """Check if the rabbit is dying."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.health <= 0 or self.__outer.age >= self.__outer._life_span
+        def condition(self, agent):
+            return agent.health <= 0 or agent.age >= agent._life_span
 
     class Die(bt.Action):
         """Kill the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            self.__outer._ecosystem.animal_map[x][y].remove(self.__outer)
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._ecosystem.remove_animal(agent)
+            return bt.Status.SUCCESS
 
     ############
     # NEW BORN #
@@ -563,42 +516,28 @@ class Rabbit(organisms.Organism):
 
     class NewBorn(bt.Condition):
         """Check if the rabbit is newly born."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.age <= NEW_BORN_TIME
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.age <= parameters.rabbit.NEW_BORN_TIME
 
     ############
     # SLEEPING #
     ############
 
     class Sleeping(bt.Condition):
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._asleep
+        def condition(self, agent):
+            return agent._asleep
 
     class ShouldNotWakeUp(bt.Condition):
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._sleep_time < SLEEP_TIME
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent._sleep_time < parameters.rabbit.SLEEP_TIME
 
     class WakeUp(bt.Action):
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._asleep = False
-            self.__outer._sleep_time = 0
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._asleep = False
+            agent._sleep_time = 0
+            return bt.Status.SUCCESS
 
     ###########
     # ENEMIES #
@@ -606,81 +545,49 @@ class Rabbit(organisms.Organism):
 
     class MoreScaredThanHungry(bt.Condition):
         """Check if the rabbit is hungrier than it is scared."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._hunger < SCARED_FACTOR * HUNGER_DAMAGE_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent._hunger < parameters.rabbit.SCARED_FACTOR * parameters.rabbit.HUNGER_DAMAGE_THRESHOLD
 
     class MoreScaredThanThirsty(bt.Condition):
         """Check if the rabbit is thirstier than it is scared."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._thirst < SCARED_FACTOR * THIRST_DAMAGE_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent._thirst < parameters.rabbit.SCARED_FACTOR * parameters.rabbit.THIRST_DAMAGE_THRESHOLD
 
     class MoreScaredThanTired(bt.Condition):
         """Check if the rabbit is more tired than it is scared."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._tired < SCARED_FACTOR * TIRED_DAMAGE_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent._tired < parameters.rabbit.SCARED_FACTOR * parameters.rabbit.TIRED_DAMAGE_THRESHOLD
 
     class EnemyNearby(bt.Condition):
         """Check if there are foxes nearby."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
-                    for animal in ecosystem.animal_map[x + dx][y + dy]:
-                        if animal.type == organisms.Type.FOX:
-                            return True
-            return False
+            return ecosystem.spatial_index.any_in_box(organisms.Type.FOX, x, y, vision_range)
 
     class CanMove(bt.Condition):
         """Check if the rabbit can move."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._movement_timer == 0
+        def condition(self, agent):
+            return agent._movement_timer == 0
 
     class BurrowAvailable(bt.Condition):
         """Determines if the burrow is close enough to hide in."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
             if burrow is not None:
                 burrow_distance = helpers.EuclidianDistance(x, y, burrow.x, burrow.y)
-                vision_distance = helpers.EuclidianDistance(0, 0, vision_range['left'], vision_range['up'])
-                vision_distance = max(vision_distance, helpers.EuclidianDistance(0, 0, vision_range['right'], vision_range['up']))
-                vision_distance = max(vision_distance, helpers.EuclidianDistance(0, 0, vision_range['right'], vision_range['down']))
-                vision_distance = max(vision_distance, helpers.EuclidianDistance(0, 0, vision_range['left'], vision_range['down']))
+                vision_distance = helpers.EuclidianDistance(0, 0, vision_range, vision_range)
 
                 if burrow_distance <= vision_distance:
                     return True
@@ -689,34 +596,15 @@ class Rabbit(organisms.Organism):
 
     class RunAway(bt.Action):
         """Runs away from the closest threat."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
-            fox = None
-            closest_distance = math.inf
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    distance = helpers.EuclidianDistance(x, y, x + dx, y + dy)
-                    if distance < closest_distance:
-                        for animal in ecosystem.animal_map[x + dx][y + dy]:
-                            if animal.type == organisms.Type.FOX:
-                                fox = animal
-                                closest_distance = distance
+            fox = ecosystem.spatial_index.nearest(organisms.Type.FOX, x, y, vision_range)
 
             if fox is not None:
-                self._status = bt.Status.SUCCESS
-
                 best_direction = None
                 best_distance = 0
                 for direction in list(helpers.Direction):
@@ -734,15 +622,13 @@ class Rabbit(organisms.Organism):
                 if best_direction is not None:
                     dir_x = best_direction.value[0]
                     dir_y = best_direction.value[1]
-                    self.__outer._movement_timer += self.__outer._movement_cooldown
-                    index = ecosystem.animal_map[x][y].index(self.__outer)
-                    ecosystem.animal_map[x + dir_x][y + dir_y].append(ecosystem.animal_map[x][y].pop(index))
-                    self.__outer.x += dir_x
-                    self.__outer.y += dir_y
+                    agent._movement_timer += agent._movement_cooldown
+                    ecosystem.move_animal(agent, x + dir_x, y + dir_y)
+                    return bt.Status.SUCCESS
                 else:
-                    self._status = bt.Status.FAIL
+                    return bt.Status.FAIL
             else:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
 
 
     ##########
@@ -751,41 +637,26 @@ class Rabbit(organisms.Organism):
 
     class HungrierThanThirsty(bt.Condition):
         """Check if the rabbit is hungrier than it is thirsty."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._hunger >= self.__outer._thirst
+        def condition(self, agent):
+            return agent._hunger >= agent._thirst
 
     class HungrierThanTired(bt.Condition):
         """Check if the rabbit is hungrier than it is tired."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._hunger >= self.__outer._tired
+        def condition(self, agent):
+            return agent._hunger >= agent._tired
 
     class Hungry(bt.Condition):
         """Check if the rabbit is hungry."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return not self.__outer._stabilized_health and self.__outer._hunger >= HUNGER_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return not agent._stabilized_health and agent._hunger >= parameters.rabbit.HUNGER_SEEK_THRESHOLD
 
     class FoodAdjacent(bt.Condition):
         """Check if there is food next to the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
             if ecosystem.plant_map[x][y] and ecosystem.plant_map[x][y].type == organisms.Type.GRASS:
                 return True
@@ -799,49 +670,45 @@ class Rabbit(organisms.Organism):
 
     class Eat(bt.Action):
         """Eats the food on the cell."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
             # Prioritize flowers
             if ecosystem.flower_map[x][y]:
-                for i, flower in enumerate(ecosystem.flower_map[x][y]):
+                for flower in ecosystem.flower_map[x][y]:
                     if not flower.seed:
                         if flower.has_seed:
-                            self.__outer._poop_contains_seed = True
-                        ecosystem.flower_map[x][y].pop(i)
-                        self.__outer._hunger = max(0, self.__outer._hunger - FLOWER_HUNGER_SATISFACTION)
-                        self._status = bt.Status.SUCCESS
-                        self.__outer._needs_to_poop = True
-                        return
+                            agent._poop_contains_seed = True
+                        ecosystem.record_eaten(agent, flower)
+                        ecosystem.remove_flower(flower)
+                        agent._hunger = max(0, agent._hunger - parameters.rabbit.FLOWER_HUNGER_SATISFACTION)
+                        agent._needs_to_poop = True
+                        return bt.Status.SUCCESS
                 # TODO: Make hunger being negative result in size increase
             if ecosystem.plant_map[x][y]:
-                ecosystem.plant_map[x][y].amount -= GRASS_EATING_AMOUNT
-                self.__outer._hunger = max(0, self.__outer._hunger - GRASS_HUNGER_SATISFACTION)
-                self._status = bt.Status.SUCCESS
-                self.__outer._needs_to_poop = True
+                grass = ecosystem.plant_map[x][y]
+                ecosystem.record_eaten(agent, grass)
+                ecosystem.set_grass_amount(grass, grass.amount -
+                                           parameters.rabbit.GRASS_EATING_SHARE * parameters.grass.MAX_GRASS_AMOUNT)
+                agent._hunger = max(0, agent._hunger - parameters.rabbit.GRASS_HUNGER_SATISFACTION)
+                agent._needs_to_poop = True
+                return bt.Status.SUCCESS
             else:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
 
     class FoodNearby(bt.Condition):
         """Determines if there is food near the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            for dx in range(-vision_range, vision_range+1):
+                for dy in range(-vision_range, vision_range+1):
                     if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
                         continue
 
@@ -857,27 +724,24 @@ class Rabbit(organisms.Organism):
 
     class FindPathToFood(bt.Action):
         """Finds a path to the best visible food."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
             # If the rabbit is very hungry, it should find the closest food
             # instead of the best food.
-            find_closest = self.__outer._hunger >= helpers.Lerp(HUNGER_SEEK_THRESHOLD, HUNGER_DAMAGE_THRESHOLD, 2/3)
+            find_closest = agent._hunger >= helpers.Lerp(parameters.rabbit.HUNGER_SEEK_THRESHOLD, parameters.rabbit.HUNGER_DAMAGE_THRESHOLD, 2/3)
 
             best_food = None
             best_distance = math.inf
 
             if find_closest:
                 # Just find the closest food, picking flowers over grass if they are the same distance
-                for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                    for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
+                for dx in range(-vision_range, vision_range+1):
+                    for dy in range(-vision_range, vision_range+1):
                         if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
                             continue
 
@@ -895,8 +759,8 @@ class Rabbit(organisms.Organism):
             else:
                 # Pick the closest flower if they exist, otherwise pick the closest
                 # grass patch with much grass if it exists, otherwise pick the closest grass patch
-                for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                    for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
+                for dx in range(-vision_range, vision_range+1):
+                    for dy in range(-vision_range, vision_range+1):
                         if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
                             continue
 
@@ -920,16 +784,16 @@ class Rabbit(organisms.Organism):
                                             break
                                 else:
                                     # Only consider patches with lots of grass
-                                    if best_food.amount >= MUCH_GRASS:
+                                    if best_food.amount >= parameters.grass.REPRODUCTION_THRESHOLD:
                                         if ecosystem.plant_map[x + dx][y + dy] and ecosystem.plant_map[x + dx][y + dy].type == organisms.Type.GRASS:
-                                            if ecosystem.plant_map[x + dx][y + dy].amount >= MUCH_GRASS:
+                                            if ecosystem.plant_map[x + dx][y + dy].amount >= parameters.grass.REPRODUCTION_THRESHOLD:
                                                 if distance < best_distance:
                                                     best_food = ecosystem.plant_map[x + dx][y + dy]
                                                     best_distance = distance
                                     else:
                                         # Prioritize patches of much grass over those with low amounts
                                         if ecosystem.plant_map[x + dx][y + dy] and ecosystem.plant_map[x + dx][y + dy].type == organisms.Type.GRASS:
-                                            if ecosystem.plant_map[x + dx][y + dy].amount >= MUCH_GRASS:
+                                            if ecosystem.plant_map[x + dx][y + dy].amount >= parameters.grass.REPRODUCTION_THRESHOLD:
                                                 best_food = ecosystem.plant_map[x + dx][y + dy]
                                                 best_distance = distance
                                             else:
@@ -950,42 +814,34 @@ class Rabbit(organisms.Organism):
             path = []
 
             if best_food is not None:
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                                   x, y, best_food.x, best_food.y, max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, best_food.x, best_food.y, max_path_length=parameters.rabbit.PATH_LENGTH)
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
 
     class MoveOnPath(bt.Action):
         """Moves on the current path."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            path = self.__outer._movement_path
+        def action(self, agent):
+            path = agent._movement_path
 
             if not path:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
             else:
                 next_point = path.pop(0)
                 x = next_point[0]
                 y = next_point[1]
-                ecosystem = self.__outer._ecosystem
-                if helpers.EuclidianDistance(self.__outer.x, self.__outer.y, x, y) <= 2:
-                    self._status = bt.Status.SUCCESS
-                    self.__outer._movement_timer += self.__outer._movement_cooldown
-                    index = ecosystem.animal_map[self.__outer.x][self.__outer.y].index(self.__outer)
-                    self.__outer._ecosystem.animal_map[x][y].append(ecosystem.animal_map[self.__outer.x][self.__outer.y].pop(index))
-                    self.__outer.x = x
-                    self.__outer.y = y
+                ecosystem = agent._ecosystem
+                if helpers.EuclidianDistance(agent.x, agent.y, x, y) <= 2:
+                    agent._movement_timer += agent._movement_cooldown
+                    ecosystem.move_animal(agent, x, y)
+                    return bt.Status.SUCCESS
                 else:
-                    self._status = bt.Status.FAIL
+                    return bt.Status.FAIL
 
     ##########
     # THIRST #
@@ -993,32 +849,21 @@ class Rabbit(organisms.Organism):
 
     class ThirstierThanTired(bt.Condition):
         """Check if the rabbit is thrstier than it is tired."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._thirst >= self.__outer._tired
+        def condition(self, agent):
+            return agent._thirst >= agent._tired
 
     class Thirsty(bt.Condition):
         """Check if the rabbit is thirsty."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return not self.__outer._stabilized_health and self.__outer._thirst >= THIRST_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return not agent._stabilized_health and agent._thirst >= parameters.rabbit.THIRST_SEEK_THRESHOLD
 
     class WaterAdjacent(bt.Condition):
         """Check if there is water next to the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
             for direction in list(helpers.Direction):
                 dx = direction.value[0]
@@ -1034,16 +879,12 @@ class Rabbit(organisms.Organism):
 
     class Drink(bt.Action):
         """Drinks from an adjacent cell."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-            self._status = bt.Status.FAIL
             for direction in list(helpers.Direction):
                 dx = direction.value[0]
                 dy = direction.value[1]
@@ -1052,43 +893,31 @@ class Rabbit(organisms.Organism):
                     continue
 
                 if ecosystem.water_map[x + dx][y + dy]:
-                    ecosystem.water_map[x + dx][y + dy].water_amount -= WATER_DRINKING_AMOUNT
-                    self.__outer._thirst = 0
-                    self._status = bt.Status.SUCCESS
-                    break
+                    ecosystem.water_map[x + dx][y + dy].water_amount -= parameters.rabbit.WATER_DRINKING_SHARE * parameters.water.WATER_POOL_CAPACITY
+                    agent._thirst = 0
+                    return bt.Status.SUCCESS
+            return bt.Status.FAIL
 
     class FindPathToWater(bt.Action):
         """Finds a path to the best water source."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
-
-            best_water = None
-            best_distance = math.inf
-
-            for water_x in range(ecosystem.width):
-                for water_y in range(ecosystem.height):
-                    distance = helpers.EuclidianDistance(x, y, water_x, water_y)
-                    if distance < best_distance:
-                        if ecosystem.water_map[water_x][water_y]:
-                            best_water = ecosystem.water_map[water_x][water_y]
-                            best_distance = distance
-
-
-            path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                               x, y, best_water.x, best_water.y, max_path_length=PATH_LENGTH)
+            path = []
+            best_water = ecosystem.water_field.nearest_water(x, y)
+            if best_water is not None:
+                path = ecosystem.find_path(agent, x, y, best_water[0], best_water[1], max_path_length=parameters.rabbit.PATH_LENGTH,
+                                           shared_goal=True)
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     #############
     # TIREDNESS #
@@ -1096,71 +925,58 @@ class Rabbit(organisms.Organism):
 
     class Tired(bt.Condition):
         """Determines if the rabbit is tired."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return not self.__outer._stabilized_health and self.__outer._tired >= TIRED_SEEK_THRESHOLD
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return not agent._stabilized_health and agent._tired >= parameters.rabbit.TIRED_SEEK_THRESHOLD
 
     class InBurrowOrGrass(bt.Condition):
         """Determines if the rabbit is in its burrow or in tall grass."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
 
-            ecosystem = self.__outer._ecosystem
+            ecosystem = agent._ecosystem
 
             if burrow is not None:
                 if x == burrow.x and y == burrow.y:
                     return True
             if ecosystem.plant_map[x][y] and ecosystem.plant_map[x][y].type == organisms.Type.GRASS:
-                if ecosystem.plant_map[x][y].amount >= MUCH_GRASS:
+                if ecosystem.plant_map[x][y].amount >= parameters.grass.REPRODUCTION_THRESHOLD:
                     return True
             return False
 
     class Sleep(bt.Action):
         """Rabbit goes to sleep."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._asleep = True
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._asleep = True
+            return bt.Status.SUCCESS
 
     class BurrowOrGrassAvailable(bt.Condition):
         """Determines if there is tall grass within the vision range, or if the
         burrow is close enough such that the rabbit can get there before getting
         too tired."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            for dx in range(-vision_range, vision_range+1):
+                for dy in range(-vision_range, vision_range+1):
                     if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
                         continue
 
                     if ecosystem.plant_map[x + dx][y + dy] and ecosystem.plant_map[x + dx][y + dy].type == organisms.Type.GRASS:
-                        if ecosystem.plant_map[x + dx][y + dy].amount >= MUCH_GRASS:
+                        if ecosystem.plant_map[x + dx][y + dy].amount >= parameters.grass.REPRODUCTION_THRESHOLD:
                             return True
 
             if burrow is not None:
                 burrow_distance = helpers.EuclidianDistance(x, y, burrow.x, burrow.y)
-                safe_distance = round((TIRED_DAMAGE_THRESHOLD + 0.5 * (TIRED_DAMAGE_THRESHOLD - TIRED_SEEK_THRESHOLD) - self.__outer._tired) / self.__outer._tired_speed)
+                safe_distance = round((parameters.rabbit.TIRED_DAMAGE_THRESHOLD + 0.5 * (parameters.rabbit.TIRED_DAMAGE_THRESHOLD - parameters.rabbit.TIRED_SEEK_THRESHOLD) - agent._tired) / agent._tired_speed)
 
                 if burrow_distance <= safe_distance:
                     return True
@@ -1170,75 +986,68 @@ class Rabbit(organisms.Organism):
     class FindPathToBurrowOrGrass(bt.Action):
         """Finds a path to the rabbit's burrow or to a tall grass patch. The
         burrow is preferred as it is safe from predators."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
             burrow_distance = math.inf
             if burrow is not None:
                 burrow_distance = helpers.EuclidianDistance(x, y, burrow.x, burrow.y)
-            safe_distance = round((TIRED_DAMAGE_THRESHOLD + 0.5 * (TIRED_DAMAGE_THRESHOLD - TIRED_SEEK_THRESHOLD) - self.__outer._tired) / self.__outer._tired_speed)
+            safe_distance = round((parameters.rabbit.TIRED_DAMAGE_THRESHOLD + 0.5 * (parameters.rabbit.TIRED_DAMAGE_THRESHOLD - parameters.rabbit.TIRED_SEEK_THRESHOLD) - agent._tired) / agent._tired_speed)
             if burrow_distance <= safe_distance:
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                             x, y, burrow.x, burrow.y, max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, burrow.x, burrow.y, max_path_length=parameters.rabbit.PATH_LENGTH,
+                                           shared_goal=True)
             else:
                 closest_grass = None
                 best_distance = math.inf
-                for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                    for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
+                for dx in range(-vision_range, vision_range+1):
+                    for dy in range(-vision_range, vision_range+1):
                         if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
                             continue
 
                         if ecosystem.plant_map[x + dx][y + dy] and ecosystem.plant_map[x + dx][y + dy].type == organisms.Type.GRASS:
-                            if ecosystem.plant_map[x + dx][y + dy].amount >= MUCH_GRASS:
+                            if ecosystem.plant_map[x + dx][y + dy].amount >= parameters.grass.REPRODUCTION_THRESHOLD:
                                 distance = helpers.EuclidianDistance(x, y, x + dx, y + dy)
                                 if distance < best_distance:
                                     closest_grass = ecosystem.plant_map[x + dx][y + dy]
                                     best_distance = distance
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                                   x, y, closest_grass.x, closest_grass.y, max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, closest_grass.x, closest_grass.y, max_path_length=parameters.rabbit.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     class NotBurrowOrGrassAvailable(bt.Condition):
         """Determines if there is no tall grass within the vision range, or if the
         burrow is too far away."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            for dx in range(-vision_range, vision_range+1):
+                for dy in range(-vision_range, vision_range+1):
                     if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
                         continue
 
                     if ecosystem.plant_map[x + dx][y + dy] and ecosystem.plant_map[x + dx][y + dy].type == organisms.Type.GRASS:
-                        if ecosystem.plant_map[x + dx][y + dy].amount >= MUCH_GRASS:
+                        if ecosystem.plant_map[x + dx][y + dy].amount >= parameters.grass.REPRODUCTION_THRESHOLD:
                             return False
 
             if burrow is not None:
                 burrow_distance = helpers.EuclidianDistance(x, y, burrow.x, burrow.y)
-                safe_distance = round((TIRED_DAMAGE_THRESHOLD + 0.5 * (TIRED_DAMAGE_THRESHOLD - TIRED_SEEK_THRESHOLD) - self.__outer._tired) / self.__outer._tired_speed)
+                safe_distance = round((parameters.rabbit.TIRED_DAMAGE_THRESHOLD + 0.5 * (parameters.rabbit.TIRED_DAMAGE_THRESHOLD - parameters.rabbit.TIRED_SEEK_THRESHOLD) - agent._tired) / agent._tired_speed)
 
                 if burrow_distance <= safe_distance:
                     return False
@@ -1247,24 +1056,20 @@ class Rabbit(organisms.Organism):
 
     class CreateBurrow(bt.Action):
         """The rabbit creates a new burrow."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
+        def action(self, agent):
             from burrow import Burrow
 
-            if not self.__outer.in_burrow:
-                x = self.__outer.x
-                y = self.__outer.y
-                burrow = Burrow(self.__outer._ecosystem, x, y)
-                self.__outer._ecosystem.animal_map[x][y].insert(0, burrow)
-                self.__outer.burrow = burrow
+            if not agent.in_burrow:
+                x = agent.x
+                y = agent.y
+                burrow = Burrow(agent._ecosystem, x, y)
+                agent._ecosystem.add_animal(burrow, index=0)
+                agent.burrow = burrow
 
                 # Increase hunger due to having to dig a hole
-                if not self.__outer._stabilized_health:
-                    self.__outer._hunger += 3 * self.__outer._hunger_speed
-            self._status = bt.Status.SUCCESS
+                if not agent._stabilized_health:
+                    agent._hunger += 3 * agent._hunger_speed
+            return bt.Status.SUCCESS
 
     ###########
     # POOPING #
@@ -1272,40 +1077,33 @@ class Rabbit(organisms.Organism):
 
     class CanPoop(bt.Condition):
         """Determines if the rabbit has to poop."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer._needs_to_poop
+        def condition(self, agent):
+            return agent._needs_to_poop
 
     class Poop(bt.Action):
         """The rabbit poops."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            poop_percentage = random.random()
-            if poop_percentage <= POOP_PERCENTAGE:
-                self.__outer._needs_to_poop = False
-
-                if self.__outer._ecosystem.plant_map[self.__outer.x][self.__outer.y] and not self.__outer._ecosystem.plant_map[self.__outer.x][self.__outer.y].type == organisms.Type.TREE:
-                    if self.__outer._poop_contains_seed:
-                        for _ in range(0, MAX_FLOWER_AMOUNT):
-                            create_flower = random.random()
-                            if create_flower <= CREATE_FLOWER_PERCENTAGE:
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            poop_percentage = agent._ecosystem.rng.rabbit.random()
+            if poop_percentage <= parameters.rabbit.POOP_PERCENTAGE:
+                agent._needs_to_poop = False
+
+                if agent._ecosystem.plant_map[agent.x][agent.y] and not agent._ecosystem.plant_map[agent.x][agent.y].type == organisms.Type.TREE:
+                    if agent._poop_contains_seed:
+                        for _ in range(0, parameters.rabbit.MAX_FLOWER_AMOUNT):
+                            create_flower = agent._ecosystem.rng.rabbit.random()
+                            if create_flower <= parameters.rabbit.CREATE_FLOWER_PERCENTAGE:
                                 from flower import Flower, PLANTED_SEED_AMOUNT
-                                x = self.__outer.x
-                                y = self.__outer.y
-                                ecosystem = self.__outer._ecosystem
+                                x = agent.x
+                                y = agent.y
+                                ecosystem = agent._ecosystem
                                 flower = Flower(ecosystem, x, y, PLANTED_SEED_AMOUNT, seed=True)
-                                ecosystem.flower_map[x][y].append(flower)
+                                ecosystem.add_flower(flower)
 
-                self.__outer._poop_contains_seed = False
-                self._status = bt.Status.SUCCESS
+                agent._poop_contains_seed = False
+                return bt.Status.SUCCESS
             else:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
 
     ###########
     # NURSING #
@@ -1313,70 +1111,60 @@ class Rabbit(organisms.Organism):
 
     class ShouldNurse(bt.Condition):
         """Determines if the rabbit should nurse its children or not."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
 
             if burrow is not None:
                 # Should nurse if the time it takes to reach burrow is what's left
                 # on the timer.
                 distance = helpers.EuclidianDistance(x, y, burrow.x, burrow.y)
-                nurse_timer = self.__outer._nurse_timer
+                nurse_timer = agent._nurse_timer
                 return distance >= nurse_timer
             else:
                 return False
 
     class Nurse(bt.Action):
         """The rabbit nurses its children."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-            self.__outer._nurse_timer = NURSE_COOLDOWN
+            agent._nurse_timer = parameters.rabbit.NURSE_COOLDOWN
 
             for animal in ecosystem.animal_map[x][y]:
-                if animal.type == organisms.Type.RABBIT and animal.age <= NEW_BORN_TIME:
+                if animal.type == organisms.Type.RABBIT and animal.age <= parameters.rabbit.NEW_BORN_TIME:
                     animal._hunger = 0
                     animal._thirst = 0
                     animal._tired = 0
 
-            self._status = bt.Status.SUCCESS
+            return bt.Status.SUCCESS
 
     class FindPathToBurrow(bt.Action):
         """Finds a path to the rabbit's burrow."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
             path = []
             if burrow is not None:
-                path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                             x, y, burrow.x, burrow.y, max_path_length=PATH_LENGTH)
+                path = ecosystem.find_path(agent, x, y, burrow.x, burrow.y, max_path_length=parameters.rabbit.PATH_LENGTH,
+                                           shared_goal=True)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     ################
     # GIVING BIRTH #
@@ -1384,84 +1172,62 @@ class Rabbit(organisms.Organism):
 
     class Pregnant(bt.Condition):
         """Determines if the rabbit is pregnant or not."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.pregnant
+        def condition(self, agent):
+            return agent.pregnant
 
     class TimeToGiveBirth(bt.Condition):
         """Determines if the time has come to give birth."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.reproduction_timer <= REPRODUCTION_COOLDOWN
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.reproduction_timer <= parameters.rabbit.REPRODUCTION_COOLDOWN
 
     class GiveBirth(bt.Action):
         """The rabbit gives birth."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._stabilized_health = False
-            self.__outer.pregnant = False
-            self.__outer._stop_nursing_timer = NEW_BORN_TIME
-            self.__outer._nurse_timer = 0
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            agent._stabilized_health = False
+            agent.pregnant = False
+            agent._stop_nursing_timer = parameters.rabbit.NEW_BORN_TIME
+            agent._nurse_timer = 0
 
             minimum_amount = 3
             maximum_amount = 6
 
-            x = self.__outer.x
-            y = self.__outer.y
-            burrow = self.__outer.burrow
-            ecosystem = self.__outer._ecosystem
+            x = agent.x
+            y = agent.y
+            burrow = agent.burrow
+            ecosystem = agent._ecosystem
 
             if burrow is not None:
-                import numpy as np
-                for _ in range(random.randint(minimum_amount, maximum_amount)):
-                    gender = random.choice([True, False])
-                    genetics_factor = (self.__outer.genetics_factor + self.__outer.partner_genetics_factor) / 2
-                    mutation = np.random.normal(0, 0.1)
+                for _ in range(ecosystem.rng.rabbit.randint(minimum_amount, maximum_amount)):
+                    gender = ecosystem.rng.rabbit.choice([True, False])
+                    genetics_factor = (agent.genetics_factor + agent.partner_genetics_factor) / 2
+                    mutation = ecosystem.rng.rabbit.gauss(0, 0.1)
                     genetics_factor += mutation
                     rabbit = Rabbit(ecosystem, x, y, gender, adult=False, burrow=burrow,
                                     in_burrow=True, genetics_factor=genetics_factor)
-                    ecosystem.animal_map[x][y].append(rabbit)
+                    ecosystem.add_animal(rabbit)
 
-                self._status = bt.Status.SUCCESS
+                return bt.Status.SUCCESS
             else:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
 
     class CloseToBirth(bt.Condition):
         """Determines if the rabbit is about to give birth."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.reproduction_timer <= REPRODUCTION_COOLDOWN + 24*1 # Two days prior to giving birth
+        def condition(self, agent):
+            parameters = agent._ecosystem.parameters
+            return agent.reproduction_timer <= parameters.rabbit.REPRODUCTION_COOLDOWN + 24*1 # Two days prior to giving birth
 
     class InBurrow(bt.Condition):
         """Determines if the rabbit is in its burrow."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.in_burrow
+        def condition(self, agent):
+            return agent.in_burrow
 
     class StabilizeHealth(bt.Action):
         """Stabilizes the rabbit's health for the remainder of the pregnancy."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            self.__outer._stabilized_health = True
-            self._status = bt.Status.SUCCESS
+        def action(self, agent):
+            agent._stabilized_health = True
+            return bt.Status.SUCCESS
 
     ################
     # REPRODUCTION #
@@ -1469,223 +1235,152 @@ class Rabbit(organisms.Organism):
 
     class CanReproduce(bt.Condition):
         """Determines if the rabbit can reproduce."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.can_reproduce
+        def condition(self, agent):
+            return agent.can_reproduce
 
     class HavePartner(bt.Condition):
         """Determines if the rabbit has a partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.partner is not None
+        def condition(self, agent):
+            return agent.partner is not None
 
     class PartnerCanReproduce(bt.Condition):
         """Determines if the rabbit's partner can reproduce."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.partner.can_reproduce
+        def condition(self, agent):
+            return agent.partner.can_reproduce
 
     class PartnerAdjacent(bt.Condition):
         """Determines if the partner is in the same cell as the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            partner = self.__outer.partner
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            partner = agent.partner
 
             return x == partner.x and y == partner.y
 
     class Reproduce(bt.Action):
         """The rabbit and its partner do the funky stuff."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            partner = self.__outer.partner
-
-            if self.__outer.female:
-                self.__outer.pregnant = True
-                self.__outer.reproduction_timer = REPRODUCTION_COOLDOWN + REPRODUCTION_TIME
-                self.__outer.can_reproduce = False
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            partner = agent.partner
+
+            if agent.female:
+                agent.pregnant = True
+                agent.reproduction_timer = parameters.rabbit.REPRODUCTION_COOLDOWN + parameters.rabbit.REPRODUCTION_TIME
+                agent.can_reproduce = False
             else:
                 partner.pregnant = True
-                partner.reproduction_timer = REPRODUCTION_COOLDOWN + REPRODUCTION_TIME
+                partner.reproduction_timer = parameters.rabbit.REPRODUCTION_COOLDOWN + parameters.rabbit.REPRODUCTION_TIME
                 partner.can_reproduce = False
-            self._status = bt.Status.SUCCESS
+            return bt.Status.SUCCESS
 
     class PartnerNearby(bt.Condition):
         """Determines if the rabbit's partner is within vision range."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-            partner = self.__outer.partner
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+            partner = agent.partner
 
-                    if x + dx == partner.x and y + dy == partner.y:
-                        return True
-            return False
+            return in_box(x, y, vision_range, partner.x, partner.y)
 
     class FindPathToPartner(bt.Action):
         """Finds a path to the rabbit's partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
-            partner = self.__outer.partner
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
+            partner = agent.partner
 
-            path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                         x, y, partner.x, partner.y, max_path_length=PATH_LENGTH)
+            path = ecosystem.find_path(agent, x, y, partner.x, partner.y, max_path_length=parameters.rabbit.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     class NoPartner(bt.Condition):
         """Determines if the rabbit has no partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            return self.__outer.partner is None
+        def condition(self, agent):
+            return agent.partner is None
 
     class AvailableRabbitAdjacent(bt.Condition):
         """Determines if there is a rabbit with no partner that can reproduce
         that is on the same cell as the rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
             for animal in ecosystem.animal_map[x][y]:
-                if animal is not self.__outer:
+                if animal is not agent:
                     if animal.type == organisms.Type.RABBIT:
-                        if not animal.partner and animal.can_reproduce and animal.female != self.__outer.female:
+                        if not animal.partner and animal.can_reproduce and animal.female != agent.female:
                             return True
             return False
 
     class MakePartner(bt.Action):
         """Make the available rabbit this rabbit's partner and vice versa."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
+        def action(self, agent):
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
 
-            self._status = bt.Status.FAIL
+            status = bt.Status.FAIL
             for animal in ecosystem.animal_map[x][y]:
-                if animal is not self.__outer:
+                if animal is not agent:
                     if animal.type == organisms.Type.RABBIT:
-                        if not animal.partner and animal.can_reproduce and animal.female is not self.__outer.female:
-                            self._status = bt.Status.SUCCESS
-                            self.__outer.partner = animal
-                            animal.partner_genetics_factor = self.__outer.genetics_factor
-                            animal.partner = self.__outer
-                            self.__outer.partner_genetics_factor = animal.genetics_factor
+                        if not animal.partner and animal.can_reproduce and animal.female is not agent.female:
+                            status = bt.Status.SUCCESS
+                            agent.partner = animal
+                            animal.partner_genetics_factor = agent.genetics_factor
+                            animal.partner = agent
+                            agent.partner_genetics_factor = animal.genetics_factor
+            return status
 
     class AvailableRabbitNearby(bt.Condition):
         """Determines if there is a rabbit in this rabbit's vision range
         that can reproduce and has no partner."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def condition(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
-
-                    for animal in ecosystem.animal_map[x + dx][y + dy]:
-                        if animal is not self.__outer:
-                            if animal.type == organisms.Type.RABBIT:
-                                if not animal.partner and animal.can_reproduce and animal.female is not self.__outer.female:
-                                    return True
+        def condition(self, agent):
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
+
+            for animal in ecosystem.spatial_index.animals_in_box(organisms.Type.RABBIT, x, y, vision_range):
+                if animal is not agent:
+                    if not animal.partner and animal.can_reproduce and animal.female is not agent.female:
+                        return True
             return False
 
     class FindPathToRabbit(bt.Action):
         """Finds a path to the available rabbit."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
-            x = self.__outer.x
-            y = self.__outer.y
-            vision_range = self.__outer._vision_range
-            ecosystem = self.__outer._ecosystem
-
-            closest_rabbit = None
-            best_distance = math.inf
+        def action(self, agent):
+            parameters = agent._ecosystem.parameters
+            x = agent.x
+            y = agent.y
+            vision_range = agent._vision_range
+            ecosystem = agent._ecosystem
 
-            for dx in range(-int(vision_range['left']), int(vision_range['right'])+1):
-                for dy in range(-int(vision_range['up']), int(vision_range['down'])+1):
-                    if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                        continue
+            def available(animal):
+                return (animal is not agent and not animal.partner and
+                        animal.can_reproduce and animal.female is not agent.female)
 
-                    distance = helpers.EuclidianDistance(x, y, x + dx, y + dy)
-                    if distance < best_distance:
-                        for animal in ecosystem.animal_map[x + dx][y + dy]:
-                            if animal is not self.__outer:
-                                if animal.type == organisms.Type.RABBIT:
-                                    if not animal.partner and animal.can_reproduce and animal.female is not self.__outer.female:
-                                        closest_rabbit = animal
-                                        best_distance = distance
-                                        break
+            closest_rabbit = ecosystem.spatial_index.nearest(organisms.Type.RABBIT, x, y, vision_range, available)
 
-            path = astar(self.__outer, ecosystem.water_map, ecosystem.plant_map, ecosystem.animal_map,
-                         x, y, closest_rabbit.x, closest_rabbit.y, max_path_length=PATH_LENGTH)
+            path = ecosystem.find_path(agent, x, y, closest_rabbit.x, closest_rabbit.y, max_path_length=parameters.rabbit.PATH_LENGTH)
 
             if len(path) > 0:
                 path.pop(0)
-                self.__outer._movement_path = path
-                self._status = bt.Status.SUCCESS
+                agent._movement_path = path
+                return bt.Status.SUCCESS
             else:
-                self.__outer._movement_path = None
-                self._status = bt.Status.FAIL
+                agent._movement_path = None
+                return bt.Status.FAIL
 
     ###################
     # RANDOM MOVEMENT #
@@ -1693,36 +1388,23 @@ class Rabbit(organisms.Organism):
 
     class MoveRandomly(bt.Action):
         """Moves the rabbit randomly."""
-        def __init__(self, outer):
-            super().__init__()
-            self.__outer = outer
-
-        def action(self):
+        def action(self, agent):
             # TODO: Make excessive movement result in size decrease
-            x = self.__outer.x
-            y = self.__outer.y
-            ecosystem = self.__outer._ecosystem
-            direction = random.choice(list(helpers.Direction))
+            x = agent.x
+            y = agent.y
+            ecosystem = agent._ecosystem
+            direction = ecosystem.rng.rabbit.choice(list(helpers.Direction))
             dx = direction.value[0]
             dy = direction.value[1]
 
             if x + dx < 0 or x + dx >= ecosystem.width or y + dy < 0 or y + dy >= ecosystem.height:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
             elif ecosystem.water_map[x + dx][y + dy]:
-                self._status = bt.Status.FAIL
+                return bt.Status.FAIL
             elif ecosystem.animal_map[x + dx][y + dy]:
-                occupied_space = 0
-                if ecosystem.plant_map[x + dx][y + dy] and ecosystem.plant_map[x + dx][y + dy].type == organisms.Type.TREE:
-                    occupied_space += 50
-                for animal in ecosystem.animal_map[x + dx][y + dy]:
-                    occupied_space += animal.size
-                from ecosystem import ANIMAL_CELL_CAPACITY
-                if occupied_space + self.__outer.size > ANIMAL_CELL_CAPACITY:
-                    self._status = bt.Status.FAIL
+                # The animal stays where it is, also when the cell has room left
+                return bt.Status.FAIL
             else:
-                self._status = bt.Status.SUCCESS
-                self.__outer._movement_timer += self.__outer._movement_cooldown
-                index = ecosystem.animal_map[x][y].index(self.__outer)
-                ecosystem.animal_map[x + dx][y + dy].append(ecosystem.animal_map[x][y].pop(index))
-                self.__outer.x += dx
-                self.__outer.y += dy
+                agent._movement_timer += agent._movement_cooldown
+                ecosystem.move_animal(agent, x + dx, y + dy)
+                return bt.Status.SUCCESS
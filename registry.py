@@ -0,0 +1,80 @@
+import itertools
+from organisms import Type
+
+
+# The order in which the organism types are run and drawn. Water and plants
+# come first, and animal homes come before the animals living in them.
+RUN_ORDER = [
+    Type.WATER,
+    Type.EARTH,
+    Type.GRASS,
+    Type.TREE,
+    Type.FLOWER,
+    Type.HIVE,
+    Type.BURROW,
+    Type.DEN,
+    Type.BEE,
+    Type.RABBIT,
+    Type.FOX
+]
+
+
+class OrganismRegistry():
+    """Keeps track of all organisms placed in the ecosystem maps. The
+    organisms are kept per type in insertion order, and the ecosystem updates
+    the registry whenever it places or removes an organism. The sum of the
+    genetics factors of each type is kept up to date as organisms come and
+    go, so population metrics never have to loop over the organisms."""
+    def __init__(self):
+        self._organisms = {type: {} for type in RUN_ORDER}
+        self._genetics_factor_sums = dict.fromkeys(RUN_ORDER, 0.0)
+
+    def add(self, organism):
+        """Adds an organism to the registry."""
+        organisms = self._organisms[organism.type]
+        if organism in organisms:
+            return
+        organisms[organism] = None
+        genetics_factor = getattr(organism, 'genetics_factor', None)
+        if genetics_factor is not None:
+            self._genetics_factor_sums[organism.type] += genetics_factor
+
+    def remove(self, organism):
+        """Removes an organism from the registry, if it is in it."""
+        organisms = self._organisms[organism.type]
+        if organism not in organisms:
+            return
+        del organisms[organism]
+        genetics_factor = getattr(organism, 'genetics_factor', None)
+        if genetics_factor is not None:
+            if organisms:
+                self._genetics_factor_sums[organism.type] -= genetics_factor
+            else:
+                # Start over from zero so rounding errors do not pile up
+                self._genetics_factor_sums[organism.type] = 0.0
+
+    def of_type(self, type):
+        """Returns a view of the organisms of the given type."""
+        return self._organisms[type].keys()
+
+    def count(self, type):
+        """Returns the amount of organisms of the given type."""
+        return len(self._organisms[type])
+
+    def genetics_factor_sum(self, type):
+        """Returns the sum of the genetics factors of the organisms of the
+        given type."""
+        return self._genetics_factor_sums[type]
+
+    def snapshot(self):
+        """Returns a list of all organisms at this moment."""
+        return list(self)
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._organisms.values())
+
+    def __len__(self):
+        return sum(len(organisms) for organisms in self._organisms.values())
+
+    def __contains__(self, organism):
+        return organism in self._organisms[organism.type]
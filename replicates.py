@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ecosystem import Ecosystem
+from metrics import POPULATIONS, MetricsWriter, measure
+from simulate import DEFAULT_WIDTH, DEFAULT_HEIGHT
+
+SURVIVAL_THRESHOLD = 25000 # Steps a run has to get past to count as surviving
+
+
+def series_path(directory, seed):
+    """Returns the path of the metrics file of the run with the given seed."""
+    return os.path.join(directory, 'run_' + str(seed) + '.csv')
+
+
+def run_replicate(seed, steps, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, config=None, directory=None,
+                  stop_event=None):
+    """Runs one seeded simulation of an ecosystem created with the given config
+    for the given amount of steps, or until the rabbits or foxes die out. The
+    metrics of every step are written while the run goes on to a file named
+    after the seed in the given directory, or to a temporary file that the
+    caller removes if no directory is given. Returns a dict with the seed,
+    the amount of steps the rabbits and foxes survived, the path of the
+    metrics file, a summary with the final and mean amount of every
+    population, and whether the run was stopped. The stop event is checked
+    every step, and once it is set the run stops, its file is removed and the
+    path is None."""
+    ecosystem = Ecosystem(width, height, config, seed)
+
+    if directory is not None:
+        path = series_path(directory, seed)
+        output = open(path, 'w', newline='')
+    else:
+        handle, path = tempfile.mkstemp(prefix='run_' + str(seed) + '_', suffix='.csv')
+        output = open(handle, 'w', newline='')
+
+    totals = dict.fromkeys(POPULATIONS, 0)
+    metrics = None
+    measured = 0
+    survived = steps
+    stopped = False
+    with output:
+        writer = MetricsWriter(output)
+        for step in range(steps):
+            if stop_event is not None and stop_event.is_set():
+                survived = step
+                stopped = True
+                break
+            metrics = measure(step, ecosystem.run())
+            writer.append(metrics)
+            measured += 1
+            for population in POPULATIONS:
+                totals[population] += metrics[population]
+            if metrics['rabbits'] == 0 or metrics['foxes'] == 0:
+                survived = step
+                break
+        writer.flush()
+    if stopped:
+        os.remove(path)
+        path = None
+
+    summary = {}
+    for population in POPULATIONS:
+        summary['final_' + population] = metrics[population] if metrics is not None else 0
+        summary['mean_' + population] = totals[population] / measured if measured else 0
+    return {'seed': seed, 'steps': survived, 'path': path, 'summary': summary, 'stopped': stopped}
+
+
+def run_replicates(seeds, steps, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, workers=None, stop_after=None,
+                   directory=None):
+    """Runs a simulation for each seed in a pool of processes, and yields the
+    result of each run as soon as it is done. If stop_after is set, no more
+    results are yielded once that many runs have survived all steps: the
+    runs that have not started are cancelled, and the running ones stop at
+    their next step through a shared event. If a directory is given, the
+    metrics of every run are written to it while the runs go on, and
+    otherwise to temporary files that the caller removes."""
+    survived = 0
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+        stop_event = manager.Event()
+        try:
+            futures = [executor.submit(run_replicate, seed, steps, width, height, None, directory, stop_event)
+                       for seed in seeds]
+            for future in as_completed(futures):
+                result = future.result()
+                if result['stopped']:
+                    continue
+                yield result
+                if result['steps'] >= steps:
+                    survived += 1
+                    if stop_after is not None and survived >= stop_after:
+                        return
+        finally:
+            # The running simulations stop at their next step, so this does
+            # not wait for them to finish
+            stop_event.set()
+            executor.shutdown(cancel_futures=True)
+
+
+def survival_statistics(results, steps):
+    """Returns a dict with the amount of runs, how many of them survived all
+    steps, and the average, shortest and longest amount of steps survived."""
+    survived_steps = [result['steps'] for result in results]
+    survived = sum(1 for amount in survived_steps if amount >= steps)
+    return {
+        'runs': len(survived_steps),
+        'survived': survived,
+        'survival_rate': survived / len(survived_steps) if survived_steps else 0,
+        'average_steps': sum(survived_steps) / len(survived_steps) if survived_steps else 0,
+        'min_steps': min(survived_steps, default=0),
+        'max_steps': max(survived_steps, default=0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs seeded simulations in parallel until a number of ' +
+                                     'them survive a set amount of steps.')
+    parser.add_argument(
+        '--runs',
+        dest='runs',
+        help='The largest number of simulations to run. Default 16.',
+        type=int,
+        default=16
+    )
+    parser.add_argument(
+        '--steps',
+        dest='steps',
+        help='The number of steps the rabbits and foxes have to survive. Default ' +
+        str(SURVIVAL_THRESHOLD) + '.',
+        type=int,
+        default=SURVIVAL_THRESHOLD
+    )
+    parser.add_argument(
+        '--stop-after',
+        dest='stop_after',
+        help='Stop once this many runs have survived. Default 1.',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--workers',
+        dest='workers',
+        help='The number of processes to run the simulations in. Default one per core.',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '--seed',
+        dest='seed',
+        help='Seed of the first run, the following runs use the next seeds. Default 0.',
+        type=int,
+        default=0
+    )
+    parser.add_argument(
+        '--width',
+        dest='width',
+        help='The width of the map in cells. Default ' + str(DEFAULT_WIDTH) + '.',
+        type=int,
+        default=DEFAULT_WIDTH
+    )
+    parser.add_argument(
+        '--height',
+        dest='height',
+        help='The height of the map in cells. Default ' + str(DEFAULT_HEIGHT) + '.',
+        type=int,
+        default=DEFAULT_HEIGHT
+    )
+    parser.add_argument(
+        '--output',
+        dest='output',
+        help='Directory to write the metrics of every run to. Not written by default.',
+        default=None
+    )
+
+    args = parser.parse_args()
+
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+
+    results = []
+    seeds = range(args.seed, args.seed + args.runs)
+    for result in run_replicates(seeds, args.steps, args.width, args.height, args.workers, args.stop_after,
+                                 args.output):
+        results.append(result)
+        if args.output is None:
+            os.remove(result['path'])
+        print('Run with seed ' + str(result['seed']) + ' survived ' + str(result['steps']) + ' steps')
+
+    statistics = survival_statistics(results, args.steps)
+    print()
+    print(str(statistics['survived']) + ' of ' + str(statistics['runs']) + ' runs survived ' +
+          str(args.steps) + ' steps')
+    print('Average amount of steps: ' + str(statistics['average_steps']))
+    print('Shortest run: ' + str(statistics['min_steps']) + ' steps, longest run: ' +
+          str(statistics['max_steps']) + ' steps')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import random
+import numpy as np
+
+# Subsystems with their own random number stream
+STREAMS = ['world', 'weather', 'earth', 'grass', 'bee', 'rabbit', 'fox']
+
+
+class EcosystemRandom():
+    """The random number streams of an ecosystem. Every subsystem draws from
+    its own stream, and the streams are seeded independently from the seed of
+    the ecosystem, so the same seed always gives the same run, and a change in
+    how one subsystem uses random numbers does not shift the numbers of the
+    others. If no seed is given a random one is picked, which can be read
+    from the seed attribute to repeat the run.
+
+    Each stream is a random.Random, which is faster than numpy for the single
+    numbers drawn by the organisms."""
+    def __init__(self, seed=None):
+        for name in STREAMS:
+            setattr(self, name, random.Random())
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """Seeds all streams again from the given seed. The stream objects are
+        kept, so references to them stay valid."""
+        seed_sequence = np.random.SeedSequence(seed)
+        self.seed = seed_sequence.entropy
+        for name, child in zip(STREAMS, seed_sequence.spawn(len(STREAMS))):
+            state = child.generate_state(4, dtype=np.uint32)
+            getattr(self, name).seed(int.from_bytes(state.tobytes(), 'little'))
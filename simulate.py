@@ -0,0 +1,177 @@
+import argparse
+import contextlib
+import time
+from ecosystem import Ecosystem, EcosystemConfig
+from event_log import EventLog, truncate_log
+from metrics import MetricsWriter, measure, truncate_metrics
+from profiler import Profiler
+
+DEFAULT_WIDTH = 60
+DEFAULT_HEIGHT = 40
+PROFILE_REPORT_ROWS = 20 # Slowest node classes and sections printed after a profiled run
+
+
+def simulate(ecosystem, steps, output, checkpoint=None, checkpoint_interval=1000, header=True):
+    """Runs the ecosystem for the given amount of steps, and writes the
+    metrics of every step as CSV to the output file, with a header unless the
+    file is continued. If a checkpoint file is given the ecosystem is saved
+    to it every checkpoint_interval steps and at the end."""
+    writer = MetricsWriter(output, header=header)
+    for _ in range(steps):
+        step = ecosystem.steps
+        metrics = measure(step, ecosystem.run())
+        writer.append(metrics)
+        if checkpoint is not None and not ecosystem.steps % checkpoint_interval:
+            writer.flush()
+            if ecosystem.event_log is not None:
+                ecosystem.event_log.flush()
+            ecosystem.save(checkpoint.format(step=ecosystem.steps))
+
+        if not step % 100:
+            print('Iteration ' + str(step) + ':')
+            print('  ' + str(metrics['foxes']) + ' foxes')
+            print('  ' + str(metrics['rabbits']) + ' rabbits')
+            print('  ' + str(metrics['bees']) + ' bees')
+            print('  ' + str(metrics['flowers']) + ' flowers')
+    writer.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulates an ecosystem without visualizing it, ' +
+                                     'and writes the population amounts of every step to a file.')
+    parser.add_argument(
+        '--steps',
+        dest='steps',
+        help='The number of steps to simulate for. Default 1000.',
+        type=int,
+        default=1000
+    )
+    parser.add_argument(
+        '--seed',
+        dest='seed',
+        help='Seed of the ecosystem. A random seed is picked by default.',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '--width',
+        dest='width',
+        help='The width of the map in cells. Default ' + str(DEFAULT_WIDTH) + '.',
+        type=int,
+        default=DEFAULT_WIDTH
+    )
+    parser.add_argument(
+        '--height',
+        dest='height',
+        help='The height of the map in cells. Default ' + str(DEFAULT_HEIGHT) + '.',
+        type=int,
+        default=DEFAULT_HEIGHT
+    )
+    parser.add_argument(
+        '--output',
+        dest='output',
+        help='The file to write the metrics to. Default metrics.csv.',
+        default='metrics.csv'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        dest='checkpoint',
+        help='File to save the ecosystem to regularly and at the end of the run. {step} in the name ' +
+        'is replaced by the step, to keep every snapshot. Not saved by default.',
+        default=None
+    )
+    parser.add_argument(
+        '--checkpoint-interval',
+        dest='checkpoint_interval',
+        help='The number of steps between saving the checkpoint. Default 1000.',
+        type=int,
+        default=1000
+    )
+    parser.add_argument(
+        '--resume',
+        dest='resume',
+        help='Continue the run saved in the given checkpoint instead of creating a new ecosystem. ' +
+        'If --seed is set the random number streams are seeded again to branch off a new run. ' +
+        'Checkpoints are pickles that can run any code when loaded, only resume trusted checkpoints.',
+        default=None
+    )
+    parser.add_argument(
+        '--event-log',
+        dest='event_log',
+        help='File to record all changes to the maps in, for replaying them with event_log.py. ' +
+        'Not recorded by default.',
+        default=None
+    )
+    parser.add_argument(
+        '--profile',
+        dest='profile',
+        help='Time every behaviour tree node and phase of the steps, print the slowest ones and ' +
+        'write the call paths to the given file in the collapsed stack format of flame graphs. ' +
+        'Not profiled by default.',
+        default=None
+    )
+    parser.add_argument(
+        '--storms',
+        dest='storms',
+        help='Let rain fall from storm cells instead of evenly over the map.',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--flow-fields',
+        dest='flow_fields',
+        help='Use flow fields for paths to burrows, dens and water pools.',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--hierarchical-paths',
+        dest='hierarchical_paths',
+        help='Use hierarchical pathfinding for far away goals, for large maps.',
+        action='store_true'
+    )
+
+    args = parser.parse_args()
+
+    continue_output = False
+    if args.resume is not None:
+        ecosystem = Ecosystem.load(args.resume, args.seed)
+        print('Resuming at step ' + str(ecosystem.steps))
+        # Continue the metrics of the run from the step it was saved at
+        continue_output = truncate_metrics(args.output, ecosystem.steps)
+        if args.event_log is not None:
+            truncate_log(args.event_log, ecosystem.steps)
+            ecosystem.event_log = EventLog(args.event_log, ecosystem.width, ecosystem.height)
+    else:
+        config = EcosystemConfig(storms=args.storms, flow_fields=args.flow_fields,
+                                 hierarchical_paths=args.hierarchical_paths)
+        event_log = None
+        if args.event_log is not None:
+            # Start a new log
+            open(args.event_log, 'wb').close()
+            event_log = EventLog(args.event_log, args.width, args.height)
+        ecosystem = Ecosystem(args.width, args.height, config, args.seed, event_log)
+    print('Seed: ' + str(ecosystem.rng.seed))
+    start_time = time.time()
+    profiler = Profiler() if args.profile is not None else contextlib.nullcontext()
+    with profiler, open(args.output, 'a' if continue_output else 'w', newline='') as output:
+        simulate(ecosystem, args.steps, output, args.checkpoint, args.checkpoint_interval,
+                 header=not continue_output)
+    if args.checkpoint is not None:
+        ecosystem.save(args.checkpoint.format(step=ecosystem.steps))
+    if ecosystem.event_log is not None:
+        ecosystem.event_log.close()
+    print('Simulated ' + str(args.steps) + ' steps in ' + str(round(time.time() - start_time, 2)) +
+          ' seconds, metrics written to ' + args.output)
+    if args.profile is not None:
+        profiler.write_collapsed(args.profile)
+        print('{:<32}{:>10}{:>10}{:>10}{:>9}{:>9}{:>9}'.format('Node or section', 'Calls', 'Time', 'Self',
+                                                               'Success', 'Fail', 'Running'))
+        for row in profiler.class_report()[:PROFILE_REPORT_ROWS]:
+            ratios = ['{:>9.2f}'.format(row[status]) if row[status] is not None else '{:>9}'.format('-')
+                      for status in ('success', 'fail', 'running')]
+            print('{:<32}{:>10}{:>10.3f}{:>10.3f}'.format(row['name'], row['calls'], row['time'], row['self_time']) +
+                  ''.join(ratios))
+        print('Call paths written to ' + args.profile)
+
+
+if __name__ == "__main__":
+    main()
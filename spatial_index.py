@@ -0,0 +1,87 @@
+import math
+import numpy as np
+import helpers
+
+ADJACENT = 1
+
+
+def in_box(x, y, radius, other_x, other_y):
+    """Checks if the given position is inside the square box with the given
+    radius around (x, y)."""
+    return abs(other_x - x) <= radius and abs(other_y - y) <= radius
+
+
+def box_window(array, x, y, radius):
+    """Returns the part of a map array covered by the square box with the
+    given radius around (x, y), together with the position of its lower
+    corner."""
+    width, height = array.shape
+    min_x = max(0, x - radius)
+    max_x = min(width, x + radius + 1)
+    min_y = max(0, y - radius)
+    max_y = min(height, y + radius + 1)
+    return array[min_x:max_x, min_y:max_y], min_x, min_y
+
+
+class SpatialIndex():
+    """Keeps a count of the animals of every type in each cell of the animal
+    map, so that perception checks only have to look at the cells that
+    actually contain the type they are looking for."""
+    def __init__(self, animal_map, width, height):
+        self._animal_map = animal_map
+        self.width = width
+        self.height = height
+        self._counts = {}
+
+    def counts(self, type):
+        """Returns the per cell count array for the given type."""
+        counts = self._counts.get(type)
+        if counts is None:
+            counts = np.zeros((self.width, self.height), dtype=np.int32)
+            self._counts[type] = counts
+        return counts
+
+    def add(self, animal):
+        """Adds an animal to the index at its current position."""
+        self.counts(animal.type)[animal.x, animal.y] += 1
+
+    def remove(self, animal):
+        """Removes an animal from the index at its current position."""
+        self.counts(animal.type)[animal.x, animal.y] -= 1
+
+    def any_in_box(self, type, x, y, radius):
+        """Checks if there is an animal of the given type in the box with the
+        given radius around (x, y)."""
+        window, _, _ = box_window(self.counts(type), x, y, radius)
+        return window.any()
+
+    def cells_in_box(self, type, x, y, radius):
+        """Returns the cells in the box with the given radius around (x, y)
+        that contain the given type, ordered on x and then on y."""
+        window, min_x, min_y = box_window(self.counts(type), x, y, radius)
+        xs, ys = np.nonzero(window)
+        return zip((xs + min_x).tolist(), (ys + min_y).tolist())
+
+    def animals_in_box(self, type, x, y, radius, condition=None):
+        """Yields the animals of the given type in the box with the given
+        radius around (x, y) for which the condition holds."""
+        for cell_x, cell_y in self.cells_in_box(type, x, y, radius):
+            for animal in self._animal_map[cell_x][cell_y]:
+                if animal.type == type and (condition is None or condition(animal)):
+                    yield animal
+
+    def nearest(self, type, x, y, radius, condition=None):
+        """Returns the closest animal of the given type in the box with the
+        given radius around (x, y) for which the condition holds, or None if
+        there is no such animal."""
+        best_animal = None
+        best_distance = math.inf
+        for cell_x, cell_y in self.cells_in_box(type, x, y, radius):
+            distance = helpers.EuclidianDistance(x, y, cell_x, cell_y)
+            if distance < best_distance:
+                for animal in self._animal_map[cell_x][cell_y]:
+                    if animal.type == type and (condition is None or condition(animal)):
+                        best_animal = animal
+                        best_distance = distance
+                        break
+        return best_animal
@@ -0,0 +1,184 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from ecosystem import EcosystemConfig
+from metrics import POPULATIONS
+from replicates import run_replicate
+from simulate import DEFAULT_WIDTH, DEFAULT_HEIGHT
+
+DEFAULT_STEPS = 5000
+CONFIG_PREFIX = 'config.' # Parameters with this prefix are ecosystem config settings
+
+
+def grid(parameters):
+    """Returns a list with a dict of values for every combination of the lists
+    of values of the given parameters."""
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*(parameters[name] for name in names))]
+
+
+def latin_hypercube(parameters, samples, seed=None):
+    """Returns a list of the given amount of dicts of values, sampled with
+    a Latin hypercube over the [low, high] ranges of the given parameters.
+    Each range is split into one stratum per sample and every stratum is used
+    once. Parameters with integer bounds get integer values."""
+    rng = np.random.default_rng(seed)
+    points = [{} for _ in range(samples)]
+    for name, (low, high) in parameters.items():
+        strata = (rng.permutation(samples) + rng.random(samples)) / samples
+        values = low + strata * (high - low)
+        for point, value in zip(points, values):
+            if isinstance(low, int) and isinstance(high, int):
+                point[name] = int(round(value))
+            else:
+                point[name] = float(value)
+    return points
+
+
+def sweep_points(spec):
+    """Returns the parameter values of every point of a sweep spec. The spec
+    has a 'method', either 'grid' with a list of values per parameter, or
+    'latin_hypercube' with a [low, high] range per parameter and the amount
+    of 'samples'."""
+    method = spec.get('method', 'grid')
+    if method == 'grid':
+        return grid(spec['parameters'])
+    if method == 'latin_hypercube':
+        return latin_hypercube(spec['parameters'], spec['samples'], spec.get('seed'))
+    raise ValueError('Unknown sweep method ' + method)
+
+
+def point_config(values):
+    """Returns the ecosystem config for the parameter values of a point. Values
+    named 'config.setting' are config settings, and the others are tuning
+    constants named 'module.CONSTANT', which are given to the config as the
+    parameters of the run."""
+    settings = {name[len(CONFIG_PREFIX):]: value for name, value in values.items() if name.startswith(CONFIG_PREFIX)}
+    parameters = {name: value for name, value in values.items() if not name.startswith(CONFIG_PREFIX)}
+    config_settings = vars(EcosystemConfig())
+    for name in parameters:
+        module_name, _, constant = name.rpartition('.')
+        if module_name == 'ecosystem' and constant.lower() in config_settings:
+            raise ValueError(name + ' is an ecosystem config setting, use ' + CONFIG_PREFIX +
+                             constant.lower() + ' instead')
+    return EcosystemConfig(parameters=parameters, **settings)
+
+
+def run_point(point_index, values, config, seed, steps, width, height):
+    """Runs one seeded simulation of an ecosystem created with the config of
+    the given parameter values, and returns a row of the results table."""
+    result = run_replicate(seed, steps, width, height, config)
+
+    # Only the summary of the run is kept
+    os.remove(result['path'])
+    row = {'point': point_index, 'seed': seed}
+    row.update(values)
+    row['steps'] = result['steps']
+    row['survived'] = result['steps'] >= steps
+    row.update(result['summary'])
+    return row
+
+
+def run_sweep(points, replicates, steps, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, seed=0, workers=None):
+    """Runs every point of a sweep the given amount of times in a pool of
+    processes, and yields the rows of the results table as the runs finish.
+    Replicate r of every point uses the seed seed + r, so the points are
+    compared on the same seeds."""
+    configs = [point_config(values) for values in points]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_point, point_index, values, configs[point_index], seed + replicate, steps,
+                                   width, height)
+                   for point_index, values in enumerate(points)
+                   for replicate in range(replicates)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs simulations over a grid or a Latin hypercube of ' +
+                                     'tuning constants, and writes a table of the results.')
+    parser.add_argument(
+        'spec',
+        help='JSON file with the sweep, for example {"method": "grid", "parameters": ' +
+        '{"rabbit.HUNGER_SEEK_THRESHOLD": [40, 50, 60]}} or {"method": "latin_hypercube", ' +
+        '"samples": 20, "parameters": {"config.fox_amount": [3, 12]}}. Parameters named ' +
+        '"config.setting" are EcosystemConfig settings.'
+    )
+    parser.add_argument(
+        '--replicates',
+        dest='replicates',
+        help='The number of seeded runs per point. Default 1.',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--steps',
+        dest='steps',
+        help='The number of steps to simulate for. Default ' + str(DEFAULT_STEPS) + '.',
+        type=int,
+        default=DEFAULT_STEPS
+    )
+    parser.add_argument(
+        '--seed',
+        dest='seed',
+        help='Seed of the first replicate of every point. Default 0.',
+        type=int,
+        default=0
+    )
+    parser.add_argument(
+        '--workers',
+        dest='workers',
+        help='The number of processes to run the simulations in. Default one per core.',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '--width',
+        dest='width',
+        help='The width of the map in cells. Default ' + str(DEFAULT_WIDTH) + '.',
+        type=int,
+        default=DEFAULT_WIDTH
+    )
+    parser.add_argument(
+        '--height',
+        dest='height',
+        help='The height of the map in cells. Default ' + str(DEFAULT_HEIGHT) + '.',
+        type=int,
+        default=DEFAULT_HEIGHT
+    )
+    parser.add_argument(
+        '--output',
+        dest='output',
+        help='The file to write the results table to. Default sweep.csv.',
+        default='sweep.csv'
+    )
+
+    args = parser.parse_args()
+
+    with open(args.spec) as spec_file:
+        points = sweep_points(json.load(spec_file))
+    # Fail on unknown settings and constants before starting any runs
+    for values in points:
+        point_config(values)
+
+    columns = ['point', 'seed'] + list(points[0]) + ['steps', 'survived'] + \
+        ['final_' + population for population in POPULATIONS] + \
+        ['mean_' + population for population in POPULATIONS]
+    runs = len(points) * args.replicates
+    with open(args.output, 'w', newline='') as output:
+        writer = csv.DictWriter(output, fieldnames=columns)
+        writer.writeheader()
+        for done, row in enumerate(run_sweep(points, args.replicates, args.steps, args.width, args.height,
+                                             args.seed, args.workers), start=1):
+            writer.writerow(row)
+            output.flush()
+            print('Run ' + str(done) + ' of ' + str(runs) + ' done (point ' + str(row['point']) +
+                  ', seed ' + str(row['seed']) + ', survived ' + str(row['steps']) + ' steps)')
+
+
+if __name__ == "__main__":
+    main()
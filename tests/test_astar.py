@@ -0,0 +1,229 @@
+import math
+import random
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import helpers
+import organisms
+from astar import astar, astar_on_layers, maze_layers
+from ecosystem import ANIMAL_CELL_CAPACITY, TREE_OCCUPIED_SPACE
+
+SEEDS = range(5)
+SEARCHES_PER_MAP = 40
+
+directions = list(helpers.Direction)
+
+
+class ReferenceNode():
+    """A node class for A* Pathfinding"""
+
+    def __init__(self, parent=None, x=None, y=None):
+        self.parent = parent
+        self.x = x
+        self.y = y
+
+        self.g = 0
+        self.h = 0
+        self.f = 0
+
+    def __eq__(self, other):
+        return ((self.x == other.x) and (self.y == other.y))
+
+
+def reference_astar(traverser, water_map, plant_map, animal_map, start_x, start_y, end_x, end_y, max_path_length=math.inf):
+    """The astar search before it used a binary heap, kept as it was to
+    compare the paths found with it."""
+    # Create start and end node
+    start_node = ReferenceNode(None, start_x, start_y)
+    start_node.g = start_node.h = start_node.f = 0
+    end_node = ReferenceNode(None, end_x, end_y)
+    end_node.g = end_node.h = end_node.f = 0
+
+
+    # Initialize both open and closed list
+    open_list = []
+    closed_list = []
+
+    # Add the start node
+    open_list.append(start_node)
+
+    # Loop until you find the end
+
+    while len(open_list) > 0:
+
+        # Get the current node
+        current_node = open_list[0]
+        current_index = 0
+        for index, item in enumerate(open_list):
+            if item.f < current_node.f:
+                current_node = item
+                current_index = index
+
+        # Pop current off open list, add to closed list
+        open_list.pop(current_index)
+        closed_list.append(current_node)
+
+        # Found the goal
+        if current_node == end_node or current_node.g > max_path_length :
+            path = []
+            current = current_node
+            while current is not None:
+                path.append((current.x, current.y))
+                current = current.parent
+            return path[::-1] # Return reversed path
+
+        # Generate children
+        from ecosystem import ANIMAL_CELL_CAPACITY
+        for dir in directions: # Adjacent squares
+
+            # Get node position
+            node_position_x = current_node.x + dir.value[0]
+            node_position_y = current_node.y + dir.value[1]
+
+            # Make sure within range
+            width = len(water_map)
+            height = len(water_map[0])
+            if node_position_x >= width or node_position_x < 0 or node_position_y >= height or node_position_y < 0:
+                continue
+
+            # Make sure walkable terrain
+            if water_map[node_position_x][node_position_y]:
+                continue
+            elif plant_map[node_position_x][node_position_y] and plant_map[node_position_x][node_position_y].type == organisms.Type.TREE:
+                occupied_space = 50
+                if animal_map[node_position_x][node_position_y]:
+                    for animal in animal_map[node_position_x][node_position_y]:
+                        occupied_space += animal.size
+                if occupied_space + traverser.size > ANIMAL_CELL_CAPACITY:
+                    continue
+            elif animal_map[node_position_x][node_position_y]:
+                occupied_space = 0
+                for animal in animal_map[node_position_x][node_position_y]:
+                    occupied_space += animal.size
+                if occupied_space + traverser.size > ANIMAL_CELL_CAPACITY:
+                    continue
+
+
+
+            # Create new node
+            new_node = ReferenceNode(current_node, node_position_x, node_position_y)
+
+            if new_node in closed_list:
+                continue
+
+            new_node.g = current_node.g + 1
+            new_node.h = ((new_node.x - end_node.x) ** 2) + ((new_node.y - end_node.y) ** 2)
+            new_node.f = new_node.g + new_node.h
+
+            found_node = False
+            for (index, node) in enumerate(open_list):
+                if node == new_node:
+                    found_node = True
+                    if new_node.g < node.g:
+                        open_list[index] = new_node
+                    break
+
+            if not found_node:
+                open_list.append(new_node)
+
+    return []
+
+
+def random_maps(seed, width=30, height=20):
+    """Returns seeded water, plant and animal maps with water, trees and
+    animals of different sizes spread over the map."""
+    rng = np.random.default_rng(seed)
+    water_map = [[None] * height for _ in range(width)]
+    plant_map = [[None] * height for _ in range(width)]
+    animal_map = [[[] for _ in range(height)] for _ in range(width)]
+    for x in range(width):
+        for y in range(height):
+            if rng.random() < 0.25:
+                water_map[x][y] = SimpleNamespace(type=organisms.Type.WATER)
+                continue
+            if rng.random() < 0.15:
+                plant_map[x][y] = SimpleNamespace(type=organisms.Type.TREE)
+            elif rng.random() < 0.5:
+                plant_map[x][y] = SimpleNamespace(type=organisms.Type.GRASS)
+            for _ in range(rng.integers(0, 3)):
+                animal_map[x][y].append(SimpleNamespace(size=int(rng.choice([10, 20, 30, 45]))))
+    return water_map, plant_map, animal_map
+
+
+def searches(seed, water_map):
+    """Returns seeded start and end cells, starting on cells without water."""
+    rng = random.Random(seed)
+    width = len(water_map)
+    height = len(water_map[0])
+    open_cells = [(x, y) for x in range(width) for y in range(height) if not water_map[x][y]]
+    cells = [(x, y) for x in range(width) for y in range(height)]
+    return [(rng.choice(open_cells), rng.choice(cells)) for _ in range(SEARCHES_PER_MAP)]
+
+
+def assert_valid_path(path, size, terrain_blocked_map, occupancy_map, start, end):
+    assert path[0] == start
+    assert path[-1] == end
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        assert (x2 - x1, y2 - y1) in [direction.value for direction in helpers.Direction]
+        assert not terrain_blocked_map[x2, y2]
+        assert occupancy_map[x2, y2] + size <= ANIMAL_CELL_CAPACITY
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('size', [10, 45])
+def test_same_path_lengths_as_reference(seed, size):
+    maps = random_maps(seed)
+    terrain_blocked_map, occupancy_map = maze_layers(*maps)
+    traverser = SimpleNamespace(size=size)
+    reachable = 0
+    for start, end in searches(seed, maps[0]):
+        path = astar(traverser, *maps, *start, *end)
+        reference_path = reference_astar(traverser, *maps, *start, *end)
+        assert len(path) == len(reference_path)
+        if path:
+            reachable += 1
+            assert_valid_path(path, size, terrain_blocked_map, occupancy_map, start, end)
+    # The maps must give both found and unreachable goals to test anything
+    assert 0 < reachable < SEARCHES_PER_MAP
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_same_path_lengths_as_reference_with_max_path_length(seed):
+    maps = random_maps(seed)
+    traverser = SimpleNamespace(size=10)
+    for start, end in searches(seed, maps[0]):
+        path = astar(traverser, *maps, *start, *end, max_path_length=5)
+        reference_path = reference_astar(traverser, *maps, *start, *end, max_path_length=5)
+        assert len(path) == len(reference_path)
+        assert len(path) <= 7
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_layers_give_the_same_paths_as_the_maps(seed):
+    maps = random_maps(seed)
+    terrain_blocked_map, occupancy_map = maze_layers(*maps)
+    traverser = SimpleNamespace(size=20)
+    for start, end in searches(seed, maps[0]):
+        assert astar_on_layers(20, terrain_blocked_map, occupancy_map, *start, *end) == \
+            astar(traverser, *maps, *start, *end)
+
+
+def test_blocked_goal_is_unreachable():
+    terrain_blocked_map = np.zeros((10, 10), dtype=bool)
+    occupancy_map = np.zeros((10, 10))
+    terrain_blocked_map[5, 5] = True
+    assert astar_on_layers(10, terrain_blocked_map, occupancy_map, 0, 0, 5, 5) == []
+    occupancy_map[5, 5] = TREE_OCCUPIED_SPACE
+    terrain_blocked_map[5, 5] = False
+    assert astar_on_layers(60, terrain_blocked_map, occupancy_map, 0, 0, 5, 5) == []
+    assert len(astar_on_layers(50, terrain_blocked_map, occupancy_map, 0, 0, 5, 5)) == 6
+
+
+def test_walled_off_goal_is_unreachable():
+    water_map = [[None] * 10 for _ in range(10)]
+    plant_map = [[None] * 10 for _ in range(10)]
+    animal_map = [[[] for _ in range(10)] for _ in range(10)]
+    water_map[6] = [SimpleNamespace(type=organisms.Type.WATER)] * 10
+    traverser = SimpleNamespace(size=10)
+    assert astar(traverser, water_map, plant_map, animal_map, 0, 0, 8, 8) == []
+    assert reference_astar(traverser, water_map, plant_map, animal_map, 0, 0, 8, 8) == []
@@ -0,0 +1,110 @@
+import pytest
+import behaviour_tree as bt
+from ecosystem import Ecosystem
+from metrics import measure
+from profiler import Profiler
+from bee import Bee
+from burrow import Burrow
+from den import Den
+from earth import Earth
+from flower import Flower
+from fox import Fox
+from grass import Grass
+from hive import Hive
+from rabbit import Rabbit
+from tree import Tree
+from water import Water
+
+SPECIES = [Bee, Burrow, Den, Earth, Flower, Fox, Grass, Hive, Rabbit, Tree, Water]
+STEPS = 100
+
+
+class Leaf(bt.Action):
+    """An action returning the statuses it is given in turn, and recording
+    the agents it ran for."""
+    def __init__(self, name, statuses, calls):
+        self.name = name
+        self.statuses = statuses
+        self.calls = calls
+
+    def action(self, agent):
+        self.calls.append((self.name, agent))
+        return self.statuses[agent]
+
+
+def example_tree(statuses, calls):
+    sequence = bt.Sequence()
+    fallback = bt.FallBack()
+    fallback.add_child(Leaf('a', statuses['a'], calls))
+    fallback.add_child(Leaf('b', statuses['b'], calls))
+    sequence.add_child(fallback)
+    sequence.add_child(Leaf('c', statuses['c'], calls))
+    return sequence
+
+
+@pytest.mark.parametrize('a', list(bt.Status))
+@pytest.mark.parametrize('b', list(bt.Status))
+@pytest.mark.parametrize('c', list(bt.Status))
+def test_compiled_tree_runs_like_tree(a, b, c):
+    statuses = {'a': {0: a, 1: c}, 'b': {0: b, 1: a}, 'c': {0: c, 1: b}}
+    calls = []
+    tree = example_tree(statuses, calls)
+    expected = [tree.run(agent) for agent in (0, 1)]
+    expected_calls = list(calls)
+    calls.clear()
+    compiled = bt.compile_tree(example_tree(statuses, calls))
+    assert [compiled.run(agent) for agent in (0, 1)] == expected
+    assert calls == expected_calls
+
+
+def test_actions_return_a_status(monkeypatch):
+    returned = {}
+
+    def checked(action_class):
+        action = action_class.action
+
+        def checked_action(self, agent):
+            status = action(self, agent)
+            returned.setdefault(action_class.__name__, set()).add(status)
+            return status
+        return checked_action
+
+    for species in SPECIES:
+        for opcode, node, _, _ in species.get_tree()._instructions:
+            if opcode is bt.ACTION:
+                monkeypatch.setattr(type(node), 'action', checked(type(node)))
+
+    ecosystem = Ecosystem(30, 20, seed=1)
+    for _ in range(STEPS):
+        ecosystem.run()
+
+    assert returned
+    for name, statuses in returned.items():
+        assert all(isinstance(status, bt.Status) for status in statuses), name
+
+
+def test_shared_trees_keep_no_organism_state():
+    ecosystem = Ecosystem(30, 20, seed=1)
+    for _ in range(STEPS):
+        ecosystem.run()
+    for species in SPECIES:
+        organisms = [organism for organism in ecosystem.registry.snapshot() if type(organism) is species]
+        assert all(organism.get_tree() is species.get_tree() for organism in organisms)
+        for opcode, node, _, _ in species.get_tree()._instructions:
+            assert not vars(node), type(node).__name__
+
+
+def test_profiled_run_is_the_same_run():
+    ecosystem = Ecosystem(30, 20, seed=1)
+    expected = [measure(step, ecosystem.run()) for step in range(STEPS)]
+    ecosystem = Ecosystem(30, 20, seed=1)
+    with Profiler() as profiler:
+        assert [measure(step, ecosystem.run()) for step in range(STEPS)] == expected
+    assert bt.CompiledTree.timer is None
+
+    report = {row['path']: row for row in profiler.report()}
+    rabbit = report['Ecosystem.run/Rabbit']
+    hungry = report['Ecosystem.run/Rabbit/logic_fallback/hungry_sequence']
+    assert 0 < hungry['calls'] <= rabbit['calls']
+    assert rabbit['success'] is not None and hungry['success'] is None
+    assert all(self_time > -1e-6 for self_time in profiler.self_times().values())
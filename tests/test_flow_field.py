@@ -0,0 +1,45 @@
+import numpy as np
+from flow_field import FlowFields
+
+CELL_CAPACITY = 100
+
+
+def open_maps(width, height):
+    return np.zeros((width, height), dtype=bool), np.zeros((width, height))
+
+
+def test_fields_ignore_occupancy_and_are_reused():
+    flow_fields = FlowFields(10, 10, CELL_CAPACITY)
+    terrain_blocked_map, occupancy_map = open_maps(10, 10)
+    assert flow_fields.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0) == [(0, 0), (1, 0), (2, 0), (3, 0)]
+
+    # The field stays valid, and the path walks around the taken up cell
+    occupancy_map[1, 0] = CELL_CAPACITY
+    path = flow_fields.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0)
+    assert len(path) == 4 and (1, 0) not in path
+    assert flow_fields.stats()['hits'] == 1
+
+
+def test_path_stops_before_taken_up_cells():
+    flow_fields = FlowFields(10, 3, CELL_CAPACITY)
+    terrain_blocked_map, occupancy_map = open_maps(10, 3)
+    occupancy_map[3, :] = CELL_CAPACITY
+    assert flow_fields.find_path(terrain_blocked_map, occupancy_map, 5, 0, 1, 6, 1) == [(0, 1), (1, 1), (2, 1)]
+    assert flow_fields.find_path(terrain_blocked_map, occupancy_map, 5, 2, 1, 6, 1) == []
+
+
+def test_terrain_changes_drop_fields_depending_on_them():
+    flow_fields = FlowFields(20, 20, CELL_CAPACITY)
+    terrain_blocked_map, occupancy_map = open_maps(20, 20)
+    flow_fields.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0)
+
+    # Far away from the grown field
+    flow_fields.mark_terrain_changed(15, 15)
+    flow_fields.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0)
+    assert flow_fields.stats()['hits'] == 1
+
+    terrain_blocked_map[2, :3] = True
+    flow_fields.mark_terrain_changed(2, 0)
+    path = flow_fields.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0)
+    assert flow_fields.stats()['stale'] == 1
+    assert len(path) == 7 and not any(terrain_blocked_map[cell] for cell in path)
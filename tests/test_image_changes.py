@@ -0,0 +1,24 @@
+from ecosystem import Ecosystem
+
+STEPS = 200
+
+
+def images(ecosystem):
+    """Returns the image of every organism of the ecosystem."""
+    return {organism: organism.get_image() for organism in ecosystem.registry}
+
+
+def test_changed_images_hold_every_organism_whose_image_changed():
+    ecosystem = Ecosystem(30, 20, seed=1)
+    ecosystem.track_image_changes()
+    before = images(ecosystem)
+    changes = 0
+    for _ in range(STEPS):
+        ecosystem.run()
+        after = images(ecosystem)
+        changed = {organism for organism, image in after.items() if organism in before and before[organism] != image}
+        assert changed <= ecosystem.changed_images
+        changes += len(changed)
+        ecosystem.changed_images.clear()
+        before = after
+    assert changes
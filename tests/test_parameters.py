@@ -0,0 +1,49 @@
+import pytest
+from ecosystem import Ecosystem, EcosystemConfig, Parameters
+from metrics import measure
+from organisms import Type
+import constants
+import rabbit
+
+STEPS = 100
+VALUES = {'constants.EARTH_TO_EARTH_WATER_MOVE_SPEED': 0.01, 'grass.MAX_GRASS_AMOUNT': 50,
+          'grass.REPRODUCTION_THRESHOLD': 30, 'water.WATER_POOL_CAPACITY': 5000, 'rabbit.HUNGER_SEEK_THRESHOLD': 20}
+
+
+def series(*ecosystems):
+    """Runs the ecosystems in turn, one step at a time, and returns the
+    metrics of every step of each."""
+    result = [[] for _ in ecosystems]
+    for step in range(STEPS):
+        for metrics, ecosystem in zip(result, ecosystems):
+            metrics.append(measure(step, ecosystem.run()))
+    return result
+
+
+def test_parameters_default_to_the_module_constants():
+    parameters = Parameters({'rabbit.HUNGER_SEEK_THRESHOLD': 20})
+    assert parameters.rabbit.HUNGER_SEEK_THRESHOLD == 20
+    assert rabbit.HUNGER_SEEK_THRESHOLD != 20
+    assert parameters.constants.EARTH_TO_EARTH_WATER_MOVE_SPEED == constants.EARTH_TO_EARTH_WATER_MOVE_SPEED
+
+
+@pytest.mark.parametrize('name', ['rabbit.NOT_A_CONSTANT', 'ecosystem.WATER_POOLS', 'HUNGER_SEEK_THRESHOLD'])
+def test_unknown_constants_are_refused(name):
+    with pytest.raises(ValueError):
+        Parameters({name: 1})
+
+
+def test_runs_with_different_parameters_share_a_process():
+    config = EcosystemConfig(parameters=VALUES)
+    alone = series(Ecosystem(30, 20, config, seed=1))[0]
+    default_alone = series(Ecosystem(30, 20, seed=1))[0]
+    together, default_together = series(Ecosystem(30, 20, config, seed=1), Ecosystem(30, 20, seed=1))
+    assert together == alone
+    assert default_together == default_alone
+    assert alone != default_alone
+
+
+def test_water_field_moves_water_at_the_parameter_speeds():
+    ecosystem = Ecosystem(30, 20, EcosystemConfig(parameters=VALUES), seed=1)
+    earth = Type.EARTH.value + 1
+    assert ecosystem.water_field.move_speeds[earth, earth] == 0.01
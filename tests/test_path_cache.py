@@ -0,0 +1,56 @@
+import numpy as np
+from astar import astar_on_layers
+from ecosystem import Ecosystem
+from path_cache import PathCache, size_class
+
+STEPS = 300
+MIN_HIT_RATE = 0.25
+
+
+def test_cached_paths_match_astar(monkeypatch):
+    find_path = PathCache.find_path
+    checked = []
+
+    def checked_find_path(self, terrain_blocked_map, occupancy_map, size, *args, **kwargs):
+        path = find_path(self, terrain_blocked_map, occupancy_map, size, *args, **kwargs)
+        expected = astar_on_layers(size_class(size), terrain_blocked_map, occupancy_map, *args, **kwargs)
+        assert path == expected
+        checked.append(path)
+        return path
+
+    monkeypatch.setattr(PathCache, 'find_path', checked_find_path)
+    ecosystem = Ecosystem(60, 40, seed=1)
+    for _ in range(STEPS):
+        ecosystem.run()
+
+    stats = ecosystem.path_cache.stats()
+    assert len(checked) == stats['lookups']
+    assert stats['hit_rate'] >= MIN_HIT_RATE
+
+
+def test_changes_drop_only_paths_depending_on_them():
+    cache = PathCache(20, 20, 100)
+    terrain_blocked_map = np.zeros((20, 20), dtype=bool)
+    occupancy_map = np.zeros((20, 20))
+    cache.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0, max_path_length=5)
+    cache.find_path(terrain_blocked_map, occupancy_map, 5, 15, 15, 18, 15, max_path_length=5)
+
+    # Far away from both searches
+    cache.mark_terrain_changed(10, 10)
+    cache.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0, max_path_length=5)
+    assert cache.stats()['hits'] == 1
+
+    # On the first path, but not blocking its size class
+    cache.mark_occupancy_changed(1, 0, 0, 50)
+    occupancy_map[1, 0] = 50
+    cache.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0, max_path_length=5)
+    assert cache.stats()['hits'] == 2
+
+    # Blocking the first path
+    cache.mark_occupancy_changed(1, 0, 50, 100)
+    occupancy_map[1, 0] = 100
+    path = cache.find_path(terrain_blocked_map, occupancy_map, 5, 0, 0, 3, 0, max_path_length=5)
+    assert cache.stats()['stale'] == 1
+    assert (1, 0) not in path
+    cache.find_path(terrain_blocked_map, occupancy_map, 5, 15, 15, 18, 15, max_path_length=5)
+    assert cache.stats()['hits'] == 3
@@ -0,0 +1,64 @@
+import io
+import pickle
+import pytest
+from ecosystem import Ecosystem, SnapshotVersionError, SNAPSHOT_VERSION
+from metrics import MetricsWriter, measure, truncate_metrics
+
+STEPS = 300
+
+
+def metrics_rows(seed, steps=STEPS):
+    """Runs a small seeded ecosystem and returns the rows the metrics writer
+    writes for it."""
+    ecosystem = Ecosystem(30, 20, seed=seed)
+    output = io.StringIO()
+    writer = MetricsWriter(output)
+    for step in range(steps):
+        writer.append(measure(step, ecosystem.run()))
+    writer.flush()
+    return output.getvalue().splitlines()
+
+
+def test_same_seed_gives_same_series():
+    rows = metrics_rows(1)
+    assert len(rows) == STEPS + 1
+    assert rows == metrics_rows(1)
+
+
+def test_different_seed_gives_different_series():
+    assert metrics_rows(1) != metrics_rows(2)
+
+
+def test_resumed_metrics_continue_the_file(tmp_path):
+    path = tmp_path / 'metrics.csv'
+    ecosystem = Ecosystem(30, 20, seed=1)
+    with open(path, 'w', newline='') as output:
+        writer = MetricsWriter(output)
+        for step in range(STEPS // 2):
+            writer.append(measure(step, ecosystem.run()))
+            if step == STEPS // 4:
+                snapshot = tmp_path / 'snapshot.bin'
+                ecosystem.save(snapshot)
+        writer.flush()
+
+    ecosystem = Ecosystem.load(snapshot)
+    assert truncate_metrics(path, ecosystem.steps)
+    with open(path, 'a', newline='') as output:
+        writer = MetricsWriter(output, header=False)
+        for _ in range(STEPS - ecosystem.steps):
+            writer.append(measure(ecosystem.steps, ecosystem.run()))
+        writer.flush()
+
+    with open(path, newline='') as output:
+        assert output.read().splitlines() == metrics_rows(1)
+    assert not truncate_metrics(tmp_path / 'missing.csv', 0)
+
+
+def test_snapshot_version_is_checked_before_loading(tmp_path):
+    path = tmp_path / 'snapshot.bin'
+    with open(path, 'wb') as snapshot:
+        pickle.dump((SNAPSHOT_VERSION - 1, 10), snapshot)
+        # Loading this would fail with another error
+        snapshot.write(b'not a pickle')
+    with pytest.raises(SnapshotVersionError, match='version ' + str(SNAPSHOT_VERSION - 1)):
+        Ecosystem.load(path)
@@ -0,0 +1,314 @@
+import numpy as np
+import pytest
+import constants
+import organisms
+from earth import Earth
+from ecosystem import Ecosystem
+from helpers import Direction
+from organisms import Type
+from water import Water
+from water_field import NO_WATER
+
+STEPS = 20
+
+
+class ReferenceCell():
+    """A water pool, earth, grass or tree holding its own water amount, as
+    all organisms did before the water field."""
+    def __init__(self, ecosystem, type, x, y, water_amount=0, water_capacity=0):
+        self._ecosystem = ecosystem
+        self.type = type
+        self.x = x
+        self.y = y
+        self.water_amount = water_amount
+        self.water_capacity = water_capacity
+
+
+class ReferenceEcosystem():
+    """The maps the per-object water movement reads, built from the cells of
+    a water field."""
+    def __init__(self, ecosystem):
+        field = ecosystem.water_field
+        self.width = ecosystem.width
+        self.height = ecosystem.height
+        self.water_map = [[None] * self.height for _ in range(self.width)]
+        self.plant_map = [[None] * self.height for _ in range(self.width)]
+        for x in range(self.width):
+            for y in range(self.height):
+                plant = ecosystem.plant_map[x][y]
+                if field.kind[x, y] == Type.WATER.value:
+                    self.water_map[x][y] = ReferenceCell(self, Type.WATER, x, y, field.amount[x, y].item(),
+                                                         field.capacity[x, y].item())
+                elif field.kind[x, y] != NO_WATER:
+                    self.plant_map[x][y] = ReferenceCell(self, Type(field.kind[x, y].item()), x, y,
+                                                         field.amount[x, y].item(), field.capacity[x, y].item())
+                elif plant is not None:
+                    self.plant_map[x][y] = ReferenceCell(self, plant.type, x, y)
+
+    def cell(self, x, y):
+        return self.water_map[x][y] or self.plant_map[x][y]
+
+    def amounts(self):
+        amount = np.zeros((self.width, self.height))
+        for x in range(self.width):
+            for y in range(self.height):
+                if self.cell(x, y) is not None:
+                    amount[x, y] = self.cell(x, y).water_amount
+        return amount
+
+    def set_amounts(self, amount, cells):
+        for x, y in cells:
+            if self.cell(x, y) is not None:
+                self.cell(x, y).water_amount = amount[x, y]
+
+
+# The MoveWater actions of the water pools, earth and grass before the water
+# field, unchanged apart from reading the organism from an argument
+
+
+def water_move_water(outer):
+    """MoveWater.action of water.py before the water field."""
+    directions = list(Direction)
+    cells_to_add_water = []
+    total_water_amount = 0
+
+    spilling_over = outer.water_amount > outer.water_capacity
+    min_water_cell = outer
+    for dir in directions:
+        x = outer.x + dir.value[0]
+        y = outer.y + dir.value[1]
+
+        # check if in bounds
+        if x < 0 or x >= outer._ecosystem.width or y < 0 or y >= outer._ecosystem.height:
+            continue
+
+        cell = outer._ecosystem.plant_map[x][y]
+        if not cell:
+            cell = outer._ecosystem.water_map[x][y]
+        if cell and cell.type != organisms.Type.TREE:
+            cells_to_add_water.append(cell)
+            if cell.water_amount < min_water_cell.water_amount:
+                min_water_cell = cell
+
+
+    if spilling_over:
+        water_over = (outer.water_amount - outer.water_capacity) / len(cells_to_add_water)
+        for cell in cells_to_add_water:
+            if cell.type == organisms.Type.WATER:
+                water_moved = water_over * constants.WATER_TO_WATER_WATER_MOVE_SPEED
+            elif cell.type == organisms.Type.EARTH:
+                water_moved = water_over * constants.WATER_TO_EARTH_WATER_MOVE_SPEED
+            elif cell.type == organisms.Type.GRASS:
+                water_moved = water_over * constants.WATER_TO_GRASS_WATER_MOVE_SPEED
+
+            outer.water_amount -= water_moved
+            cell.water_amount += water_moved
+    else:
+        water_diff = (outer.water_amount - min_water_cell.water_amount) / 2
+        if min_water_cell.type == organisms.Type.EARTH:
+            moved_water = min(water_diff  * constants.WATER_TO_EARTH_WATER_MOVE_SPEED, (min_water_cell.water_capacity - min_water_cell.water_amount) * 0.1)
+        elif min_water_cell.type == organisms.Type.GRASS:
+            moved_water = min(water_diff  * constants.WATER_TO_GRASS_WATER_MOVE_SPEED, (min_water_cell.water_capacity - min_water_cell.water_amount) * 0.1)
+        else:
+            moved_water = water_diff
+
+        outer.water_amount -= moved_water
+        min_water_cell.water_amount += moved_water
+
+
+def earth_move_water(outer):
+    """MoveWater.action of earth.py before the water field."""
+    directions = list(Direction)
+    min_water_cell = outer
+    for dir in directions:
+        x = outer.x + dir.value[0]
+        y = outer.y + dir.value[1]
+
+        # check if in bounds
+        if x < 0 or x >= outer._ecosystem.width or y < 0 or y >= outer._ecosystem.height:
+            continue
+
+        cell = outer._ecosystem.plant_map[x][y]
+        if not cell or cell.type == organisms.Type.TREE:
+            continue
+        if cell.water_amount < min_water_cell.water_amount:
+            min_water_cell = cell
+
+
+    water_diff = (outer.water_amount - min_water_cell.water_amount) / 2
+    if min_water_cell.type == organisms.Type.EARTH:
+        moved_water = water_diff  * constants.EARTH_TO_EARTH_WATER_MOVE_SPEED
+    elif min_water_cell.type == organisms.Type.GRASS:
+        moved_water = water_diff  * constants.EARTH_TO_GRASS_WATER_MOVE_SPEED
+
+    outer.water_amount -= moved_water
+    min_water_cell.water_amount += moved_water
+
+
+def grass_move_water(outer):
+    """MoveWater.action of grass.py before the water field."""
+    directions = list(Direction)
+    min_water_cell = outer
+    for dir in directions:
+        x = outer.x + dir.value[0]
+        y = outer.y + dir.value[1]
+
+        # check if in bounds
+        if x < 0 or x >= outer._ecosystem.width or y < 0 or y >= outer._ecosystem.height:
+            continue
+
+        cell = outer._ecosystem.plant_map[x][y]
+        if not cell or cell.type == organisms.Type.TREE:
+            continue
+        if cell.water_amount < min_water_cell.water_amount:
+            min_water_cell = cell
+
+
+    water_diff = (outer.water_amount - min_water_cell.water_amount) / 2
+    if min_water_cell.type == organisms.Type.EARTH:
+        moved_water = water_diff  * constants.GRASS_TO_EARTH_WATER_MOVE_SPEED
+    elif min_water_cell.type == organisms.Type.GRASS:
+        moved_water = water_diff  * constants.GRASS_TO_GRASS_WATER_MOVE_SPEED
+
+    outer.water_amount -= moved_water
+    min_water_cell.water_amount += moved_water
+
+
+MOVE_WATER = {
+    Type.WATER: water_move_water,
+    Type.EARTH: earth_move_water,
+    Type.GRASS: grass_move_water
+}
+
+
+def neighbourhood(reference, x, y):
+    return [(x + direction.value[0], y + direction.value[1]) for direction in Direction
+            if 0 <= x + direction.value[0] < reference.width and 0 <= y + direction.value[1] < reference.height]
+
+
+def reference_step(reference, active):
+    """Returns the amounts after every active cell has run its old MoveWater
+    action on the amounts from the start of the step, which is how the water
+    field steps all cells at once."""
+    start = reference.amounts()
+    delta = np.zeros(start.shape)
+    for x, y in zip(*np.nonzero(active)):
+        cell = reference.cell(x, y)
+        cells = neighbourhood(reference, x, y)
+        MOVE_WATER[cell.type](cell)
+        moved = reference.amounts()
+        for position in cells:
+            delta[position] += moved[position] - start[position]
+        reference.set_amounts(start, cells)
+    reference.set_amounts(start + delta, np.ndindex(start.shape))
+    return start + delta
+
+
+def seeded_ecosystem(seed):
+    """Returns a small seeded ecosystem, with some pools filled over their
+    capacity so they spill over, some nearly dried out, and some ground so
+    close to its capacity that the pools next to it can only fill it up
+    slowly."""
+    ecosystem = Ecosystem(30, 20, seed=seed)
+    field = ecosystem.water_field
+    pools = np.argwhere(field.kind == Type.WATER.value)
+    for x, y in pools[::3]:
+        field.amount[x, y] = field.capacity[x, y] * 1.5
+    rng = np.random.default_rng(seed)
+    for x, y in pools[1::3]:
+        field.amount[x, y] = rng.uniform(0, 10)
+    ground = np.argwhere((field.kind == Type.EARTH.value) | (field.kind == Type.GRASS.value))
+    for x, y in ground[::2]:
+        field.amount[x, y] = field.capacity[x, y] - rng.uniform(0, 0.02)
+    return ecosystem
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_cells_moved_one_by_one_match_old_actions(seed):
+    # Moving one cell at a time is what the organisms did before the water
+    # field, each seeing the moves of the cells that ran before it
+    ecosystem = seeded_ecosystem(seed)
+    field = ecosystem.water_field
+    reference = ReferenceEcosystem(ecosystem)
+    cells = np.argwhere(field.kind != NO_WATER)
+    assert (field.kind == Type.WATER.value).any()
+    order = np.random.default_rng(seed).permutation(len(cells))
+    for _ in range(3):
+        for x, y in cells[order]:
+            cell = reference.cell(x, y)
+            MOVE_WATER[cell.type](cell)
+            field.active[x, y] = True
+            field.step()
+            np.testing.assert_allclose(field.amount, reference.amounts(), rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_step_matches_old_actions_on_start_amounts(seed):
+    ecosystem = seeded_ecosystem(seed)
+    field = ecosystem.water_field
+    reference = ReferenceEcosystem(ecosystem)
+    holds_water = field.kind != NO_WATER
+    for _ in range(STEPS):
+        expected = reference_step(reference, holds_water)
+        field.active[:] = holds_water
+        field.step()
+        np.testing.assert_allclose(field.amount, expected, rtol=1e-12, atol=1e-9)
+
+
+def test_step_keeps_total_water():
+    field = seeded_ecosystem(0).water_field
+    total = field.amount.sum()
+    for _ in range(STEPS):
+        field.active[:] = field.kind != NO_WATER
+        field.step()
+    assert field.amount.sum() == pytest.approx(total, rel=1e-12)
+
+
+def test_inactive_cells_do_not_move_water():
+    field = seeded_ecosystem(0).water_field
+    amount = field.amount.copy()
+    field.step()
+    np.testing.assert_array_equal(field.amount, amount)
+
+
+def closest_pools(field):
+    """Returns the pool the fewest steps away from every cell, found by
+    comparing every cell with every pool."""
+    pools = sorted(map(tuple, np.argwhere(field.kind == Type.WATER.value).tolist()))
+    return {(x, y): min(pools, key=lambda pool: (max(abs(pool[0] - x), abs(pool[1] - y)), pool), default=None)
+            for x in range(field.width) for y in range(field.height)}
+
+
+def assert_nearest_water(field):
+    for (x, y), pool in closest_pools(field).items():
+        assert field.nearest_water(x, y) == pool
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_nearest_water_follows_floods_and_dry_outs(seed):
+    ecosystem = seeded_ecosystem(seed)
+    field = ecosystem.water_field
+    assert_nearest_water(field)
+    rng = np.random.default_rng(seed)
+    for _ in range(10):
+        pools = np.argwhere(field.kind == Type.WATER.value)
+        for x, y in pools[rng.choice(len(pools), 3, replace=False)]:
+            ecosystem.set_water(x, y, None)
+            ecosystem.set_plant(x, y, Earth(ecosystem, x, y, 0))
+        ground = np.argwhere(field.kind == Type.EARTH.value)
+        for x, y in ground[rng.choice(len(ground), 3, replace=False)]:
+            ecosystem.set_plant(x, y, None)
+            ecosystem.set_water(x, y, Water(ecosystem, x, y))
+        assert_nearest_water(field)
+
+
+def test_nearest_water_without_pools():
+    ecosystem = seeded_ecosystem(0)
+    field = ecosystem.water_field
+    field.nearest_water(0, 0)
+    for x, y in np.argwhere(field.kind == Type.WATER.value):
+        ecosystem.set_water(x, y, None)
+    assert field.nearest_water(0, 0) is None
+    ecosystem.set_plant(3, 4, None)
+    ecosystem.set_water(3, 4, Water(ecosystem, 3, 4))
+    assert_nearest_water(field)
@@ -3,13 +3,16 @@ import behaviour_tree as bt
 
 class Tree(organisms.Organism):
     """Defines the tree, which is just an immovable object."""
+    __slots__ = ()
+
     def __init__(self, ecosystem, x, y):
         super().__init__(ecosystem, organisms.Type.TREE, x, y)
 
     def get_image(self):
         return 'images/tree.png'
 
-    def generate_tree(self):
+    @classmethod
+    def generate_tree(cls):
         """Generates the tree for the tree."""
         tree = bt.FallBack()
         return tree
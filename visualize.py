@@ -1,5 +1,6 @@
 import arcade
 from ecosystem import Ecosystem
+from metrics import MetricsWriter, measure, read_metrics
 from organisms import Type
 import matplotlib.pyplot as plt
 import argparse
@@ -8,6 +9,18 @@ SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
 CELL_WIDTH = 20
 CELL_HEIGHT = 20
+PLOT_METRICS_FILE = 'plot_metrics.csv'
+PLOT_POINTS = 100000 # Largest amount of steps drawn in a plot
+
+# Sprite layers, drawn from the bottom up, with the organism types in each
+LAYERS = [
+    [Type.WATER, Type.EARTH, Type.GRASS, Type.TREE],
+    [Type.FLOWER],
+    [Type.HIVE, Type.BURROW, Type.DEN],
+    [Type.BEE, Type.RABBIT, Type.FOX]
+]
+MOVING_TYPES = {Type.BEE, Type.RABBIT, Type.FOX}
+
 
 class Game(arcade.Window):
     """ Main application class. """
@@ -15,118 +28,122 @@ class Game(arcade.Window):
     def __init__(self, width, height):
         super().__init__(width, height, 'Ecosystem Simulation')
 
-        self.sprite_list = None
+        self.layers = None
+        self.layer_of_type = None
+
+        # Sprite of every organism per type, kept between frames
+        self.sprites = None
+
+        # Textures keyed on the image path returned by get_image
+        self.textures = None
 
         self.ecosystem = None
 
         arcade.set_background_color(arcade.color.BLACK)
 
     def setup(self):
-        self.sprite_list = arcade.SpriteList()
+        self.layers = [arcade.SpriteList() for _ in LAYERS]
+        self.layer_of_type = {type: layer for layer, types in zip(self.layers, LAYERS) for type in types}
+        self.sprites = {type: {} for type in self.layer_of_type}
+        self.textures = {}
 
         self.ecosystem = Ecosystem(int(SCREEN_WIDTH/CELL_WIDTH), int(SCREEN_HEIGHT/CELL_HEIGHT))
+        self.ecosystem.track_image_changes()
+        self.update_sprites()
 
     def on_draw(self):
         """ Render the screen. """
         arcade.start_render()
-        self.sprite_list.draw()
+        for layer in self.layers:
+            layer.draw()
 
     def update(self, delta_time):
         """ All the logic to move, and the game logic goes here. """
-        self.sprite_list = arcade.SpriteList()
-
-        ecosystem_organisms = self.ecosystem.run()
-
-        for organism in ecosystem_organisms:
-            sprite = arcade.Sprite(organism.get_image(), 1)
-            sprite.center_x = organism.x * CELL_WIDTH + CELL_WIDTH/2
-            sprite.center_y = organism.y * CELL_HEIGHT + CELL_HEIGHT/2
-            self.sprite_list.append(sprite)
-
-
-def plot(steps):
-    populations = {
-        'rabbit': [],
-        'bee': [],
-        'fox': [],
-        'flower': [],
-        'grass': []
-    }
-
-    genetics_factors = {
-        'rabbit': [],
-        'fox': []
-    }
-
+        self.ecosystem.run()
+        self.update_sprites()
+
+    def get_texture(self, image):
+        """Returns the texture of an image, loading it the first time."""
+        texture = self.textures.get(image)
+        if texture is None:
+            texture = self.textures[image] = arcade.load_texture(image)
+        return texture
+
+    def update_sprites(self):
+        """Creates sprites for the organisms added to the ecosystem and
+        removes the sprites of the removed ones. Only the sprites of moving
+        organisms are moved, and only the sprites of the organisms the
+        ecosystem marked as having a changed image get a new texture."""
+        registry = self.ecosystem.registry
+        for type, sprites in self.sprites.items():
+            layer = self.layer_of_type[type]
+            organisms = registry.of_type(type)
+
+            for organism in sprites.keys() - organisms:
+                layer.remove(sprites.pop(organism))
+            for organism in organisms - sprites.keys():
+                sprite = arcade.Sprite(texture=self.get_texture(organism.get_image()))
+                sprite.center_x = organism.x * CELL_WIDTH + CELL_WIDTH/2
+                sprite.center_y = organism.y * CELL_HEIGHT + CELL_HEIGHT/2
+                layer.append(sprite)
+                sprites[organism] = sprite
+
+            if type in MOVING_TYPES:
+                for organism, sprite in sprites.items():
+                    center_x = organism.x * CELL_WIDTH + CELL_WIDTH/2
+                    center_y = organism.y * CELL_HEIGHT + CELL_HEIGHT/2
+                    if sprite.center_x != center_x or sprite.center_y != center_y:
+                        sprite.center_x = center_x
+                        sprite.center_y = center_y
+
+        changed_images = self.ecosystem.changed_images
+        for organism in changed_images:
+            sprite = self.sprites[organism.type].get(organism)
+            if sprite is not None:
+                texture = self.get_texture(organism.get_image())
+                if sprite.texture is not texture:
+                    sprite.texture = texture
+        changed_images.clear()
+
+
+def plot(steps, metrics_path=PLOT_METRICS_FILE):
     ecosystem = Ecosystem(int(SCREEN_WIDTH/CELL_WIDTH), int(SCREEN_HEIGHT/CELL_HEIGHT))
 
-    # Iterate over time
+    # Iterate over time, streaming the metrics of every step to a file
     actual_steps = steps
-    for i in range(steps):
-        ecosystem_organisms = ecosystem.run()
-
-        rabbits = 0
-        foxes = 0
-        bees = 0
-        flowers = 0
-        grass = 0
-
-        rabbit_genetics_factor = 0
-        fox_genetics_factor = 0
-
-        for organism in ecosystem_organisms:
-            # Observe animal populations
-            if organism.type == Type.RABBIT:
-                rabbits += 1
-                rabbit_genetics_factor += organism.genetics_factor
-            elif organism.type == Type.FOX:
-                foxes += 1
-                fox_genetics_factor += organism.genetics_factor
-            elif organism.type == Type.BEE:
-                bees += 1
-            elif organism.type == Type.FLOWER:
-                flowers += 1
-            elif organism.type == Type.GRASS:
-                grass += 1
-
-        populations['rabbit'].append(rabbits)
-        populations['fox'].append(foxes)
-        populations['bee'].append(bees)
-        populations['flower'].append(flowers)
-        populations['grass'].append(grass)
-
-        if not i % 100:
-            print('Iteration ' + str(i) + ':')
-            print('  ' + str(foxes) + ' foxes')
-            print('  ' + str(rabbits) + ' rabbits')
-            print('  ' + str(bees) + ' bees')
-            print('  ' + str(flowers) + ' flowers')
-
-        if rabbits != 0:
-            genetics_factors['rabbit'].append(rabbit_genetics_factor / rabbits)
-        else:
-            actual_steps = i
-            break
-        if foxes != 0:
-            genetics_factors['fox'].append(fox_genetics_factor / foxes)
-        else:
-            actual_steps = i
-            break
+    with open(metrics_path, 'w', newline='') as output:
+        writer = MetricsWriter(output)
+        for i in range(steps):
+            metrics = measure(i, ecosystem.run())
+            writer.append(metrics)
+
+            if not i % 100:
+                print('Iteration ' + str(i) + ':')
+                print('  ' + str(metrics['foxes']) + ' foxes')
+                print('  ' + str(metrics['rabbits']) + ' rabbits')
+                print('  ' + str(metrics['bees']) + ' bees')
+                print('  ' + str(metrics['flowers']) + ' flowers')
+
+            if metrics['rabbits'] == 0 or metrics['foxes'] == 0:
+                actual_steps = i
+                break
+        writer.flush()
 
     if actual_steps >= 25000:
-        # Plot the results
-        plt.plot(populations['rabbit'], label='Rabbits')
-        plt.plot(populations['fox'], label='Foxes')
-        plt.plot(populations['bee'], label='Bees')
-        plt.plot(populations['flower'], label='Flowers')
-        plt.plot(populations['grass'], label='Grass')
+        # Plot the results, with at most PLOT_POINTS points per line
+        metrics = read_metrics(metrics_path, every=max(1, actual_steps // PLOT_POINTS))
+        plt.plot(metrics['step'], metrics['rabbits'], label='Rabbits')
+        plt.plot(metrics['step'], metrics['foxes'], label='Foxes')
+        plt.plot(metrics['step'], metrics['bees'], label='Bees')
+        plt.plot(metrics['step'], metrics['flowers'], label='Flowers')
+        plt.plot(metrics['step'], metrics['grass'], label='Grass')
         plt.xlabel('Time')
         plt.legend(loc='upper right')
         plt.ylabel('Population amount')
         plt.show()
 
-        plt.plot(genetics_factors['rabbit'], label='Rabbits')
-        plt.plot(genetics_factors['fox'], label='Foxes')
+        plt.plot(metrics['step'], metrics['rabbit_genetics_factor'], label='Rabbits')
+        plt.plot(metrics['step'], metrics['fox_genetics_factor'], label='Foxes')
         plt.xlabel('Time')
         plt.legend(loc='upper right')
         plt.ylabel('Genetics factor')
@@ -153,6 +170,13 @@ def main():
         type=int,
         default=100
     )
+    parser.add_argument(
+        '--metrics',
+        dest='metrics',
+        help='The file to write the metrics of every step to (if --plot is set). ' +
+        'Default ' + PLOT_METRICS_FILE + '.',
+        default=PLOT_METRICS_FILE
+    )
 
     args = parser.parse_args()
 
@@ -164,7 +188,7 @@ def main():
             print('#########################################')
             print('# DID NOT GET PAST 25000, TRYING AGAIN! #')
             print('#########################################')
-            done, iteration = plot(args.steps)
+            done, iteration = plot(args.steps, args.metrics)
             iterations += iteration
             plots += 1
             print('Average amount of iterations: ' + str(iterations/plots))
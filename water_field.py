@@ -0,0 +1,283 @@
+import heapq
+import math
+import numpy as np
+from helpers import Direction
+import organisms
+from organisms import Type
+
+NO_WATER = -1
+DIRECTIONS = [direction.value for direction in Direction]
+NEIGHBOURS = [direction.value for direction in Direction if direction != Direction.CENTER]
+
+
+def _speed_table(speeds):
+    """Builds a lookup table indexed on the kinds (offset by one, so that
+    NO_WATER has index 0) of the cell giving and the cell receiving water."""
+    table = np.zeros((len(Type) + 1, len(Type) + 1))
+    for (source, target), speed in speeds.items():
+        table[source.value + 1, target.value + 1] = speed
+    return table
+
+
+def move_speeds(constants):
+    """Returns the table of the share of the half difference that moves to the
+    neighbour with least water, for the given water move speeds."""
+    return _speed_table({
+        (Type.EARTH, Type.EARTH): constants.EARTH_TO_EARTH_WATER_MOVE_SPEED,
+        (Type.EARTH, Type.GRASS): constants.EARTH_TO_GRASS_WATER_MOVE_SPEED,
+        (Type.GRASS, Type.EARTH): constants.GRASS_TO_EARTH_WATER_MOVE_SPEED,
+        (Type.GRASS, Type.GRASS): constants.GRASS_TO_GRASS_WATER_MOVE_SPEED,
+        (Type.WATER, Type.EARTH): constants.WATER_TO_EARTH_WATER_MOVE_SPEED,
+        (Type.WATER, Type.GRASS): constants.WATER_TO_GRASS_WATER_MOVE_SPEED,
+        (Type.WATER, Type.WATER): 1
+    })
+
+
+def spill_speeds(constants):
+    """Returns the share of the spilled over water that moves to each
+    neighbour of a full pool, indexed on the kind of the neighbour, for the
+    given water move speeds."""
+    return _speed_table({
+        (Type.WATER, Type.WATER): constants.WATER_TO_WATER_WATER_MOVE_SPEED,
+        (Type.WATER, Type.EARTH): constants.WATER_TO_EARTH_WATER_MOVE_SPEED,
+        (Type.WATER, Type.GRASS): constants.WATER_TO_GRASS_WATER_MOVE_SPEED
+    })[Type.WATER.value + 1]
+
+
+class WaterCell(organisms.Organism):
+    """Base class for organisms holding water. While the organism is placed in
+    the ecosystem its water amount is a view onto the water field, otherwise it
+    is kept on the organism itself."""
+    __slots__ = ('_water_field', '_water_amount')
+
+    def __init__(self, ecosystem, type, x, y):
+        super().__init__(ecosystem, type, x, y)
+        self._water_field = None
+        self._water_amount = 0
+
+    @property
+    def water_amount(self):
+        if self._water_field is None:
+            return self._water_amount
+        return self._water_field.amount[self.x, self.y]
+
+    @water_amount.setter
+    def water_amount(self, amount):
+        if self._water_field is None:
+            self._water_amount = amount
+        else:
+            self._water_field.amount[self.x, self.y] = amount
+
+    def move_water(self):
+        """Lets the water of the organism's cell move in the next water step."""
+        if self._water_field is not None:
+            self._water_field.active[self.x, self.y] = True
+
+
+class WaterField():
+    """Holds the water amount, capacity and kind of every cell in arrays, and
+    moves the subterranean and surface water between the cells at the water
+    move speeds of the given parameters."""
+    def __init__(self, width, height, parameters):
+        self.width = width
+        self.height = height
+        self.move_speeds = move_speeds(parameters.constants)
+        self.spill_speeds = spill_speeds(parameters.constants)
+        self.amount = np.zeros((width, height))
+        self.capacity = np.zeros((width, height))
+        self.kind = np.full((width, height), NO_WATER, dtype=np.int8)
+        self.active = np.zeros((width, height), dtype=bool)
+
+        # The closest water pool of every cell, built on the first lookup and
+        # updated around the pools that appear or disappear after it. Cells
+        # are numbered x * height + y, and the pool of a cell is kept in a key
+        # of steps * cells + pool, so that comparing keys compares the steps
+        # first and the pools second.
+        self._nearest_water = None
+
+    def attach(self, organism):
+        """Moves the water of the organism into the field."""
+        x = organism.x
+        y = organism.y
+        self.amount[x, y] = organism._water_amount
+        self.capacity[x, y] = organism.water_capacity
+        self.kind[x, y] = organism.type.value
+        self.active[x, y] = False
+        organism._water_field = self
+        if organism.type == Type.WATER and self._nearest_water is not None:
+            self.add_nearest_water_pool(x, y)
+
+    def detach(self, organism):
+        """Moves the water of the organism's cell back to the organism and
+        empties the cell."""
+        x = organism.x
+        y = organism.y
+        organism._water_amount = self.amount[x, y].item()
+        organism._water_field = None
+        self.amount[x, y] = 0
+        self.capacity[x, y] = 0
+        self.kind[x, y] = NO_WATER
+        self.active[x, y] = False
+        if organism.type == Type.WATER and self._nearest_water is not None:
+            self.remove_nearest_water_pool(x, y)
+
+    def nearest_water(self, x, y):
+        """Returns the position of the water pool the fewest steps away from
+        (x, y), or None if there are no water pools. Ties go to the first pool
+        ordered on x and then on y."""
+        if self._nearest_water is None:
+            self.build_nearest_water()
+        key = self._nearest_water[x * self.height + y]
+        if key == math.inf:
+            return None
+        return divmod(key % (self.width * self.height), self.height)
+
+    def build_nearest_water(self):
+        """Finds the closest pool of every cell with a breadth first search
+        starting from all pools at once."""
+        self._nearest_water = [math.inf] * (self.width * self.height)
+        pools = np.flatnonzero(self.kind == Type.WATER.value).tolist()
+        for pool in pools:
+            self._nearest_water[pool] = pool
+        self.spread_nearest_water([(pool, pool) for pool in pools])
+
+    def add_nearest_water_pool(self, x, y):
+        """Gives the cells closer to the new pool at (x, y) than to their
+        closest pool so far the new pool."""
+        pool = x * self.height + y
+        self._nearest_water[pool] = pool
+        self.spread_nearest_water([(pool, pool)])
+
+    def remove_nearest_water_pool(self, x, y):
+        """Finds a new closest pool for the cells whose closest pool was the
+        one at (x, y). These cells form a connected region around the pool,
+        and their new pools are found by searching into the region from the
+        cells around it."""
+        nearest = self._nearest_water
+        width = self.width
+        height = self.height
+        cells = width * height
+        pool = x * height + y
+        region = {pool}
+        unvisited = [pool]
+        while unvisited:
+            cell_x, cell_y = divmod(unvisited.pop(), height)
+            for dx, dy in NEIGHBOURS:
+                if 0 <= cell_x + dx < width and 0 <= cell_y + dy < height:
+                    neighbour = (cell_x + dx) * height + cell_y + dy
+                    if neighbour not in region and nearest[neighbour] != math.inf and \
+                            nearest[neighbour] % cells == pool:
+                        region.add(neighbour)
+                        unvisited.append(neighbour)
+
+        for cell in region:
+            nearest[cell] = math.inf
+        heap = []
+        for cell in region:
+            cell_x, cell_y = divmod(cell, height)
+            for dx, dy in NEIGHBOURS:
+                if 0 <= cell_x + dx < width and 0 <= cell_y + dy < height:
+                    key = nearest[(cell_x + dx) * height + cell_y + dy] + cells
+                    if key < nearest[cell]:
+                        nearest[cell] = key
+            if nearest[cell] != math.inf:
+                heap.append((nearest[cell], cell))
+        self.spread_nearest_water(heap)
+
+    def spread_nearest_water(self, heap):
+        """Spreads the pools of the cells in the heap, given as (key, cell)
+        pairs, to the neighbouring cells for which they are closer, or as
+        close but earlier, than their closest pool so far."""
+        nearest = self._nearest_water
+        width = self.width
+        height = self.height
+        cells = width * height
+        heapq.heapify(heap)
+        while heap:
+            key, cell = heapq.heappop(heap)
+            if key != nearest[cell]:
+                # A closer pool reached the cell after it was added
+                continue
+            cell_x, cell_y = divmod(cell, height)
+            key += cells
+            for dx, dy in NEIGHBOURS:
+                if 0 <= cell_x + dx < width and 0 <= cell_y + dy < height:
+                    neighbour = (cell_x + dx) * height + cell_y + dy
+                    if key < nearest[neighbour]:
+                        nearest[neighbour] = key
+                        heapq.heappush(heap, (key, neighbour))
+
+    def add_water(self, amount):
+        """Adds the given amount of water, either a number or an array with an
+        amount per cell, to all cells holding water."""
+        holds_water = self.kind != NO_WATER
+        if np.ndim(amount):
+            self.amount[holds_water] += amount[holds_water]
+        else:
+            self.amount[holds_water] += amount
+
+    def step(self):
+        """Moves water for all cells that asked to move water since the last
+        step. Each cell follows the same rules as before: a water pool above
+        its capacity spills over to all its neighbours, and otherwise a cell
+        moves water to the neighbour with the least water (the first one in
+        direction order on ties). All moves use the amounts from the start of
+        the step."""
+        if not self.active.any():
+            return
+
+        width = self.width
+        height = self.height
+        amount = self.amount
+        kind = self.kind
+        padded_amount = np.pad(amount, 1)
+        padded_capacity = np.pad(self.capacity, 1)
+        padded_kind = np.pad(kind, 1, constant_values=NO_WATER)
+        delta = np.zeros((width + 2, height + 2))
+
+        is_water = kind == Type.WATER.value
+        spilling = self.active & is_water & (amount > self.capacity)
+        moving = self.active & ~spilling
+
+        # Find the neighbour with the least water. Water pools can move water
+        # to any cell holding water, while earth and grass only move water
+        # through the ground.
+        neighbours = []
+        neighbour_count = np.zeros((width, height), dtype=np.int32)
+        min_amount = amount.copy()
+        min_direction = np.full((width, height), -1, dtype=np.int8)
+        for i, (dx, dy) in enumerate(DIRECTIONS):
+            window = (slice(1 + dx, 1 + dx + width), slice(1 + dy, 1 + dy + height))
+            neighbour_kind = padded_kind[window]
+            in_ground = (neighbour_kind == Type.EARTH.value) | (neighbour_kind == Type.GRASS.value)
+            valid = np.where(is_water, neighbour_kind != NO_WATER, in_ground)
+            neighbour_count += valid
+
+            neighbour_amount = padded_amount[window]
+            lower = valid & (neighbour_amount < min_amount)
+            min_amount = np.where(lower, neighbour_amount, min_amount)
+            min_direction[lower] = i
+            neighbours.append((window, neighbour_kind, neighbour_amount, valid))
+
+        kind_index = kind + 1
+        water_diff = (amount - min_amount) / 2
+        water_over = np.divide(amount - self.capacity, neighbour_count,
+                               out=np.zeros((width, height)), where=spilling)
+        for i, (window, neighbour_kind, neighbour_amount, valid) in enumerate(neighbours):
+            neighbour_index = neighbour_kind + 1
+
+            moved = water_diff * self.move_speeds[kind_index, neighbour_index]
+            # Pools fill up the ground slowly as it gets close to its capacity
+            into_ground = is_water & (neighbour_kind != Type.WATER.value)
+            space_left = (padded_capacity[window] - neighbour_amount) * 0.1
+            moved = np.where(into_ground, np.minimum(moved, space_left), moved)
+            moved = np.where(moving & (min_direction == i), moved, 0)
+
+            spilled = np.where(spilling & valid, water_over * self.spill_speeds[neighbour_index], 0)
+
+            moved += spilled
+            delta[1:-1, 1:-1] -= moved
+            delta[window] += moved
+
+        amount += delta[1:-1, 1:-1]
+        self.active[:] = False
@@ -1,10 +1,14 @@
 from helpers import Direction
-import random
-from organisms import Type
 from enum import Enum
 import numpy as np
 
 NUMBER_OF_RAINY_DAYS_IN_YEAR = 168
+STORM_MIN_AMOUNT = 1
+STORM_MAX_AMOUNT = 3
+STORM_MIN_RADIUS = 3
+STORM_MAX_RADIUS = 10
+STORM_INTENSITY = 3 # Rain multiplier in the center of a storm
+STORM_BACKGROUND_RAIN = 0.2 # Rain multiplier outside of the storms
 
 class RainType(Enum):
     LIGHT = {"probability": 0.75, "liter_per_hour": 0.2}
@@ -17,48 +21,110 @@ class WindType(Enum):
     GALE = {"probability": 0.01, "speed": [4,5,6], "direcion_change_probability": 0.1}
     STORM = {"probability": 0.001, "speed": [7,8,9,10] , "direcion_change_probability": 0}
 
+class StormCell():
+    """A round area of heavier rain that drifts with the wind."""
+    def __init__(self, x, y, radius):
+        self.x = x
+        self.y = y
+        self.radius = radius
+
+    def drift(self, wind_velocity):
+        """Moves the storm cell with the given wind velocity."""
+        direction, speed = wind_velocity
+        self.x += direction.value[0] * speed
+        self.y += direction.value[1] * speed
+
+
 class Weather():
-    def __init__(self, ecosystem):
+    def __init__(self, ecosystem, storms=False):
         self.__ecosystem = ecosystem
-        self.__wind_velocity = (random.choice(list(Direction)), 1) # direciton and speed
+        self.__random = ecosystem.rng.weather
+        self.__wind_velocity = (self.__random.choice(list(Direction)), 1) # direciton and speed
         self.__hour = 0
         self.__is_rainy_day = False
+        self.__storms_enabled = storms
+        self.__storms = []
+        self.__cell_x, self.__cell_y = np.indices((ecosystem.width, ecosystem.height))
 
     def get_wind_velocity(self):
         """Returns a tuple with wind diretion and speed"""
         return self.__wind_velocity
 
+    def get_storms(self):
+        """Returns the storm cells currently over the map."""
+        return self.__storms
+
+    def start_storms(self):
+        """Creates the storm cells of a rainy day at random positions."""
+        parameters = self.__ecosystem.parameters
+        self.__storms = []
+        for _ in range(self.__random.randint(parameters.weather.STORM_MIN_AMOUNT, parameters.weather.STORM_MAX_AMOUNT)):
+            x = self.__random.randint(0, self.__ecosystem.width - 1)
+            y = self.__random.randint(0, self.__ecosystem.height - 1)
+            radius = self.__random.randint(parameters.weather.STORM_MIN_RADIUS, parameters.weather.STORM_MAX_RADIUS)
+            self.__storms.append(StormCell(x, y, radius))
+
+    def move_storms(self):
+        """Lets the storm cells drift with the wind, and removes the ones that
+        have left the map."""
+        width = self.__ecosystem.width
+        height = self.__ecosystem.height
+        for storm in self.__storms:
+            storm.drift(self.__wind_velocity)
+        self.__storms = [storm for storm in self.__storms
+                         if -storm.radius <= storm.x < width + storm.radius and
+                         -storm.radius <= storm.y < height + storm.radius]
+
+    def get_rain_field(self):
+        """Returns an array with the rain multiplier of every cell, based on
+        the distance to the storm cells."""
+        parameters = self.__ecosystem.parameters
+        rain_field = np.full((self.__ecosystem.width, self.__ecosystem.height),
+                             parameters.weather.STORM_BACKGROUND_RAIN)
+        for storm in self.__storms:
+            squared_distance = (self.__cell_x - storm.x) ** 2 + (self.__cell_y - storm.y) ** 2
+            rain_field += parameters.weather.STORM_INTENSITY * np.exp(-squared_distance / (2 * storm.radius ** 2))
+        return rain_field
+
     def simulate_rain(self, type):
-        for x in range(self.__ecosystem.width):
-            for y in range(self.__ecosystem.height):
-                if self.__ecosystem.plant_map[x][y] and (self.__ecosystem.plant_map[x][y].type == Type.EARTH or self.__ecosystem.plant_map[x][y].type == Type.GRASS):
-                    self.__ecosystem.plant_map[x][y].water_amount += type.value['liter_per_hour']
-                if self.__ecosystem.water_map[x][y]:
-                    self.__ecosystem.water_map[x][y].water_amount += type.value['liter_per_hour']
+        water_field = self.__ecosystem.water_field
+        if self.__storms_enabled:
+            rain = type.value['liter_per_hour'] * self.get_rain_field()
+            water_field.add_water(rain)
+        else:
+            water_field.add_water(type.value['liter_per_hour'])
 
     def simulate_weather(self):
         """Simulates weather changes and effects in one time step"""
 
         # Simulate rain
         self.__hour += 1
-        self.__wind_velocity = (random.choice(list(Direction)), 2)
+        self.__wind_velocity = (self.__random.choice(list(Direction)), 2)
 
         if self.__hour == 24:
             self.__hour = 0
-            self.__is_rainy_day = random.random() <= NUMBER_OF_RAINY_DAYS_IN_YEAR / 365
+            self.__is_rainy_day = self.__random.random() <= self.__ecosystem.parameters.weather.NUMBER_OF_RAINY_DAYS_IN_YEAR / 365
+            if self.__storms_enabled:
+                if self.__is_rainy_day:
+                    self.start_storms()
+                else:
+                    self.__storms = []
 
-        if self.__is_rainy_day and random.random() < 0.3:
-            if random.random() <= RainType.LIGHT.value["probability"]:
+        if self.__is_rainy_day and self.__random.random() < 0.3:
+            if self.__random.random() <= RainType.LIGHT.value["probability"]:
                 self.simulate_rain(RainType.LIGHT)
-            elif random.random() <= RainType.MEDIUM.value["probability"]:
+            elif self.__random.random() <= RainType.MEDIUM.value["probability"]:
                 self.simulate_rain(RainType.MEDIUM)
-            elif random.random() <= RainType.HEAVY.value["probability"]:
+            elif self.__random.random() <= RainType.HEAVY.value["probability"]:
                 self.simulate_rain(RainType.HEAVY)
 
-        wind = np.random.choice(list(WindType), p=[type.value['probability'] for type in list(WindType)])
-        wind_speed = random.choice(wind.value['speed'])
+        wind = self.__random.choices(list(WindType), weights=[type.value['probability'] for type in list(WindType)])[0]
+        wind_speed = self.__random.choice(wind.value['speed'])
         wind_direciton = self.get_wind_velocity()[0]
-        if random.random() <= wind.value['direcion_change_probability']:
-            wind_direciton = random.choice(list(Direction))
+        if self.__random.random() <= wind.value['direcion_change_probability']:
+            wind_direciton = self.__random.choice(list(Direction))
         self.__wind_velocity = (wind_direciton, wind_speed)
+
+        if self.__storms_enabled:
+            self.move_storms()
         return